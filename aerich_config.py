@@ -1,7 +1,14 @@
 from secret import DB_URL
 
+from orm.sqlite_profile import DEFAULT_PROFILE, db_connection_config
+
+try:
+    from secret import DB_PROFILE
+except ImportError:
+    DB_PROFILE = DEFAULT_PROFILE
+
 TORTOISE_ORM = {
-    "connections": {"default": DB_URL},
+    "connections": {"default": db_connection_config(DB_URL, DB_PROFILE)},
     "apps": {
         "models": {
             "models": ["orm.models", "aerich.models"],  # Include aerich.models
@@ -0,0 +1,75 @@
+"""
+Benchmark the Telegram export backfill on a generated export and a file backed SQLite DB.
+
+Usage:
+    python -m benchmarks.bench_backfill [--messages 500000] [--share-ratio 0.05]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from tortoise import Tortoise
+
+from tests.game_parsers.samples import CHATTER, SHARES
+from tools.backfill_telegram import backfill
+
+
+def write_export(path: Path, messages: int, share_ratio: float, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    users = [f"user{i}" for i in range(50)]
+    shares = [text for texts in SHARES.values() for text in texts]
+    with path.open("w", encoding="utf-8") as fp:
+        fp.write('{"name": "bench", "type": "private_group", "id": 1, "messages": [\n')
+        for message_id in range(1, messages + 1):
+            user = rng.choice(users)
+            if rng.random() < share_ratio:
+                # spread shares over many game numbers so most of them create new rows
+                text = rng.choice(shares).replace("#", f"#{rng.randrange(1000)}", 1)
+            else:
+                text = rng.choice(CHATTER)
+            message = {
+                "id": message_id,
+                "type": "message",
+                "date": "2025-08-01T08:00:00",
+                "from": user,
+                "from_id": user,
+                "text": text,
+            }
+            fp.write(("," if message_id > 1 else "") + json.dumps(message, ensure_ascii=False))
+            fp.write("\n")
+        fp.write("]}\n")
+
+
+async def run(messages: int, share_ratio: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        export_path = tmp_path / "result.json"
+        write_export(export_path, messages, share_ratio)
+        await Tortoise.init(
+            db_url=f"sqlite://{tmp_path / 'bench.sqlite3'}", modules={"models": ["orm.models"]}
+        )
+        await Tortoise.generate_schemas()
+        try:
+            start = time.perf_counter()
+            counts = await backfill(
+                export_path, tmp_path / "state.json", progress_every=messages + 1
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            await Tortoise.close_connections()
+    print(
+        f"{counts['messages'] / elapsed:,.0f} messages/s, {counts['plays'] / elapsed:,.0f} plays/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=500_000)
+    parser.add_argument("--share-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.share_ratio))
@@ -0,0 +1,60 @@
+"""
+Benchmark game dispatch over mixed chatter/score traffic.
+
+Compares the linear `str_matches` loop against the single pass `GameDispatcher`.
+
+Usage:
+    python -m benchmarks.bench_dispatch [--messages 100000] [--share-ratio 0.05]
+"""
+
+import argparse
+import random
+import time
+
+from games import GAMES
+from games.dispatch import GameDispatcher
+from tests.game_parsers.samples import CHATTER, SHARES
+
+
+def build_traffic(messages: int, share_ratio: float, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    shares = [text for texts in SHARES.values() for text in texts]
+    return [
+        rng.choice(shares) if rng.random() < share_ratio else rng.choice(CHATTER)
+        for _ in range(messages)
+    ]
+
+
+def linear_dispatch(text: str):
+    for game in GAMES:
+        if game.str_matches(text):
+            return game
+    return None
+
+
+def run(messages: int, share_ratio: float) -> None:
+    traffic = build_traffic(messages, share_ratio)
+    dispatcher = GameDispatcher(GAMES)
+
+    start = time.perf_counter()
+    linear = [linear_dispatch(text) for text in traffic]
+    linear_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [dispatcher.match(text) for text in traffic]
+    indexed_elapsed = time.perf_counter() - start
+
+    assert linear == [found and found[0] for found in indexed]
+    print(f"{messages} messages, {share_ratio:.0%} score shares")
+    print(f"linear str_matches : {messages / linear_elapsed:>12,.0f} msg/s")
+    print(f"dispatch index     : {messages / indexed_elapsed:>12,.0f} msg/s")
+    print(f"speedup            : {linear_elapsed / indexed_elapsed:>12.2f}x")
+    print(f"pre-filter rejected: {dispatcher.rejection_rate:>12.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--share-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+    run(args.messages, args.share_ratio)
@@ -0,0 +1,78 @@
+"""
+Benchmark the score distributions behind /distribution and the standings of /stats.
+
+Seeds a file backed SQLite DB with every user playing every game number of every game, then
+times loading every game's whole history into arrays, the vectorized statistics over them, and
+the cached and uncached standing lookups of one player.
+
+Usage:
+    python -m benchmarks.bench_distribution [--days 1000] [--users 50]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from tortoise import Tortoise
+
+from benchmarks.bench_sqlite_profile import seed
+from games import GAMES
+from games.distribution import DistributionCache, load_distribution, todays_standings
+from orm.sqlite_profile import db_connection_config
+
+END_DATE = date(2025, 10, 1)
+LOOKUPS = 1000
+
+
+async def run(days: int, users: int) -> None:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        await Tortoise.init(
+            config={
+                "connections": {
+                    "default": db_connection_config(f"sqlite://{Path(tmp) / 'bench.sqlite3'}")
+                },
+                "apps": {"models": {"models": ["orm.models"], "default_connection": "default"}},
+            }
+        )
+        await Tortoise.generate_schemas()
+        try:
+            plays = await seed(rng, [f"user{i}" for i in range(users)], days, END_DATE)
+            print(f"seeded {plays:,} plays")
+
+            start = time.perf_counter()
+            distributions = [await load_distribution(game) for game in GAMES]
+            print(f"load history    {(time.perf_counter() - start) * 1000:>10.0f} ms")
+            start = time.perf_counter()
+            for distribution in distributions:
+                distribution.summary()
+                distribution.top_percent(distribution.scores)
+                distribution.z_scores()
+            print(f"statistics      {(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+            start = time.perf_counter()
+            await todays_standings(GAMES, "user0", END_DATE)
+            print(f"standings       {(time.perf_counter() - start) * 1000:>10.2f} ms")
+            cache = DistributionCache()
+            cache.enable()
+            await todays_standings(GAMES, "user0", END_DATE)
+            start = time.perf_counter()
+            for _ in range(LOOKUPS):
+                await todays_standings(GAMES, "user0", END_DATE)
+            elapsed = (time.perf_counter() - start) / LOOKUPS
+            print(f"cached          {elapsed * 1000:>10.3f} ms")
+            cache.disable()
+        finally:
+            await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.days, args.users))
@@ -0,0 +1,105 @@
+"""
+Benchmark collecting today's leaderboard data for all games.
+
+Compares the per game sequential path with concurrent per game queries, the single UNION ALL
+query over the play tables, and the daily_leaderboard table, on a file backed SQLite DB.
+
+Usage:
+    python -m benchmarks.bench_leaderboard [--days 365] [--users 50] [--rounds 500]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from tortoise import Tortoise
+
+from benchmarks.bench_sqlite_profile import seed
+from games import GAMES
+from games.base import LEADERBOARD_SIZE, todays_leaderboards, todays_leaderboards_from_plays
+from orm.sqlite_profile import db_connection_config
+
+END_DATE = date(2025, 10, 1)
+
+
+async def sequential_plays(override_date) -> list[list[dict]]:
+    # what /todays_leaderboard did before daily_leaderboard: one sorted query per game
+    return [
+        await game._get_game_records(
+            game.date_to_game_number(override_date),
+            high_score_first=game.higher_score_first,
+            quantity=LEADERBOARD_SIZE,
+        )
+        for game in GAMES
+    ]
+
+
+async def concurrent_plays(override_date) -> list[list[dict]]:
+    return await asyncio.gather(
+        *(
+            game._get_game_records(
+                game.date_to_game_number(override_date),
+                high_score_first=game.higher_score_first,
+                quantity=LEADERBOARD_SIZE,
+            )
+            for game in GAMES
+        )
+    )
+
+
+async def sequential_todays_data(override_date) -> list[dict]:
+    return [await game.todays_data(override_date=override_date) for game in GAMES]
+
+
+async def union_all(override_date) -> list[dict]:
+    return await todays_leaderboards_from_plays(GAMES, override_date=override_date)
+
+
+async def daily_leaderboard(override_date) -> list[dict]:
+    return await todays_leaderboards(GAMES, override_date=override_date)
+
+
+async def run(days: int, users: int, rounds: int) -> None:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        await Tortoise.init(
+            config={
+                "connections": {
+                    "default": db_connection_config(f"sqlite://{Path(tmp) / 'bench.sqlite3'}")
+                },
+                "apps": {"models": {"models": ["orm.models"], "default_connection": "default"}},
+            }
+        )
+        await Tortoise.generate_schemas()
+        try:
+            await seed(rng, [f"user{i}" for i in range(users)], days, end_date=END_DATE)
+            dates = [END_DATE - timedelta(days=rng.randrange(days)) for _ in range(rounds)]
+            assert await union_all(dates[0]) == await daily_leaderboard(dates[0])
+            print(f"{days} days x {users} users x {len(GAMES)} games, {rounds} rounds")
+            for name, collect in [
+                ("sequential plays queries", sequential_plays),
+                ("concurrent plays queries", concurrent_plays),
+                ("sequential todays_data", sequential_todays_data),
+                ("UNION ALL over plays", union_all),
+                ("daily_leaderboard query", daily_leaderboard),
+            ]:
+                start = time.perf_counter()
+                for override_date in dates:
+                    await collect(override_date)
+                elapsed = time.perf_counter() - start
+                print(f"{name:<25}: {elapsed / rounds * 1000:>7.3f} ms per leaderboard")
+        finally:
+            await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.days, args.users, args.rounds))
@@ -0,0 +1,38 @@
+"""
+Parser microbenchmark reporting parses/sec for every game.
+
+Runs `process_to_dict` over the sample shares used by the tests in tests/game_parsers.
+
+Usage:
+    python -m benchmarks.bench_parsers [--seconds 0.5]
+"""
+
+import argparse
+import time
+
+from tests.game_parsers.samples import SHARES
+
+
+def parses_per_second(game, texts: list[str], seconds: float) -> float:
+    parses = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for text in texts:
+            game.process_to_dict(text)
+        parses += len(texts)
+    return parses / (time.perf_counter() - start)
+
+
+def run(seconds: float) -> None:
+    print(f"{'game':<16}{'parses/sec':>14}")
+    for game, texts in SHARES.items():
+        rate = parses_per_second(game, texts, seconds)
+        print(f"{game.game_type:<16}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=0.5, help="time spent on each game")
+    args = parser.parse_args()
+    run(args.seconds)
@@ -0,0 +1,100 @@
+"""
+Benchmark rating the whole play history, the path of the first start and of tools.ratings.
+
+Seeds a file backed SQLite DB with every user playing every game number of every game, then
+times a full recompute, split into loading the plays and rating them, the longest the event
+loop was held up during it, and one incremental pass that only rates the latest game number.
+
+Usage:
+    python -m benchmarks.bench_ratings [--days 1000] [--users 50]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from tortoise import Tortoise
+
+from benchmarks.bench_sqlite_profile import seed
+from games import GAMES
+from games.ratings import RatingEngine, rate_plays
+from orm.models import RatingProgress
+from orm.sqlite_profile import db_connection_config
+
+END_DATE = date(2025, 10, 1)
+
+
+async def heartbeat(stalls: list[float], interval: float = 0.005) -> None:
+    """
+    Records how late each tick of the event loop was.
+    """
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+
+async def run(days: int, users: int) -> None:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        await Tortoise.init(
+            config={
+                "connections": {
+                    "default": db_connection_config(f"sqlite://{Path(tmp) / 'bench.sqlite3'}")
+                },
+                "apps": {"models": {"models": ["orm.models"], "default_connection": "default"}},
+            }
+        )
+        await Tortoise.generate_schemas()
+        try:
+            # game numbers up to yesterday are closed, today's are left for the incremental pass
+            plays = await seed(rng, [f"user{i}" for i in range(users)], days, END_DATE)
+            print(f"seeded {plays:,} plays")
+            for game in GAMES:
+                game.current_game_number = classmethod(
+                    lambda cls: cls.date_to_game_number(END_DATE)
+                )
+            engine = RatingEngine(GAMES)
+
+            load = rate = 0.0
+            for game in GAMES:
+                connection = game.db_model._meta.db
+                start = time.perf_counter()
+                game_plays = await engine._load_plays(game, connection, "", [])
+                load += time.perf_counter() - start
+                start = time.perf_counter()
+                rate_plays(game_plays, {}, game.higher_score_first)
+                rate += time.perf_counter() - start
+            print(f"load plays      {load * 1000:>10.0f} ms")
+            print(f"rate_plays      {rate * 1000:>10.0f} ms")
+
+            stalls = []
+            ticker = asyncio.create_task(heartbeat(stalls))
+            start = time.perf_counter()
+            await engine.rebuild()
+            print(f"full recompute  {(time.perf_counter() - start) * 1000:>10.0f} ms")
+            ticker.cancel()
+            print(f"longest stall   {max(stalls, default=0) * 1000:>10.0f} ms")
+
+            for game in GAMES:
+                game.current_game_number = classmethod(
+                    lambda cls: cls.date_to_game_number(END_DATE + timedelta(days=1))
+                )
+            start = time.perf_counter()
+            assert await engine.update_once() == len(GAMES)
+            print(f"incremental day {(time.perf_counter() - start) * 1000:>10.1f} ms")
+            assert await RatingProgress.all().count() == len(GAMES)
+        finally:
+            await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.days, args.users))
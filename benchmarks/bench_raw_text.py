@@ -0,0 +1,97 @@
+"""
+Measure DB file size and query time with raw_text inline versus compressed in play_text.
+
+Seeds a file backed DB with realistic share texts, then copies it and runs the play_text
+migration's downgrade on the copy to get the old inline layout. Both are vacuumed, then the
+leaderboard query and a whole row load of a game number are timed on each.
+
+Usage:
+    python -m benchmarks.bench_raw_text [--days 365] [--users 50] [--rounds 2000]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import random
+import shutil
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from tortoise import Tortoise
+
+from benchmarks.bench_sqlite_profile import seed
+from games import GAMES
+
+END_DATE = date(2025, 10, 1)
+MIGRATION = Path(__file__).parent.parent / "migrations/models/3_20251018150000_play_text.py"
+
+
+async def inline_raw_text(db_path: Path) -> None:
+    spec = importlib.util.spec_from_file_location("play_text_migration", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    await Tortoise.init(db_url=f"sqlite://{db_path}", modules={"models": ["orm.models"]})
+    try:
+        connection = Tortoise.get_connection("default")
+        await connection.execute_script(await migration.downgrade(connection))
+    finally:
+        await Tortoise.close_connections()
+
+
+async def measure(db_path: Path, days: int, rounds: int) -> dict[str, float]:
+    rng = random.Random(1)
+    await Tortoise.init(db_url=f"sqlite://{db_path}", modules={"models": ["orm.models"]})
+    try:
+        connection = Tortoise.get_connection("default")
+        await connection.execute_script("VACUUM")
+        queries = []
+        for _ in range(rounds):
+            game = rng.choice(GAMES)
+            queries.append((game, game.date_to_game_number(END_DATE) - rng.randrange(days)))
+        results = {"file MiB": db_path.stat().st_size / 2**20}
+        start = time.perf_counter()
+        for game, game_number in queries:
+            await game._get_game_records(game_number, high_score_first=game.higher_score_first)
+        results["leaderboard ms"] = (time.perf_counter() - start) / rounds * 1000
+        start = time.perf_counter()
+        for game, game_number in queries:
+            await connection.execute_query(
+                f'SELECT * FROM "{game.db_model._meta.db_table}" WHERE "game_number" = ?',
+                [game_number],
+            )
+        results["whole rows ms"] = (time.perf_counter() - start) / rounds * 1000
+    finally:
+        await Tortoise.close_connections()
+    return results
+
+
+async def run(days: int, users: int, rounds: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        compressed_path = Path(tmp) / "compressed.sqlite3"
+        inline_path = Path(tmp) / "inline.sqlite3"
+        await Tortoise.init(
+            db_url=f"sqlite://{compressed_path}", modules={"models": ["orm.models"]}
+        )
+        await Tortoise.generate_schemas()
+        try:
+            plays = await seed(random.Random(0), [f"user{i}" for i in range(users)], days, END_DATE)
+        finally:
+            await Tortoise.close_connections()
+        shutil.copy(compressed_path, inline_path)
+        await inline_raw_text(inline_path)
+
+        print(f"{plays:,} plays over {len(GAMES)} games")
+        for name, path in [("inline raw_text", inline_path), ("play_text", compressed_path)]:
+            results = await measure(path, days, rounds)
+            print(f"{name:<16}: " + ", ".join(f"{v:,.3f} {k}" for k, v in results.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.days, args.users, args.rounds))
@@ -0,0 +1,126 @@
+"""
+Benchmark write and leaderboard read throughput of each SQLite storage profile.
+
+Every profile gets its own file backed DB seeded with `--days` of plays for `--users` players in
+every game up to yesterday, then times new plays of today onwards as single upserts (one
+transaction each, like the handler without the write buffer) and as buffered flushes of 100
+plays, and todays_data leaderboard reads.
+
+Usage:
+    python -m benchmarks.bench_sqlite_profile [--profiles rollback balanced] [--days 730] [--users 50]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from tortoise import Tortoise
+
+from games import GAMES
+from games.base import bulk_update_or_create_records
+from orm.sqlite_profile import SQLITE_PROFILES, db_connection_config
+from tests.game_parsers.samples import play_defaults
+
+
+async def seed(
+    rng: random.Random, users: list[str], days: int, end_date: date | None = None
+) -> int:
+    # game numbers 1 to days, or the days up to end_date when given
+    first_numbers = {
+        game: game.date_to_game_number(end_date) - days if end_date else 0 for game in GAMES
+    }
+    rows = 0
+    for day in range(0, days, 30):
+        records_by_game = {
+            game: [
+                (user, first_numbers[game] + number, play_defaults(game, rng.randrange(200)))
+                for number in range(day + 1, min(day + 30, days) + 1)
+                for user in users
+            ]
+            for game in GAMES
+        }
+        rows += await bulk_update_or_create_records(records_by_game)
+    return rows
+
+
+async def bench_profile(
+    db_path: Path, profile: str, days: int, users: int, writes: int, reads: int
+) -> dict[str, float]:
+    rng = random.Random(0)
+    usernames = [f"user{i}" for i in range(users)]
+    await Tortoise.init(
+        config={
+            "connections": {"default": db_connection_config(f"sqlite://{db_path}", profile)},
+            "apps": {"models": {"models": ["orm.models"], "default_connection": "default"}},
+        }
+    )
+    await Tortoise.generate_schemas()
+    try:
+        # history up to yesterday, so the timed writes are new plays of today onwards and take
+        # the incremental user_stats and rollup path, like shares do in the bot
+        yesterday = date.today() - timedelta(days=1)
+        start = time.perf_counter()
+        seeded = await seed(rng, usernames, days, end_date=yesterday)
+        results = {"seed rows/s": seeded / (time.perf_counter() - start)}
+
+        plays = (
+            (game, username, game.current_game_number() + day)
+            for day in range(writes)
+            for game in GAMES
+            for username in usernames
+        )
+        start = time.perf_counter()
+        for _ in range(writes):
+            game, username, game_number = next(plays)
+            await game.update_or_create_game_record(
+                username, game_number, play_defaults(game, rng.randrange(200))
+            )
+        results["single writes/s"] = writes / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(writes // 100):
+            records_by_game = {game: [] for game in GAMES}
+            for _ in range(100):
+                game, username, game_number = next(plays)
+                records_by_game[game].append(
+                    (username, game_number, play_defaults(game, rng.randrange(200)))
+                )
+            await bulk_update_or_create_records(records_by_game)
+        results["buffered writes/s"] = (writes // 100) * 100 / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(reads):
+            game = rng.choice(GAMES)
+            day = yesterday - timedelta(days=rng.randrange(days))
+            await game.todays_data(override_date=day)
+        results["leaderboard reads/s"] = reads / (time.perf_counter() - start)
+    finally:
+        await Tortoise.close_connections()
+    return results
+
+
+async def run(profiles: list[str], days: int, users: int, writes: int, reads: int) -> None:
+    print(f"{days} days x {users} users x {len(GAMES)} games = {days * users * len(GAMES):,} plays")
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in profiles:
+            results = await bench_profile(
+                Path(tmp) / f"{profile}.sqlite3", profile, days, users, writes, reads
+            )
+            print(f"{profile:>10}: " + ", ".join(f"{v:,.0f} {k}" for k, v in results.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--profiles", nargs="+", choices=list(SQLITE_PROFILES), default=list(SQLITE_PROFILES)
+    )
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.profiles, args.days, args.users, args.writes, args.reads))
@@ -0,0 +1,206 @@
+"""
+Measure how long a restart takes until the bot handles its first update.
+
+Starts `python main.py` in a fresh interpreter, like a deploy does, against a migrated temporary
+database and a fake Telegram Bot API served on localhost through BOT_API_URL. The fake API
+hands out a single score share, and time-to-first-update is the time from spawning the process
+to the bot's reaction to it. The import of main and the first getUpdates are reported too, and
+the schema version check is timed against the generate_schemas call it replaced.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from aerich import Command
+from tortoise import Tortoise
+
+from games.queens import QueensGame
+from orm.schema_version import check_schema_version
+from tests.game_parsers.samples import SHARES
+
+ROOT = Path(__file__).resolve().parent.parent
+TOKEN = "123456:bench"
+# The secret.py written to the temporary directory must win over a real one in the checkout.
+CHILD = (
+    "import sys, time\n"
+    "sys.path.insert(0, {secret_dir!r})\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "print(f'import main: {{time.perf_counter() - start}}', flush=True)\n"
+    "main.start_telegram_agent()\n"
+)
+
+
+class FakeBotAPI:
+    """
+    Just enough of the Bot API for main.py to start, poll and react to one message.
+    """
+
+    def __init__(self):
+        self.events: dict[str, float] = {}
+        self.reacted = asyncio.Event()
+        self.delivered = False
+
+    def reset(self) -> None:
+        self.events = {}
+        self.reacted.clear()
+        self.delivered = False
+
+    async def result(self, method: str):
+        self.events.setdefault(method, time.perf_counter())
+        if method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        if method == "getUpdates":
+            if self.delivered:
+                await asyncio.sleep(0.2)
+                return []
+            self.delivered = True
+            return [
+                {
+                    "update_id": 1,
+                    "message": {
+                        "message_id": 1,
+                        "date": int(time.time()),
+                        "chat": {"id": -100, "type": "group", "title": "bench"},
+                        "from": {"id": 2, "is_bot": False, "first_name": "Bench", "username": "b"},
+                        "text": SHARES[QueensGame][0],
+                    },
+                }
+            ]
+        if method == "setMessageReaction":
+            self.reacted.set()
+        return True
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while head := await reader.readuntil(b"\r\n\r\n"):
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = dict(line.split(": ", 1) for line in header_lines if ": " in line)
+                length = int(headers.get("Content-Length", headers.get("content-length", 0)))
+                await reader.readexactly(length)
+                method = request_line.split()[1].rsplit("/", 1)[-1]
+                body = json.dumps({"ok": True, "result": await self.result(method)}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def migrate(db_path: Path) -> None:
+    config = {
+        "connections": {"default": f"sqlite://{db_path}"},
+        "apps": {"models": {"models": ["orm.models", "aerich.models"]}},
+    }
+    command = Command(tortoise_config=config, app="models", location=str(ROOT / "migrations"))
+    await command.init()
+    await command.upgrade(run_in_transaction=True)
+    await Tortoise.close_connections()
+
+
+async def schema_step(db_path: Path, rounds: int = 20) -> dict[str, float]:
+    await Tortoise.init(db_url=f"sqlite://{db_path}", modules={"models": ["orm.models"]})
+    try:
+        connection = Tortoise.get_connection("default")
+        results = {}
+        for name, step in (
+            ("generate_schemas", lambda: Tortoise.generate_schemas()),
+            ("check_schema_version", lambda: check_schema_version(connection)),
+        ):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await step()
+            results[name] = (time.perf_counter() - start) / rounds
+        return results
+    finally:
+        await Tortoise.close_connections()
+
+
+async def start_once(api: FakeBotAPI, secret_dir: Path, timeout: float) -> dict[str, float]:
+    api.reset()
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        CHILD.format(secret_dir=str(secret_dir)),
+        cwd=ROOT,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    imported = None
+    try:
+        while imported is None:
+            line = await asyncio.wait_for(process.stdout.readline(), timeout)
+            if not line:
+                raise RuntimeError("main.py exited before importing, run it by hand to see why")
+            if line.startswith(b"import main: "):
+                imported = float(line.split(b": ")[1])
+        await asyncio.wait_for(api.reacted.wait(), timeout)
+        return {
+            "import main": imported,
+            "first getUpdates": api.events["getUpdates"] - start,
+            "first update": api.events["setMessageReaction"] - start,
+        }
+    finally:
+        process.send_signal(signal.SIGINT)
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+
+async def run(runs: int, timeout: float) -> None:
+    api = FakeBotAPI()
+    server = await asyncio.start_server(api.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    with tempfile.TemporaryDirectory() as tmp:
+        secret_dir = Path(tmp)
+        db_path = secret_dir / "db.sqlite3"
+        await migrate(db_path)
+        (secret_dir / "secret.py").write_text(
+            f"TOKEN = {TOKEN!r}\n"
+            f"DB_URL = 'sqlite://{db_path}'\n"
+            f"BOT_API_URL = 'http://127.0.0.1:{port}/bot'\n"
+            "BROWSERLESS_URL = 'http://127.0.0.1:9'\n"
+        )
+        schema = await schema_step(db_path)
+        print(
+            f"schema step: generate_schemas {schema['generate_schemas'] * 1000:.2f} ms, "
+            f"check_schema_version {schema['check_schema_version'] * 1000:.2f} ms"
+        )
+        samples = []
+        async with server:
+            for _ in range(runs):
+                samples.append(await start_once(api, secret_dir, timeout))
+    print(f"{'step':<20}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for step in samples[0]:
+        values = [sample[step] * 1000 for sample in samples]
+        print(
+            f"{step:<20}{statistics.median(values):>12.0f}{min(values):>10.0f}{max(values):>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30, help="seconds per start")
+    args = parser.parse_args()
+    os.chdir(ROOT)
+    asyncio.run(run(args.runs, args.timeout))
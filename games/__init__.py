@@ -0,0 +1,18 @@
+from games.connections import ConnectionsGame
+from games.crossclimb import CrossClimbGame
+from games.mini_crossword import MiniCrosswordGame
+from games.mini_sudoku import MiniSudokuGame
+from games.queens import QueensGame
+from games.tango import TangoGame
+from games.zip import ZipGame
+
+# Registered games, in the order they are shown on the leaderboard.
+GAMES = [
+    ConnectionsGame,
+    QueensGame,
+    TangoGame,
+    ZipGame,
+    MiniCrosswordGame,
+    MiniSudokuGame,
+    CrossClimbGame,
+]
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Iterable, Type
+
+from tortoise.transactions import in_transaction
+
+from games.base import Game
+from orm.models import PlayText
+
+logger = logging.getLogger(__name__)
+
+
+class PlayArchiver:
+    """
+    Moves plays of game numbers older than a horizon from the hot play tables to the archive
+    tables, so the hot tables and their indexes only hold recent game numbers.
+
+    Plays keep their id, so their share text in play_text still applies. Every batch is its own
+    short transaction, with a pause in between, so the bot's own writes are never held up for
+    longer than one batch. Reads of closed game numbers look in both tables, see
+    `Game._plays_sql` and `Game._get_game_records`.
+    """
+
+    def __init__(
+        self,
+        games: Iterable[Type[Game]],
+        horizon_days: int = 30,
+        interval: float = 3600,
+        batch_size: int = 500,
+        pause: float = 0.05,
+    ):
+        if horizon_days < 1:
+            raise ValueError("The horizon must be at least one day, today's plays stay hot.")
+        self.games = [game for game in games if game.archive_model is not None]
+        self.horizon_days = horizon_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.counters = Counter(moved=0, batches=0, runs=0)
+        self.max_batch_seconds = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def archive_game(self, game: Type[Game], before_game_number: int) -> int:
+        """
+        Moves every play of a game with a game number below before_game_number, in batches.
+        Args:
+            game (Type[Game]): The game to archive.
+            before_game_number (int): The first game number that stays in the hot table.
+        Returns:
+            int: The number of plays moved.
+        """
+        hot = game.db_model._meta.db_table
+        archive = game.archive_model._meta.db_table
+        columns = ", ".join(
+            f'"{column}"' for column in game.db_model._meta.fields_db_projection.values()
+        )
+        moved, last_id = 0, 0
+        while True:
+            start = time.perf_counter()
+            async with in_transaction() as connection:
+                # paged by primary key, so a batch reads on from the last one instead of
+                # scanning and sorting the whole hot table
+                _, rows = await connection.execute_query(
+                    f'SELECT "id" FROM "{hot}" WHERE "id" > ? AND "game_number" < ? '
+                    'ORDER BY "id" LIMIT ?',
+                    [last_id, before_game_number, self.batch_size],
+                )
+                if rows:
+                    ids = [row["id"] for row in rows]
+                    in_sql = f'"id" IN ({", ".join("?" * len(ids))})'
+                    # a resubmitted play replaces the one archived for the same game number,
+                    # whose share text goes with it
+                    await connection.execute_query(
+                        f'DELETE FROM "{PlayText._meta.db_table}" WHERE "game_type" = ? '
+                        'AND "play_id" IN ('
+                        f'SELECT "a"."id" FROM "{archive}" AS "a" JOIN "{hot}" AS "h" '
+                        'ON "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" '
+                        'AND "h"."game_number" = "a"."game_number" '
+                        f'WHERE "h".{in_sql} AND "a"."id" != "h"."id")',
+                        [game.game_type, *ids],
+                    )
+                    await connection.execute_query(
+                        f'INSERT OR REPLACE INTO "{archive}" ({columns}) '
+                        f'SELECT {columns} FROM "{hot}" WHERE {in_sql}',
+                        ids,
+                    )
+                    await connection.execute_query(f'DELETE FROM "{hot}" WHERE {in_sql}', ids)
+            if not rows:
+                return moved
+            last_id = rows[-1]["id"]
+            self.max_batch_seconds = max(self.max_batch_seconds, time.perf_counter() - start)
+            self.counters["batches"] += 1
+            self.counters["moved"] += len(rows)
+            moved += len(rows)
+            await asyncio.sleep(self.pause)
+
+    async def archive_once(self) -> int:
+        """
+        Archives the closed game numbers of every game that are older than the horizon.
+        Returns:
+            int: The number of plays moved.
+        """
+        moved = 0
+        for game in self.games:
+            before = game.current_game_number() - self.horizon_days
+            moved += await self.archive_game(game, before)
+        self.counters["runs"] += 1
+        return moved
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                moved = await self.archive_once()
+                if moved:
+                    logger.info(
+                        "Archived %d plays, longest batch %.1f ms",
+                        moved,
+                        self.max_batch_seconds * 1000,
+                    )
+            except Exception:
+                logger.exception("Archiving plays failed, will retry")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Starts archiving in the background every interval seconds.
+        Must be called from a running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,8 +1,47 @@
+from __future__ import annotations
+
 import re
-from datetime import date
-from typing import Type
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Callable, Iterable, Type
+
+from tortoise import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
+
+from games.periods import ROLLUPS, Rollup
+from orm.models import (
+    DEFAULT_CHAT_ID,
+    DailyLeaderboard,
+    Play,
+    PlayerRating,
+    PlayText,
+    UserStats,
+)
+from orm.raw_text import compress_text, decompress_text
+
+if TYPE_CHECKING:
+    from games.distribution import DistributionCache
+    from games.leaderboard_cache import LeaderboardCache
+    from games.write_buffer import SubmissionBuffer
 
-from orm.models import Play
+# Rows per multi-row upsert statement, well below SQLite's bound parameter limit.
+UPSERT_CHUNK_SIZE = 500
+# Players shown on a leaderboard.
+LEADERBOARD_SIZE = 10
+# Plays kept per chat and game number in daily_leaderboard, refreshed by every upsert, and in
+# the leaderboard cache it fills. The rows past LEADERBOARD_SIZE refill the top when a pending
+# write from the write buffer pushes a stored player down.
+DAILY_LEADERBOARD_DEPTH = 25
+# Counters of user_stats, each counts the plays that have the play field of the same name set.
+USER_STATS_COUNTS = ("flawless", "won")
+USER_STATS_TOTALS = ("plays", "score_sum", "min_score", "max_score", *USER_STATS_COUNTS)
+# Streaks of consecutive game numbers, current_streak being the one ending at last_game_number.
+USER_STATS_STREAKS = ("last_game_number", "current_streak", "longest_streak")
+# Orders of the week and month leaderboards.
+PERIOD_RANKINGS = ("total", "average", "days")
+USER_STATS_COLUMNS_SQL = ", ".join(
+    f'"{column}"'
+    for column in ("chat_id", "username", "game_type", *USER_STATS_TOTALS, *USER_STATS_STREAKS)
+)
 
 
 class SingletonMeta(type):
@@ -18,7 +57,39 @@ class Game(metaclass=SingletonMeta):
     start_date: date = date(1997, 8, 29)
     game_type: str = "base"
     db_model: Type[Play]
+    # Plays of closed game numbers are moved here by games.archive.PlayArchiver.
+    archive_model: Type[Play] | None = None
     higher_score_first: bool = True
+    # Play fields counted in user_stats, out of USER_STATS_COUNTS.
+    stats_counts: tuple[str, ...] = ()
+    # Anchored games can only appear at the start of a message, others anywhere in it.
+    dispatch_anchored: bool = True
+    # Literal text that every share of this game contains, used to cheaply reject chatter.
+    dispatch_anchor: str = " #"
+    # Parsers never look further than this many characters past the start of the share.
+    parse_window: int = 1024
+    # Compiled once per subclass by compile_patterns.
+    dispatch_pattern: re.Pattern
+    parse_pattern: re.Pattern
+    # Set while a write-behind buffer is running, so reads can include pending submissions.
+    write_buffer: SubmissionBuffer | None = None
+    # Set while an in-memory leaderboard cache is enabled, reads and writes keep it current.
+    leaderboard_cache: LeaderboardCache | None = None
+    # Set while a score distribution cache is enabled, writes drop its stale entries.
+    distribution_cache: DistributionCache | None = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.compile_patterns()
+
+    @classmethod
+    def compile_patterns(cls) -> None:
+        """
+        Compiles the regexes used to dispatch and parse this game's share text.
+        Called once for every subclass when the class is defined.
+        """
+        cls.dispatch_pattern = re.compile(cls.dispatch_regex())
+        cls.parse_pattern = re.compile(cls.parse_regex())
 
     @classmethod
     def str_matches(cls, input_text: str) -> bool:
@@ -29,6 +100,29 @@ class Game(metaclass=SingletonMeta):
         Returns:
             bool: True if the game type is found in the input text, False otherwise.
         """
+        if cls.dispatch_anchored:
+            return cls.dispatch_pattern.match(input_text) is not None
+        return cls.dispatch_pattern.search(input_text) is not None
+
+    @classmethod
+    def dispatch_regex(cls) -> str:
+        """
+        Returns the regex that identifies the start of this game's share text.
+        Used by the dispatch index to pick the game for a message in a single pass.
+        Returns:
+            str: The regex source. It must not contain named groups.
+        """
+        raise NotImplementedError("This method should be implemented in subclasses.")
+
+    @classmethod
+    def parse_regex(cls) -> str:
+        """
+        Returns the regex that extracts the game information from the share text.
+        It is only run over parse_window characters, and should use possessive quantifiers
+        so a failed match cannot backtrack.
+        Returns:
+            str: The regex source.
+        """
         raise NotImplementedError("This method should be implemented in subclasses.")
 
     @classmethod
@@ -51,9 +145,28 @@ class Game(metaclass=SingletonMeta):
         delta = request_date - cls.start_date
         return delta.days + 1
 
+    @classmethod
+    def game_number_to_date(cls, game_number: int) -> date:
+        """
+        The day of a game number, the inverse of date_to_game_number.
+        """
+        return cls.start_date + timedelta(days=game_number - 1)
+
+    @classmethod
+    def current_game_number(cls) -> int:
+        """
+        Today's game number. Only it can still get new plays, earlier ones are closed.
+        """
+        return cls.date_to_game_number(request_date=date.today())
+
     @classmethod
     async def parse_text(
-        cls, text: str, username: str, no_db=False
+        cls,
+        text: str,
+        username: str,
+        no_db=False,
+        start: int = 0,
+        chat_id: int = DEFAULT_CHAT_ID,
     ) -> tuple[str, dict[str, str | int]]:
         """
         Extracts and formats Connections game information from a given text.
@@ -61,13 +174,15 @@ class Game(metaclass=SingletonMeta):
             text (str): The input text containing Connections game information.
             username (str): The username of the player.
             no_db (bool): If True, does not save to the database.
+            start (int): Position in the text where the dispatcher found the game.
+            chat_id (int): The chat the play was shared in.
         Returns:
             tuple[str, dict[str, str | int]]: A tuple containing a response string and a JSON-like
                 dictionary with game details.
 
         """
         try:
-            data = cls.process_to_dict(text)
+            data = cls.process_to_dict(text, start=start)
         except ValueError as e:
             return str(e), {}
 
@@ -78,6 +193,7 @@ class Game(metaclass=SingletonMeta):
             game_number=data["game_number"],
             defaults=cls.get_update_defaults(data),
             no_db=no_db,
+            chat_id=chat_id,
         )
 
         resp_string = f"{'(UPDATING RECORD) ' if not is_new and not no_db else ''}{cls.game_type.title()} Game #{data['game_number']} completed with score {data['score']} by {username}."
@@ -91,32 +207,68 @@ class Game(metaclass=SingletonMeta):
         high_score_first=True,
         values: list[str] = ["username", "score"],
         quantity: int = 10,
+        chat_id: int = DEFAULT_CHAT_ID,
     ) -> list[dict[str, str | int]]:
         """
-        Get all game records for a specific game number.
+        Get all game records of a chat for a specific game number.
+        Closed game numbers also look in the archive table.
         """
-        return (
-            await cls.db_model.filter(game_number=game_number)
-            .order_by("-score" if high_score_first else "score")[:quantity]
-            .values(*values)
+        ordering = ("-score" if high_score_first else "score", "id")
+        if cls.archive_model is None or game_number >= cls.current_game_number():
+            return (
+                await cls.db_model.filter(chat_id=chat_id, game_number=game_number)
+                .order_by(*ordering)[:quantity]
+                .values(*values)
+            )
+        fields = list(dict.fromkeys(["id", "username", "score", *values]))
+        records = (
+            await cls.db_model.filter(chat_id=chat_id, game_number=game_number)
+            .order_by(*ordering)[:quantity]
+            .values(*fields)
         )
+        # a play resubmitted after its game number was archived overrides the archived one
+        usernames = {record["username"] for record in records}
+        records += [
+            record
+            for record in await cls.archive_model.filter(chat_id=chat_id, game_number=game_number)
+            .order_by(*ordering)[: quantity + len(usernames)]
+            .values(*fields)
+            if record["username"] not in usernames
+        ]
+        sign = -1 if high_score_first else 1
+        records.sort(key=lambda record: (sign * record["score"], record["id"]))
+        return [{value: record[value] for value in values} for record in records[:quantity]]
 
     @classmethod
-    async def todays_data(cls, override_date=None) -> dict:
+    def _leaderboard_data(
+        cls, game_number: int, leaderboard: list[dict], chat_id: int = DEFAULT_CHAT_ID
+    ) -> dict:
         """
-        Current day's leaderboard for Connections game.
-        Show top 10 players by score.
+        Builds the leaderboard response from ranked rows, with pending writes merged in.
+        Args:
+            game_number (int): The game number of the leaderboard.
+            leaderboard (list[dict]): Ranked username and score rows.
+            chat_id (int): The chat of the leaderboard.
+        Returns:
+            dict: The game type, game number and top players, or {} if nobody played.
         """
-        my_date = override_date or date.today()
-        today_game_number = cls.date_to_game_number(request_date=my_date)
-        leaderboard = await cls._get_game_records(
-            today_game_number, high_score_first=cls.higher_score_first, quantity=10
-        )
+        pending = []
+        if Game.write_buffer:
+            pending = Game.write_buffer.pending_records(cls, game_number, chat_id)
+        if pending:
+            scores = {entry["username"]: entry["score"] for entry in leaderboard}
+            scores.update((username, defaults["score"]) for username, defaults in pending)
+            leaderboard = sorted(
+                ({"username": username, "score": score} for username, score in scores.items()),
+                key=lambda entry: entry["score"],
+                reverse=cls.higher_score_first,
+            )
+        leaderboard = leaderboard[:LEADERBOARD_SIZE]
         if not leaderboard:
             return {}
         resp = {
             "game_type": cls.game_type,
-            "game_number": today_game_number,
+            "game_number": game_number,
             "leaderboard": [],
         }
         for entry in leaderboard:
@@ -128,25 +280,940 @@ class Game(metaclass=SingletonMeta):
             )
         return resp
 
+    @classmethod
+    async def todays_data(cls, override_date=None, chat_id: int = DEFAULT_CHAT_ID) -> dict:
+        """
+        Current day's leaderboard for Connections game in a chat.
+        Show top 10 players by score.
+        """
+        [data] = await todays_leaderboards([cls], override_date, chat_id)
+        return data
+
+    @classmethod
+    async def rating_data(cls, chat_id: int = DEFAULT_CHAT_ID) -> dict:
+        """
+        The rating leaderboard of a chat, the long-run counterpart of todays_data.
+        """
+        [data] = await rating_leaderboards([cls], chat_id)
+        return data
+
+    @classmethod
+    def _plays_sql(
+        cls,
+        where_sql: str = "",
+        params: Iterable = (),
+        archived: bool = True,
+        extra_columns: Iterable[str] = (),
+    ) -> tuple[str, list]:
+        """
+        Returns a query over the plays matching where_sql, for use as a subquery.
+        Archived plays are included when archived is set, except the ones that were resubmitted
+        after being archived. Columns are id, chat_id, game_number, username, score and
+        extra_columns.
+        Args:
+            where_sql (str): A WHERE clause on unqualified columns, or "".
+            params (Iterable): The parameters of where_sql.
+            archived (bool): Whether to include the archive table.
+            extra_columns (Iterable[str]): Other play columns to select.
+        Returns:
+            tuple[str, list]: The query and its parameters.
+        """
+        columns = ", ".join(
+            f'"{column}"'
+            for column in ("id", "chat_id", "game_number", "username", "score", *extra_columns)
+        )
+        hot = cls.db_model._meta.db_table
+        sql = f'SELECT {columns} FROM "{hot}" {where_sql}'
+        if not archived or cls.archive_model is None:
+            return sql, list(params)
+        sql += (
+            f' UNION ALL SELECT {columns} FROM "{cls.archive_model._meta.db_table}" AS "a" '
+            f"{where_sql} {'AND' if where_sql else 'WHERE'} NOT EXISTS ("
+            f'SELECT 1 FROM "{hot}" AS "h" '
+            'WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" '
+            'AND "h"."game_number" = "a"."game_number")'
+        )
+        return sql, [*params, *params]
+
+    @classmethod
+    def _ranked_plays_sql(
+        cls, where_sql: str = "", params: Iterable = (), archived: bool = True
+    ) -> tuple[str, list]:
+        """
+        Returns a query ranking the plays of every chat and game number in where_sql, keeping
+        the top DAILY_LEADERBOARD_DEPTH of each. Ties go to whoever was recorded first.
+        Columns are chat_id, game_number, rank, play_id, username and score.
+        """
+        order = "DESC" if cls.higher_score_first else "ASC"
+        plays_sql, params = cls._plays_sql(where_sql, params, archived)
+        return (
+            'SELECT "chat_id", "game_number", "rank", "id" AS "play_id", "username", "score" FROM ('
+            'SELECT "id", "chat_id", "game_number", "username", "score", ROW_NUMBER() OVER ('
+            f'PARTITION BY "chat_id", "game_number" ORDER BY "score" {order}, "id") AS "rank" '
+            f"FROM ({plays_sql})"
+            f') WHERE "rank" <= {DAILY_LEADERBOARD_DEPTH}'
+        ), params
+
+    @classmethod
+    async def refresh_daily_leaderboard(
+        cls,
+        game_numbers: Iterable[int] | None,
+        connection: BaseDBAsyncClient,
+        chat_id: int = DEFAULT_CHAT_ID,
+    ) -> None:
+        """
+        Recomputes the daily_leaderboard rows of some game numbers of a chat from the play
+        tables. Each game number is an index range scan on (chat_id, game_number, score), so
+        this is cheap enough to run after every upsert.
+        Args:
+            game_numbers (Iterable[int] | None): The game numbers to refresh, None for every
+                game number of every chat.
+            connection (BaseDBAsyncClient): Connection or transaction to write with, normally
+                the one that just wrote the plays.
+            chat_id (int): The chat to refresh, ignored when game_numbers is None.
+        """
+        table = DailyLeaderboard._meta.db_table
+        columns = '"game_type", "chat_id", "game_number", "rank", "play_id", "username", "score"'
+        if game_numbers is None:
+            await connection.execute_query(
+                f'DELETE FROM "{table}" WHERE "game_type" = ?', [cls.game_type]
+            )
+            ranked_sql, params = cls._ranked_plays_sql()
+            await connection.execute_query(
+                f'INSERT INTO "{table}" ({columns}) SELECT ?, * FROM ({ranked_sql})',
+                [cls.game_type, *params],
+            )
+            return
+        game_numbers = sorted(set(game_numbers))
+        for offset in range(0, len(game_numbers), UPSERT_CHUNK_SIZE):
+            chunk = game_numbers[offset : offset + UPSERT_CHUNK_SIZE]
+            where_sql = f'"chat_id" = ? AND "game_number" IN ({", ".join("?" * len(chunk))})'
+            await connection.execute_query(
+                f'DELETE FROM "{table}" WHERE "game_type" = ? AND {where_sql}',
+                [cls.game_type, chat_id, *chunk],
+            )
+            # today's plays are never archived, only late plays for closed games need the archive
+            ranked_sql, params = cls._ranked_plays_sql(
+                f"WHERE {where_sql}",
+                [chat_id, *chunk],
+                archived=chunk[0] < cls.current_game_number(),
+            )
+            await connection.execute_query(
+                f'INSERT INTO "{table}" ({columns}) SELECT ?, * FROM ({ranked_sql})',
+                [cls.game_type, *params],
+            )
+
+    @classmethod
+    def _user_stats_sql(cls, where_sql: str = "", params: Iterable = ()) -> tuple[str, list]:
+        """
+        Returns a query totalling the plays matching where_sql by chat and player, archived ones
+        included. Columns are chat_id, username, game_type, USER_STATS_TOTALS and
+        USER_STATS_STREAKS.
+        Streaks are runs of consecutive game numbers: game_number minus its position in the
+        player's plays is the same for every play of a run, so grouping by it finds each run.
+        """
+        plays_sql, params = cls._plays_sql(where_sql, params, extra_columns=cls.stats_counts)
+        run_counts = ", ".join(
+            f'SUM("{count}") AS "{count}"' if count in cls.stats_counts else f'0 AS "{count}"'
+            for count in USER_STATS_COUNTS
+        )
+        runs_sql = (
+            'SELECT "chat_id", "username", COUNT(*) AS "plays", SUM("score") AS "score_sum", '
+            'MIN("score") AS "min_score", MAX("score") AS "max_score", '
+            f'{run_counts}, MAX("game_number") AS "last_game_number", ROW_NUMBER() OVER ('
+            'PARTITION BY "chat_id", "username" ORDER BY MAX("game_number") DESC) AS "recency" '
+            'FROM (SELECT *, "game_number" - ROW_NUMBER() OVER ('
+            'PARTITION BY "chat_id", "username" ORDER BY "game_number") AS "run" '
+            f'FROM ({plays_sql})) GROUP BY "chat_id", "username", "run"'
+        )
+        counts = ", ".join(f'SUM("{count}")' for count in USER_STATS_COUNTS)
+        return (
+            'SELECT "chat_id", "username", ?, SUM("plays"), SUM("score_sum"), MIN("min_score"), '
+            f'MAX("max_score"), {counts}, MAX("last_game_number"), '
+            'MAX(CASE WHEN "recency" = 1 THEN "plays" ELSE 0 END), MAX("plays") '
+            f'FROM ({runs_sql}) GROUP BY "chat_id", "username"'
+        ), [cls.game_type, *params]
+
+    @classmethod
+    async def refresh_user_stats(
+        cls,
+        usernames: Iterable[str] | None,
+        connection: BaseDBAsyncClient,
+        chat_id: int = DEFAULT_CHAT_ID,
+    ) -> None:
+        """
+        Recomputes the user_stats rows of some players of a chat from all of their plays. Each
+        player is an index range scan on (chat_id, username, game_number) of the hot and archive
+        tables.
+        Args:
+            usernames (Iterable[str] | None): The players to refresh, None for every player of
+                every chat.
+            connection (BaseDBAsyncClient): Connection or transaction to write with, normally
+                the one that just wrote the plays.
+            chat_id (int): The chat to refresh, ignored when usernames is None.
+        """
+        table = UserStats._meta.db_table
+        if usernames is None:
+            await connection.execute_query(
+                f'DELETE FROM "{table}" WHERE "game_type" = ?', [cls.game_type]
+            )
+            stats_sql, params = cls._user_stats_sql()
+            await connection.execute_query(
+                f'INSERT INTO "{table}" ({USER_STATS_COLUMNS_SQL}) {stats_sql}', params
+            )
+            return
+        updates = ", ".join(
+            f'"{column}" = excluded."{column}"'
+            for column in (*USER_STATS_TOTALS, *USER_STATS_STREAKS)
+        )
+        usernames = sorted(set(usernames))
+        for offset in range(0, len(usernames), UPSERT_CHUNK_SIZE):
+            chunk = usernames[offset : offset + UPSERT_CHUNK_SIZE]
+            stats_sql, params = cls._user_stats_sql(
+                f'WHERE "chat_id" = ? AND "username" IN ({", ".join("?" * len(chunk))})',
+                [chat_id, *chunk],
+            )
+            # SQLite needs the WHERE to tell an upsert's ON CONFLICT from a join constraint
+            await connection.execute_query(
+                f'INSERT INTO "{table}" ({USER_STATS_COLUMNS_SQL}) '
+                f"SELECT * FROM ({stats_sql}) WHERE true "
+                f'ON CONFLICT ("chat_id", "username", "game_type") DO UPDATE SET {updates}',
+                params,
+            )
+
+    @classmethod
+    async def _update_user_stats(
+        cls,
+        rows: list[dict[str, str | int]],
+        upserted: dict[tuple[str, int], tuple[int, bool]],
+        connection: BaseDBAsyncClient,
+        chat_id: int,
+    ) -> None:
+        """
+        Applies written rows of a chat to user_stats. New plays of open game numbers past the
+        player's last one are added to their totals and extend or restart their streak.
+        Corrected plays, late plays that may replace an archived one, and plays before the
+        player's last game number, which can join two streaks, have their player's stats
+        recomputed instead.
+        """
+        current_game_number = cls.current_game_number()
+        added, changed = {}, set()
+        for row in rows:
+            username = row["username"]
+            _, is_new = upserted[(username, row["game_number"])]
+            if not is_new or row["game_number"] < current_game_number:
+                changed.add(username)
+            else:
+                added.setdefault(username, []).append(row)
+        # recomputing already includes whatever else the player just added
+        usernames = [username for username in added if username not in changed]
+        table = UserStats._meta.db_table
+        updates = ", ".join(
+            [
+                '"plays" = "plays" + excluded."plays"',
+                '"score_sum" = "score_sum" + excluded."score_sum"',
+                '"min_score" = MIN("min_score", excluded."min_score")',
+                '"max_score" = MAX("max_score", excluded."max_score")',
+                *(f'"{count}" = "{count}" + excluded."{count}"' for count in USER_STATS_COUNTS),
+                *(f'"{column}" = excluded."{column}"' for column in USER_STATS_STREAKS),
+            ]
+        )
+        streak_sql = ", ".join(f'"{column}"' for column in USER_STATS_STREAKS)
+        for offset in range(0, len(usernames), UPSERT_CHUNK_SIZE):
+            chunk = usernames[offset : offset + UPSERT_CHUNK_SIZE]
+            _, stored = await connection.execute_query(
+                f'SELECT "username", {streak_sql} FROM "{table}" WHERE "chat_id" = ? '
+                f'AND "game_type" = ? AND "username" IN ({", ".join("?" * len(chunk))})',
+                [chat_id, cls.game_type, *chunk],
+            )
+            streaks = {row["username"]: tuple(row)[1:] for row in stored}
+            values = []
+            for username in chunk:
+                plays = sorted(added[username], key=lambda row: row["game_number"])
+                last, current, longest = streaks.get(username, (None, 0, 0))
+                if last is not None and plays[0]["game_number"] <= last:
+                    changed.add(username)
+                    continue
+                for row in plays:
+                    continues = last is not None and row["game_number"] == last + 1
+                    current = current + 1 if continues else 1
+                    longest = max(longest, current)
+                    last = row["game_number"]
+                scores = [row["score"] for row in plays]
+                counts = (
+                    sum(bool(row[count]) for row in plays) if count in cls.stats_counts else 0
+                    for count in USER_STATS_COUNTS
+                )
+                values.append(
+                    (chat_id, username, cls.game_type, len(scores), sum(scores), min(scores))
+                    + (max(scores), *counts, last, current, longest)
+                )
+            if values:
+                placeholders = f"({', '.join('?' * len(values[0]))})"
+                await connection.execute_query(
+                    f'INSERT INTO "{table}" ({USER_STATS_COLUMNS_SQL}) '
+                    f"VALUES {', '.join([placeholders] * len(values))} "
+                    f'ON CONFLICT ("chat_id", "username", "game_type") DO UPDATE SET {updates}',
+                    [value for row in values for value in row],
+                )
+        if changed:
+            await cls.refresh_user_stats(changed, connection, chat_id)
+
+    @classmethod
+    def _stats_data(cls, row: dict[str, str | int]) -> dict:
+        """
+        Turns a user_stats row into the stats shown for this game. A streak is only current
+        while its last game number is today's or yesterday's.
+        """
+        best, worst = row["max_score"], row["min_score"]
+        if not cls.higher_score_first:
+            best, worst = worst, best
+        current = row["last_game_number"] >= cls.current_game_number() - 1
+        return {
+            "game_type": cls.game_type,
+            "plays": row["plays"],
+            "best": best,
+            "worst": worst,
+            "average": row["score_sum"] / row["plays"],
+            "counts": {count: row[count] for count in cls.stats_counts},
+            "streak": row["current_streak"] if current else 0,
+            "longest_streak": row["longest_streak"],
+        }
+
+    @classmethod
+    async def _store_rollup(
+        cls,
+        rollup: Rollup,
+        totals: dict[tuple[int, int, str], list[int]],
+        connection: BaseDBAsyncClient,
+        add: bool,
+    ) -> None:
+        """
+        Writes (chat_id, period, username) totals of plays and score sum to a rollup table,
+        adding them to the stored ones if add is set and replacing them otherwise.
+        """
+        if add:
+            updates = (
+                '"plays" = "plays" + excluded."plays", '
+                '"score_sum" = "score_sum" + excluded."score_sum"'
+            )
+        else:
+            updates = '"plays" = excluded."plays", "score_sum" = excluded."score_sum"'
+        items = list(totals.items())
+        for offset in range(0, len(items), UPSERT_CHUNK_SIZE):
+            chunk = items[offset : offset + UPSERT_CHUNK_SIZE]
+            await connection.execute_query(
+                f'INSERT INTO "{rollup.model._meta.db_table}" '
+                '("game_type", "chat_id", "period", "username", "plays", "score_sum") '
+                f"VALUES {', '.join(['(?, ?, ?, ?, ?, ?)'] * len(chunk))} "
+                'ON CONFLICT ("game_type", "chat_id", "period", "username") '
+                f"DO UPDATE SET {updates}",
+                [
+                    value
+                    for (chat_id, period, username), (plays, score_sum) in chunk
+                    for value in (cls.game_type, chat_id, period, username, plays, score_sum)
+                ],
+            )
+
+    @classmethod
+    async def _rollup_totals(
+        cls,
+        rollup: Rollup,
+        keys: set[tuple[int, str]] | None,
+        connection: BaseDBAsyncClient,
+        chat_id: int = DEFAULT_CHAT_ID,
+    ) -> dict[tuple[int, int, str], list[int]]:
+        """
+        Totals the plays of (period, username) rows of a chat, or of every row of every chat
+        when keys is None, archived plays included. Periods are worked out in Python, so this
+        does not depend on the date functions of the database.
+        Returns:
+            dict[tuple[int, int, str], list[int]]: Maps (chat_id, period, username) to the
+                number of plays and their score sum.
+        """
+        if keys is None:
+            queries = [cls._plays_sql()]
+        else:
+            days = [rollup.days_of(period) for period in {period for period, _ in keys}]
+            first = cls.date_to_game_number(min(first for first, _ in days))
+            last = cls.date_to_game_number(max(last for _, last in days))
+            usernames = sorted({username for _, username in keys})
+            queries = [
+                cls._plays_sql(
+                    'WHERE "chat_id" = ? AND "game_number" BETWEEN ? AND ? '
+                    f'AND "username" IN ({", ".join("?" * len(chunk))})',
+                    [chat_id, first, last, *chunk],
+                )
+                for chunk in (
+                    usernames[offset : offset + UPSERT_CHUNK_SIZE]
+                    for offset in range(0, len(usernames), UPSERT_CHUNK_SIZE)
+                )
+            ]
+        totals = {}
+        for plays_sql, params in queries:
+            _, plays = await connection.execute_query(
+                f'SELECT "chat_id", "username", "game_number", "score" FROM ({plays_sql})', params
+            )
+            for play in plays:
+                period = rollup.period_of(cls.game_number_to_date(play["game_number"]))
+                if keys is not None and (period, play["username"]) not in keys:
+                    continue
+                row = totals.setdefault((play["chat_id"], period, play["username"]), [0, 0])
+                row[0] += 1
+                row[1] += play["score"]
+        return totals
+
+    @classmethod
+    async def refresh_rollup(
+        cls,
+        rollup: Rollup,
+        keys: Iterable[tuple[int, str]] | None,
+        connection: BaseDBAsyncClient,
+        chat_id: int = DEFAULT_CHAT_ID,
+    ) -> None:
+        """
+        Recomputes rows of a rollup table from the plays of their periods.
+        Args:
+            rollup (Rollup): The rollup table, see games.periods.
+            keys (Iterable[tuple[int, str]] | None): The (period, username) rows of the chat to
+                refresh, None for every row of every chat.
+            connection (BaseDBAsyncClient): Connection or transaction to write with.
+            chat_id (int): The chat to refresh, ignored when keys is None.
+        """
+        if keys is None:
+            await connection.execute_query(
+                f'DELETE FROM "{rollup.model._meta.db_table}" WHERE "game_type" = ?',
+                [cls.game_type],
+            )
+        else:
+            keys = set(keys)
+        totals = await cls._rollup_totals(rollup, keys, connection, chat_id)
+        await cls._store_rollup(rollup, totals, connection, add=False)
+
+    @classmethod
+    async def _update_rollup(
+        cls,
+        rollup: Rollup,
+        rows: list[dict[str, str | int]],
+        upserted: dict[tuple[str, int], tuple[int, bool]],
+        connection: BaseDBAsyncClient,
+        chat_id: int,
+    ) -> None:
+        """
+        Applies written rows of a chat to a rollup table, the same way as _update_user_stats:
+        new plays of open game numbers are added, the periods of other plays are recomputed.
+        """
+        current_game_number = cls.current_game_number()
+        added, changed = {}, set()
+        for row in rows:
+            username, game_number = row["username"], row["game_number"]
+            period = rollup.period_of(cls.game_number_to_date(game_number))
+            _, is_new = upserted[(username, game_number)]
+            if not is_new or game_number < current_game_number:
+                changed.add((period, username))
+                continue
+            totals = added.setdefault((chat_id, period, username), [0, 0])
+            totals[0] += 1
+            totals[1] += row["score"]
+        # recomputing already includes whatever else the player just added to the period
+        added = {key: totals for key, totals in added.items() if key[1:] not in changed}
+        await cls._store_rollup(rollup, added, connection, add=True)
+        if changed:
+            await cls.refresh_rollup(rollup, changed, connection, chat_id)
+
+    @classmethod
+    def _period_sort_key(cls, ranking: str) -> Callable[[dict], tuple]:
+        """
+        Orders period leaderboard rows for one of PERIOD_RANKINGS. When lower scores are better,
+        a lower total time only counts between players who played as many days.
+        """
+        sign = -1 if cls.higher_score_first else 1
+        if ranking == "average":
+            return lambda row: (sign * row["average"], -row["days"], row["username"])
+        if ranking == "days":
+            return lambda row: (-row["days"], sign * row["average"], row["username"])
+        if cls.higher_score_first:
+            return lambda row: (-row["total"], -row["days"], row["username"])
+        return lambda row: (-row["days"], row["total"], row["username"])
+
     @classmethod
     async def update_or_create_game_record(
-        cls, username: str, game_number: int, defaults: dict[str, str | int], no_db: bool = False
-    ) -> tuple[(Play | None), bool]:
+        cls,
+        username: str,
+        game_number: int,
+        defaults: dict[str, str | int],
+        no_db: bool = False,
+        chat_id: int = DEFAULT_CHAT_ID,
+    ) -> tuple[(int | None), bool]:
         """
         Update or create a game record in the database.
         Args:
             username (str): The username of the player.
             game_number (int): The game number.
             defaults (dict): Default values for the record.
+            chat_id (int): The chat the play was shared in.
         Returns:
-            tuple[Type[Play], bool]: The created or updated record and a boolean indicating if it was newly created.
+            tuple[int | None, bool]: The id of the created or updated record and a boolean
+                indicating if it was newly created.
         """
         if no_db:
             return None, False
-        obj, is_new = await cls.db_model.update_or_create(
-            username=username, game_number=game_number, defaults=defaults
+        async with in_transaction() as connection:
+            upserted = await cls._write_records(
+                [(username, game_number, defaults)], connection, chat_id
+            )
+        cls._cache_written([(username, game_number, defaults)], upserted, chat_id)
+        return upserted[(username, game_number)]
+
+    @classmethod
+    async def bulk_update_or_create_game_records(
+        cls,
+        records: list[tuple[str, int, dict[str, str | int]]],
+        using_db: BaseDBAsyncClient | None = None,
+        chat_id: int = DEFAULT_CHAT_ID,
+    ) -> int:
+        """
+        Update or create many game records of a chat with multi-row upserts, and refresh the
+        daily leaderboard of the game numbers they touch.
+        Later records for the same username and game number replace earlier ones.
+        Args:
+            records (list[tuple[str, int, dict]]): (username, game_number, defaults) tuples, with
+                the same meaning as the arguments of update_or_create_game_record.
+            using_db (BaseDBAsyncClient | None): Connection or transaction to write with.
+            chat_id (int): The chat the plays were shared in.
+        Returns:
+            int: The number of newly created records.
+        """
+        if using_db is None:
+            async with in_transaction() as connection:
+                upserted = await cls._write_records(records, connection, chat_id)
+            cls._cache_written(records, upserted, chat_id)
+        else:
+            # the caller commits, and updates the leaderboard cache afterwards
+            upserted = await cls._write_records(records, using_db, chat_id)
+        return sum(is_new for _, is_new in upserted.values())
+
+    @classmethod
+    async def _write_records(
+        cls,
+        records: list[tuple[str, int, dict[str, str | int]]],
+        connection: BaseDBAsyncClient,
+        chat_id: int,
+    ) -> dict[tuple[str, int], tuple[int, bool]]:
+        latest = {(username, game_number): defaults for username, game_number, defaults in records}
+        rows, raw_texts = [], {}
+        for (username, game_number), defaults in latest.items():
+            row = {"chat_id": chat_id, "username": username, "game_number": game_number, **defaults}
+            if "raw_text" in row:
+                raw_texts[(username, game_number)] = row.pop("raw_text")
+            rows.append(row)
+        upserted = {}
+        for offset in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[offset : offset + UPSERT_CHUNK_SIZE]
+            upserted.update(await cls._upsert_rows(chunk, connection))
+        await cls._store_raw_texts(
+            {upserted[key][0]: text for key, text in raw_texts.items()}, connection
+        )
+        await cls.refresh_daily_leaderboard(
+            (game_number for _, game_number in latest), connection, chat_id
+        )
+        await cls._update_user_stats(rows, upserted, connection, chat_id)
+        for rollup in ROLLUPS.values():
+            await cls._update_rollup(rollup, rows, upserted, connection, chat_id)
+        return upserted
+
+    @classmethod
+    async def _store_raw_texts(
+        cls, raw_texts: dict[int, str], connection: BaseDBAsyncClient
+    ) -> None:
+        """
+        Writes the compressed share texts of plays, replacing the ones they already had.
+        Args:
+            raw_texts (dict[int, str]): Maps play ids to their share text.
+            connection (BaseDBAsyncClient): Connection or transaction to write with.
+        """
+        items = list(raw_texts.items())
+        for offset in range(0, len(items), UPSERT_CHUNK_SIZE):
+            chunk = items[offset : offset + UPSERT_CHUNK_SIZE]
+            await connection.execute_query(
+                f'INSERT INTO "{PlayText._meta.db_table}" ("game_type", "play_id", "compressed") '
+                f"VALUES {', '.join(['(?, ?, ?)'] * len(chunk))} "
+                'ON CONFLICT ("game_type", "play_id") '
+                'DO UPDATE SET "compressed" = excluded."compressed"',
+                [
+                    value
+                    for play_id, text in chunk
+                    for value in (cls.game_type, play_id, compress_text(text))
+                ],
+            )
+
+    @classmethod
+    async def get_raw_texts(cls, play_ids: Iterable[int]) -> dict[int, str]:
+        """
+        Loads the share texts of plays, for rescoring or auditing.
+        Args:
+            play_ids (Iterable[int]): Ids of plays of this game.
+        Returns:
+            dict[int, str]: Maps play ids to their share text. Plays without one are left out.
+        """
+        play_ids = list(play_ids)
+        raw_texts = {}
+        for offset in range(0, len(play_ids), UPSERT_CHUNK_SIZE):
+            chunk = play_ids[offset : offset + UPSERT_CHUNK_SIZE]
+            # raw SQL, the exports and rescores read every play's text through here
+            _, rows = await PlayText._meta.db.execute_query(
+                f'SELECT "play_id", "compressed" FROM "{PlayText._meta.db_table}" '
+                f'WHERE "game_type" = ? AND "play_id" IN ({", ".join("?" * len(chunk))})',
+                [cls.game_type, *chunk],
+            )
+            for play_id, compressed in rows:
+                raw_texts[play_id] = decompress_text(compressed)
+        return raw_texts
+
+    @classmethod
+    def _cache_written(
+        cls,
+        records: list[tuple[str, int, dict[str, str | int]]],
+        upserted: dict[tuple[str, int], tuple[int, bool]],
+        chat_id: int,
+    ) -> None:
+        """
+        Applies committed records of a chat to the leaderboard cache, and drops their game
+        numbers from the distribution cache, if those are enabled.
+        """
+        if Game.distribution_cache is not None:
+            Game.distribution_cache.invalidate(
+                cls, chat_id, {game_number for _, game_number, _ in records}
+            )
+        if Game.leaderboard_cache is None:
+            return
+        for username, game_number, defaults in records:
+            play_id, _ = upserted[(username, game_number)]
+            Game.leaderboard_cache.record(
+                cls, chat_id, game_number, play_id, username, defaults["score"]
+            )
+
+    @classmethod
+    async def _upsert_rows(
+        cls, rows: list[dict[str, str | int]], connection: BaseDBAsyncClient
+    ) -> dict[tuple[str, int], tuple[int, bool]]:
+        """
+        Inserts rows relying on the unique (chat_id, username, game_number) index, updating the
+        ones that already exist. SQLite's RETURNING cannot tell an insert from an update, so new
+        rows go through ON CONFLICT DO NOTHING and only the conflicting ones are re-sent as
+        updates.
+        Args:
+            rows (list[dict]): Rows of one chat with unique (username, game_number) keys and the
+                same columns.
+            connection (BaseDBAsyncClient): Connection or transaction to write with.
+        Returns:
+            dict[tuple[str, int], tuple[int, bool]]: Maps every key to its record id and whether
+                it was newly created.
+        """
+        meta = cls.db_model._meta
+        columns = list(rows[0])
+        column_sql = ", ".join(f'"{meta.fields_db_projection[column]}"' for column in columns)
+        insert_sql = f'INSERT INTO "{meta.db_table}" ({column_sql}) '
+        conflict_sql = 'ON CONFLICT ("chat_id", "username", "game_number")'
+
+        def values(batch: list[dict[str, str | int]]) -> tuple[str, list]:
+            placeholders = f"({', '.join('?' * len(columns))})"
+            params = [
+                meta.fields_map[column].to_db_value(row[column], cls.db_model)
+                for row in batch
+                for column in columns
+            ]
+            return f"VALUES {', '.join([placeholders] * len(batch))} ", params
+
+        values_sql, params = values(rows)
+        returning_sql = 'RETURNING "id", "username", "game_number"'
+        _, inserted = await connection.execute_query(
+            f"{insert_sql}{values_sql}{conflict_sql} DO NOTHING {returning_sql}", params
+        )
+        upserted = {(row["username"], row["game_number"]): (row["id"], True) for row in inserted}
+        conflicting = [row for row in rows if (row["username"], row["game_number"]) not in upserted]
+        if conflicting:
+            updates = ", ".join(
+                f'"{column}" = excluded."{column}"'
+                for column in map(meta.fields_db_projection.get, columns)
+                if column not in ("chat_id", "username", "game_number")
+            )
+            values_sql, params = values(conflicting)
+            _, updated = await connection.execute_query(
+                f"{insert_sql}{values_sql}{conflict_sql} DO UPDATE SET {updates} {returning_sql}",
+                params,
+            )
+            for row in updated:
+                upserted[(row["username"], row["game_number"])] = (row["id"], False)
+        return upserted
+
+
+async def bulk_update_or_create_records(
+    records_by_game: dict[Type[Game], list[tuple[str, int, dict[str, str | int]]]],
+    chat_id: int = DEFAULT_CHAT_ID,
+) -> int:
+    """
+    Update or create the records of several games of a chat in a single transaction.
+    Args:
+        records_by_game (dict[Type[Game], list[tuple[str, int, dict]]]): The
+            (username, game_number, defaults) records to write for each game.
+        chat_id (int): The chat the plays were shared in.
+    Returns:
+        int: The number of newly created records.
+    """
+    written = {}
+    async with in_transaction() as connection:
+        for game, records in records_by_game.items():
+            written[game] = await game._write_records(records, connection, chat_id)
+    for game, upserted in written.items():
+        game._cache_written(records_by_game[game], upserted, chat_id)
+    return sum(is_new for upserted in written.values() for _, is_new in upserted.values())
+
+
+async def todays_leaderboards(
+    games: Iterable[Type[Game]], override_date=None, chat_id: int = DEFAULT_CHAT_ID
+) -> list[dict]:
+    """
+    Current day's leaderboard of several games in a chat, read from daily_leaderboard in one
+    query. With the leaderboard cache enabled, cached games skip the database and the others
+    fill the cache from that same query.
+    Args:
+        games (Iterable[Type[Game]]): The games, in display order.
+        override_date (date | None): The day to show instead of today.
+        chat_id (int): The chat to show.
+    Returns:
+        list[dict]: The todays_data of each game, in the same order.
+    """
+    my_date = override_date or date.today()
+    game_numbers = {game: game.date_to_game_number(request_date=my_date) for game in games}
+    if not game_numbers:
+        return []
+    cache = Game.leaderboard_cache
+    if cache is None:
+        top_plays = await _top_plays_from_table(game_numbers, chat_id)
+        leaderboards = dict(zip(game_numbers, top_plays))
+    else:
+        leaderboards = {
+            game: cache.get(game, chat_id, number) for game, number in game_numbers.items()
+        }
+        missing = {game: game_numbers[game] for game, rows in leaderboards.items() if rows is None}
+        if missing:
+            # daily_leaderboard only holds DAILY_LEADERBOARD_DEPTH plays per game number
+            if cache.depth <= DAILY_LEADERBOARD_DEPTH:
+                top_plays = await _top_plays_from_table(missing, chat_id)
+            else:
+                top_plays = await _top_plays_from_plays(missing, cache.depth, chat_id)
+            for (game, game_number), rows in zip(missing.items(), top_plays):
+                leaderboards[game] = cache.put(game, chat_id, game_number, rows[: cache.depth])
+    return [
+        game._leaderboard_data(game_number, leaderboards[game], chat_id)
+        for game, game_number in game_numbers.items()
+    ]
+
+
+async def _top_plays_from_table(
+    game_numbers: dict[Type[Game], int], chat_id: int
+) -> list[list[dict[str, str | int]]]:
+    """
+    Loads the stored top plays of a chat for one game number per game from daily_leaderboard,
+    in a single query on its (game_type, chat_id, game_number, rank) index.
+    Args:
+        game_numbers (dict[Type[Game], int]): The game number to load for each game.
+        chat_id (int): The chat to load.
+    Returns:
+        list[list[dict]]: The ranked id, username and score rows of each game, in order.
+    """
+    # raw SQL, building the ORM query costs more than running it
+    conditions = " OR ".join(
+        ['("game_type" = ? AND "chat_id" = ? AND "game_number" = ?)'] * len(game_numbers)
+    )
+    params = [
+        value
+        for game, number in game_numbers.items()
+        for value in (game.game_type, chat_id, number)
+    ]
+    _, rows = await DailyLeaderboard._meta.db.execute_query(
+        'SELECT "game_type", "play_id", "username", "score" '
+        f'FROM "{DailyLeaderboard._meta.db_table}" WHERE {conditions} ORDER BY "rank"',
+        params,
+    )
+    by_type = {game.game_type: [] for game in game_numbers}
+    for row in rows:
+        by_type[row["game_type"]].append(
+            {"id": row["play_id"], "username": row["username"], "score": row["score"]}
+        )
+    return [by_type[game.game_type] for game in game_numbers]
+
+
+async def user_stats(
+    games: Iterable[Type[Game]], username: str, chat_id: int = DEFAULT_CHAT_ID
+) -> list[dict]:
+    """
+    A player's stats in a chat, read from user_stats in one query on its unique index.
+    Submissions still waiting in the write buffer are counted once they are written.
+    Args:
+        games (Iterable[Type[Game]]): The games, in display order.
+        username (str): The player.
+        chat_id (int): The chat to show.
+    Returns:
+        list[dict]: The game_type, plays, best, worst, average and counts of each game the
+            player has played, in the order of games.
+    """
+    rows = {
+        row["game_type"]: row
+        for row in await UserStats.filter(chat_id=chat_id, username=username).values()
+    }
+    return [game._stats_data(rows[game.game_type]) for game in games if game.game_type in rows]
+
+
+async def rating_leaderboards(
+    games: Iterable[Type[Game]], chat_id: int = DEFAULT_CHAT_ID
+) -> list[dict]:
+    """
+    Rating leaderboard of several games in a chat, read from player_rating in one query.
+    Ratings only cover closed game numbers, see games.ratings.
+    Args:
+        games (Iterable[Type[Game]]): The games, in display order.
+        chat_id (int): The chat to show.
+    Returns:
+        list[dict]: The game_type of each game and its leaderboard of the best rated players,
+            with their rating and matches, in the same order.
+    """
+    games = list(games)
+    by_type = {game.game_type: [] for game in games}
+    for row in (
+        await PlayerRating.filter(chat_id=chat_id, game_type__in=list(by_type), matches__gt=0)
+        .order_by("-rating", "username")
+        .values("game_type", "username", "rating", "matches")
+    ):
+        leaderboard = by_type[row["game_type"]]
+        if len(leaderboard) < LEADERBOARD_SIZE:
+            leaderboard.append(
+                {
+                    "username": row["username"],
+                    "rating": round(row["rating"]),
+                    "matches": row["matches"],
+                }
+            )
+    return [{"game_type": game.game_type, "leaderboard": by_type[game.game_type]} for game in games]
+
+
+async def period_leaderboards(
+    games: Iterable[Type[Game]],
+    period: str,
+    ranking: str = "total",
+    override_date=None,
+    chat_id: int = DEFAULT_CHAT_ID,
+) -> list[dict]:
+    """
+    Leaderboard of the week or month of a day for several games in a chat, read from the
+    rollup tables in one query.
+    Args:
+        games (Iterable[Type[Game]]): The games, in display order.
+        period (str): "week" or "month", see games.periods.ROLLUPS.
+        ranking (str): One of PERIOD_RANKINGS.
+        override_date (date | None): A day of the period to show instead of today.
+        chat_id (int): The chat to show.
+    Returns:
+        list[dict]: The game_type of each game and its leaderboard of the best players, with
+            their total, average and days played, in the same order.
+    """
+    if ranking not in PERIOD_RANKINGS:
+        raise ValueError(f"Unknown ranking {ranking!r}, expected one of {PERIOD_RANKINGS}.")
+    rollup = ROLLUPS[period]
+    games = list(games)
+    by_type = {game.game_type: [] for game in games}
+    for row in await rollup.model.filter(
+        game_type__in=list(by_type),
+        chat_id=chat_id,
+        period=rollup.period_of(override_date or date.today()),
+    ).values("game_type", "username", "plays", "score_sum"):
+        by_type[row["game_type"]].append(
+            {
+                "username": row["username"],
+                "total": row["score_sum"],
+                "average": row["score_sum"] / row["plays"],
+                "days": row["plays"],
+            }
+        )
+    return [
+        {
+            "game_type": game.game_type,
+            "leaderboard": sorted(by_type[game.game_type], key=game._period_sort_key(ranking))[
+                :LEADERBOARD_SIZE
+            ],
+        }
+        for game in games
+    ]
+
+
+async def todays_leaderboards_from_plays(
+    games: Iterable[Type[Game]], override_date=None, chat_id: int = DEFAULT_CHAT_ID
+) -> list[dict]:
+    """
+    Current day's leaderboard of several games in a chat, ranked straight from the play tables.
+    Every game's top plays come from one UNION ALL query, each branch sorted by the game's own
+    higher_score_first, so it costs one round trip however many games there are.
+    Args:
+        games (Iterable[Type[Game]]): The games, in display order.
+        override_date (date | None): The day to show instead of today.
+        chat_id (int): The chat to show.
+    Returns:
+        list[dict]: The todays_data of each game, in the same order.
+    """
+    my_date = override_date or date.today()
+    game_numbers = {game: game.date_to_game_number(request_date=my_date) for game in games}
+    if not game_numbers:
+        return []
+    top_plays = await _top_plays_from_plays(game_numbers, DAILY_LEADERBOARD_DEPTH, chat_id)
+    return [
+        game._leaderboard_data(
+            game_number,
+            [{"username": row["username"], "score": row["score"]} for row in rows],
+            chat_id,
+        )
+        for (game, game_number), rows in zip(game_numbers.items(), top_plays)
+    ]
+
+
+async def _top_plays_from_plays(
+    game_numbers: dict[Type[Game], int], quantity: int, chat_id: int
+) -> list[list[dict[str, str | int]]]:
+    """
+    Loads the best plays of a chat for one game number per game with a single UNION ALL query.
+    Args:
+        game_numbers (dict[Type[Game], int]): The game number to load for each game.
+        quantity (int): Plays loaded per game.
+        chat_id (int): The chat to load.
+    Returns:
+        list[list[dict]]: The ranked id, username and score rows of each game, in order.
+    """
+    branches, params = [], []
+    for index, (game, game_number) in enumerate(game_numbers.items()):
+        order = "DESC" if game.higher_score_first else "ASC"
+        plays_sql, plays_params = game._plays_sql(
+            'WHERE "chat_id" = ? AND "game_number" = ?',
+            [chat_id, game_number],
+            archived=game_number < game.current_game_number(),
+        )
+        # the LIMIT lets each branch stop early on the (chat_id, game_number, score) index
+        branches.append(
+            f'SELECT * FROM (SELECT ? AS "game", "id", "username", "score" FROM ({plays_sql}) '
+            f'ORDER BY "score" {order}, "id" LIMIT {int(quantity)})'
         )
-        return obj, is_new
+        params += [index, *plays_params]
+    connection = next(iter(game_numbers)).db_model._meta.db
+    _, rows = await connection.execute_query(" UNION ALL ".join(branches), params)
+    by_game = [[] for _ in game_numbers]
+    for row in rows:
+        by_game[row["game"]].append(
+            {"id": row["id"], "username": row["username"], "score": row["score"]}
+        )
+    for game, game_rows in zip(game_numbers, by_game):
+        # UNION ALL does not promise to keep the order of its branches
+        sign = -1 if game.higher_score_first else 1
+        game_rows.sort(key=lambda row: (sign * row["score"], row["id"]))
+    return by_game
 
 
 class LinkedInSimpleTime(Game, metaclass=SingletonMeta):
@@ -171,10 +1238,15 @@ class LinkedInSimpleTime(Game, metaclass=SingletonMeta):
     # game_type = "simple_time"
     # db_model = None
     higher_score_first = False
+    stats_counts = ("flawless",)
 
     @classmethod
-    def str_matches(cls, input_text: str) -> bool:
-        return input_text.startswith(f"{cls.game_type.title()} #")
+    def dispatch_regex(cls) -> str:
+        return rf"{re.escape(cls.game_type.title())} #"
+
+    @classmethod
+    def parse_regex(cls) -> str:
+        return rf"{re.escape(cls.game_type.title())}\s++#(?P<game_number>\d++)\s*+\|\s*+(?P<minutes>\d++):(?P<seconds>\d++)"
 
     @classmethod
     def get_update_defaults(cls, data: dict[str, int | bool]) -> dict[str, int | bool]:
@@ -186,17 +1258,17 @@ class LinkedInSimpleTime(Game, metaclass=SingletonMeta):
         }
 
     @classmethod
-    def process_to_dict(cls, text: str) -> dict[str, str | int | bool]:
+    def process_to_dict(cls, text: str, start: int = 0) -> dict[str, str | int | bool]:
         """
         Processes the input text to extract game information.
         Args:
             text (str): The input text containing Tango game information.
+            start (int): Position in the text to start searching from.
         Returns:
             dict[str, str | int | bool]: A dictionary with the extracted game information.
         """
-        regex = rf"{cls.game_type.title()}\s+#(?P<game_number>\d+)\s*\|\s*(?P<minutes>\d+):(?P<seconds>\d+)"
-
-        match = re.search(regex, text)
+        end = start + cls.parse_window
+        match = cls.parse_pattern.search(text, start, end)
         if not match:
             raise ValueError(f"No {cls.game_type} game information found.")
 
@@ -215,7 +1287,7 @@ class LinkedInSimpleTime(Game, metaclass=SingletonMeta):
             "game_number": game_number,
             "score": total_seconds,
             "seconds": total_seconds,
-            "flawless": "and flawless" in text,
+            "flawless": text.find("and flawless", start, end) != -1,
             "raw_text": text,
         }
         return resp_json
@@ -1,8 +1,62 @@
 import re
+from functools import lru_cache
 from games.base import Game
 from datetime import date
 
-from orm.models import ConnectionsPlay
+from orm.models import ConnectionsPlay, ConnectionsPlayArchive
+
+SOLVED_ROWS = {
+    "🟨🟨🟨🟨": "Y",
+    "🟩🟩🟩🟩": "G",
+    "🟦🟦🟦🟦": "B",
+    "🟪🟪🟪🟪": "P",
+}
+
+
+# Scoring rules, see score_rows. Rescore the stored plays with tools/rescore.py after a change.
+# Groups from easiest to hardest, and the points for solving each.
+GROUP_POINTS = {"Y": 5, "G": 10, "B": 15, "P": 20}
+# Bonus for solving a group, per easier group that was still unsolved at the time.
+ORDER_BONUS = {"Y": 0, "G": 2, "B": 3, "P": 4}
+# Points by number of mistakes, a fifth mistake ends the game.
+MISTAKE_POINTS = (30, 26, 20, 12, 0)
+GROUP_NAMES = {"Y": "Yellow", "G": "Green", "B": "Blue", "P": "Purple"}
+
+
+@lru_cache(maxsize=4096)
+def score_rows(rows: str) -> tuple[int, bool, int, bool]:
+    """
+    Scores a tokenized Connections grid.
+    The number of distinct grids is small, so results are memoized by row sequence.
+    Args:
+        rows (str): One code per guess, Y/G/B/P for a solved group and x for a mistake.
+    Returns:
+        tuple[int, bool, int, bool]: The score, purple_first, mistakes and won.
+    """
+    solved = {}
+    purple_first = False
+    mistakes = 0
+    for row in rows:
+        if row not in GROUP_POINTS:
+            mistakes += 1
+            continue
+        if row in solved:
+            raise ValueError(f"{GROUP_NAMES[row]} already found, invalid game.")
+        unsolved_easier = 0
+        for group in GROUP_POINTS:
+            if group == row:
+                break
+            unsolved_easier += group not in solved
+        if row == "P" and not solved:
+            purple_first = True
+        solved[row] = GROUP_POINTS[row] + ORDER_BONUS[row] * unsolved_easier
+    if mistakes >= len(MISTAKE_POINTS):
+        raise ValueError("Too many mistakes, invalid game.")
+    score = sum(solved.values()) + MISTAKE_POINTS[mistakes]
+    won = len(solved) == len(GROUP_POINTS)
+    if mistakes < len(MISTAKE_POINTS) - 1 and not won:
+        raise ValueError(f"Game not complete. Mistakes: {mistakes}, Won: {won}, invalid game.")
+    return score, purple_first, mistakes, won
 
 
 class ConnectionsGame(Game):
@@ -41,11 +95,24 @@ class ConnectionsGame(Game):
     start_date = date(2023, 6, 12)
     game_type = "connections"
     db_model = ConnectionsPlay
+    archive_model = ConnectionsPlayArchive
     higher_score_first = True
+    stats_counts = ("won",)
+    dispatch_anchor = "Puzzle #"
+
+    @classmethod
+    def compile_patterns(cls) -> None:
+        super().compile_patterns()
+        # lines made of exactly 4 of these 🟩🟨🟦🟪 in any order, ignoring surrounding spaces
+        cls.grid_line_pattern = re.compile(r"^[^\S\n]*+([🟩🟨🟦🟪]{4})[^\S\n]*+$", re.MULTILINE)
+
+    @classmethod
+    def dispatch_regex(cls) -> str:
+        return r"Connections\nPuzzle #"
 
     @classmethod
-    def str_matches(cls, input_text: str) -> bool:
-        return input_text.startswith("Connections\nPuzzle #")
+    def parse_regex(cls) -> str:
+        return r"Connections\s++Puzzle\s++#(?P<game_number>\d++)"
 
     @classmethod
     def get_update_defaults(cls, data: dict[str, int | bool]) -> dict[str, int | bool]:
@@ -65,73 +132,31 @@ class ConnectionsGame(Game):
         }
 
     @classmethod
-    def process_to_dict(cls, text: str) -> dict[str, int | bool]:
+    def process_to_dict(cls, text: str, start: int = 0) -> dict[str, int | bool]:
         """
         Process the given text and extract relevant information into a dictionary.
         This method also calculates the score based on the game rules.
         Args:
             text (str): The input text containing game information.
+            start (int): Position in the text to start searching from.
         Returns:
             dict[str, int | bool]: A dictionary containing the game score and other relevant data.
         """
-        regex = r"Connections\s+Puzzle\s+#(?P<game_number>\d+)\s*"
-        match = re.search(regex, text)
+        end = start + cls.parse_window
+        match = cls.parse_pattern.search(text, start, end)
         if not match:
             raise ValueError("Game number not found in the text.")
         game_number = int(match.group("game_number"))
-        lines = text.splitlines()
-        lines = [line.strip() for line in lines if line.strip()]
-        # remove lines that contain anything except 4 of these 🟩🟨🟦🟪 in any order
-        lines = [line for line in lines if re.match(r"^[🟩🟨🟦🟪]{4}$", line)]
-        if not lines:
+        # tokenize the grid into one code per row: the color letter of a solved group or "x"
+        rows = "".join(
+            [
+                SOLVED_ROWS.get(row, "x")
+                for row in cls.grid_line_pattern.findall(text, match.start(), end)
+            ]
+        )
+        if not rows:
             raise ValueError("No valid game lines found in the text.")
-        green_found = 0
-        yellow_found = 0
-        blue_found = 0
-        purple_found = 0
-        purple_first = False
-        mistakes = 0
-        for line in lines:
-            if "🟨🟨🟨🟨" == line:
-                if yellow_found:
-                    raise ValueError("Yellow already found, invalid game.")
-                yellow_found = 5
-            elif "🟩🟩🟩🟩" == line:
-                if green_found:
-                    raise ValueError("Green already found, invalid game.")
-                green_found = 10
-                if not yellow_found:
-                    green_found += 2  # bonus for green before yellow
-            elif "🟦🟦🟦🟦" == line:
-                if blue_found:
-                    raise ValueError("Blue already found, invalid game.")
-                blue_found = 15
-                if not yellow_found:
-                    blue_found += 3  # bonus for blue before yellow
-                if not green_found:
-                    blue_found += 3  # bonus for blue before green
-            elif "🟪🟪🟪🟪" == line:
-                if purple_found:
-                    raise ValueError("Purple already found, invalid game.")
-                purple_found = 20
-                if not yellow_found:
-                    purple_found += 4  # bonus for purple before yellow
-                if not green_found:
-                    purple_found += 4  # bonus for purple before green
-                if not blue_found:
-                    purple_found += 4  # bonus for purple before blue
-                if not any([yellow_found, green_found, blue_found]):
-                    purple_first = True
-            else:
-                mistakes += 1
-        if mistakes > 4:
-            raise ValueError("Too many mistakes, invalid game.")
-        mistake_array = [0, 4, 10, 18, 30]
-        mistake_penalty = 30 - mistake_array[mistakes]
-        score = green_found + yellow_found + blue_found + purple_found + mistake_penalty
-        won = all([green_found, yellow_found, blue_found, purple_found])
-        if mistakes < 4 and not won:
-            raise ValueError(f"Game not complete. Mistakes: {mistakes}, Won: {won}, invalid game.")
+        score, purple_first, mistakes, won = score_rows(rows)
 
         return {
             "game_type": cls.game_type,
@@ -1,7 +1,7 @@
 from datetime import date
 
 from games.base import LinkedInSimpleTime
-from orm.models import CrossClimbPlay
+from orm.models import CrossClimbPlay, CrossClimbPlayArchive
 
 
 class CrossClimbGame(LinkedInSimpleTime):
@@ -18,4 +18,5 @@ class CrossClimbGame(LinkedInSimpleTime):
     start_date = date(2024, 5, 1)
     game_type = "crossclimb"
     db_model = CrossClimbPlay
+    archive_model = CrossClimbPlayArchive
     higher_score_first = False
@@ -0,0 +1,139 @@
+import re
+from collections import Counter
+from typing import Iterable, Type
+
+from games.base import Game
+
+
+class GameDispatcher:
+    """
+    Dispatch index that finds the game a message belongs to in a single pass.
+
+    Messages first go through a pre-filter that drops anything not containing one of the
+    registered games' anchors, which is what most chatter costs. The share headers of all
+    games are then combined into one pattern: anchored games only match at the start of a
+    line, the others anywhere. A single scan finds every share in the message.
+    """
+
+    # Telegram caps messages at 4096 characters; anything much longer is not a score share.
+    max_message_length: int = 8192
+
+    def __init__(self, games: Iterable[Type[Game]]):
+        self.games = list(games)
+        self.anchors = self._minimal_anchors(game.dispatch_anchor for game in self.games)
+        anchored = [
+            f"(?P<g{index}>{game.dispatch_pattern.pattern})"
+            for index, game in enumerate(self.games)
+            if game.dispatch_anchored
+        ]
+        unanchored = [
+            f"(?P<g{index}>{game.dispatch_pattern.pattern})"
+            for index, game in enumerate(self.games)
+            if not game.dispatch_anchored
+        ]
+        alternatives = [f"^(?:{'|'.join(anchored)})"] if anchored else []
+        self._pattern = re.compile("|".join(alternatives + unanchored), re.MULTILINE)
+        self.counters = Counter(messages=0, prefiltered=0, unmatched=0, matched=0)
+
+    @staticmethod
+    def _minimal_anchors(anchors: Iterable[str]) -> tuple[str, ...]:
+        # an anchor containing another one is redundant, the shorter one already lets it through
+        anchors = set(anchors)
+        return tuple(
+            sorted(
+                anchor
+                for anchor in anchors
+                if not any(other != anchor and other in anchor for other in anchors)
+            )
+        )
+
+    def prefilter(self, text: str) -> bool:
+        """
+        Cheap check that runs before any game specific matching.
+        Args:
+            text (str): The message text.
+        Returns:
+            bool: False if the message cannot be a score share.
+        """
+        if len(text) > self.max_message_length:
+            return False
+        for anchor in self.anchors:
+            if anchor in text:
+                return True
+        return False
+
+    @property
+    def rejection_rate(self) -> float:
+        """
+        Fraction of messages dropped by the pre-filter.
+        """
+        if not self.counters["messages"]:
+            return 0.0
+        return self.counters["prefiltered"] / self.counters["messages"]
+
+    def find_all(self, text: str) -> list[tuple[Type[Game], int]]:
+        """
+        Finds every share contained in the message in a single pass.
+        Args:
+            text (str): The message text.
+        Returns:
+            list[tuple[Type[Game], int]]: The game and start position of each share, in order.
+        """
+        self.counters["messages"] += 1
+        if not self.prefilter(text):
+            self.counters["prefiltered"] += 1
+            return []
+        found = [
+            (self.games[int(match.lastgroup[1:])], match.start())
+            for match in self._pattern.finditer(text)
+        ]
+        self.counters["matched" if found else "unmatched"] += 1
+        return found
+
+    def match(self, text: str) -> tuple[Type[Game], int] | None:
+        """
+        Finds the first share contained in the message.
+        Args:
+            text (str): The message text.
+        Returns:
+            tuple[Type[Game], int] | None: The matching game and the position where its share
+                starts, or None if the message is not a score share.
+        """
+        found = self.find_all(text)
+        return found[0] if found else None
+
+    def split(self, text: str) -> list[tuple[Type[Game], str, int]]:
+        """
+        Splits a message into one block per share.
+        Each block runs until the next share starts; the first one also keeps any text before
+        its share.
+        Args:
+            text (str): The message text.
+        Returns:
+            list[tuple[Type[Game], str, int]]: The game, block text and position of the share
+                within the block.
+        """
+        found = self.find_all(text)
+        blocks = []
+        for index, (game, start) in enumerate(found):
+            block_start = start if index else 0
+            block_end = found[index + 1][1] if index + 1 < len(found) else len(text)
+            blocks.append((game, text[block_start:block_end].rstrip(), start - block_start))
+        return blocks
+
+    def parse_all(self, text: str) -> list[tuple[Type[Game], dict[str, str | int | bool]]]:
+        """
+        Parses every share contained in the message.
+        Shares that fail to parse are skipped.
+        Args:
+            text (str): The message text.
+        Returns:
+            list[tuple[Type[Game], dict]]: The game and parsed data of each valid share.
+        """
+        parsed = []
+        for game, block, start in self.split(text):
+            try:
+                parsed.append((game, game.process_to_dict(block, start=start)))
+            except ValueError:
+                continue
+        return parsed
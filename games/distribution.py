@@ -0,0 +1,270 @@
+from collections import Counter, OrderedDict
+from datetime import date
+from typing import Iterable, Type
+
+import numpy as np
+
+from games.base import Game
+from orm.models import DEFAULT_CHAT_ID
+
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BINS = 8
+
+
+class ScoreDistribution:
+    """
+    The scores of a set of plays as one sorted int32 array, with the statistics worked out over
+    the whole array at once. Ranks and percentiles are binary searches into it, so a game with
+    hundreds of thousands of plays costs a few microseconds per lookup once loaded.
+
+    `usernames` is kept alongside the scores, in the same order, when the plays of a single
+    game number were loaded, so a player's own score can be looked up.
+    """
+
+    __slots__ = ("scores", "usernames", "higher_score_first")
+
+    def __init__(
+        self,
+        scores: Iterable[int],
+        higher_score_first: bool,
+        usernames: list[str] | None = None,
+    ):
+        scores = np.fromiter(scores, dtype=np.int32)
+        order = np.argsort(scores, kind="stable")
+        self.scores = scores[order]
+        self.usernames = None if usernames is None else [usernames[i] for i in order]
+        self.higher_score_first = higher_score_first
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def score_of(self, username: str) -> int | None:
+        if self.usernames is None or username not in self.usernames:
+            return None
+        return int(self.scores[self.usernames.index(username)])
+
+    def better_than(self, score: int | np.ndarray) -> int | np.ndarray:
+        """
+        The number of plays with a strictly better score, for one score or an array of them.
+        """
+        if self.higher_score_first:
+            return len(self.scores) - np.searchsorted(self.scores, score, side="right")
+        return np.searchsorted(self.scores, score, side="left")
+
+    def rank(self, score: int | np.ndarray) -> int | np.ndarray:
+        """
+        The rank of a score among the plays, tied scores sharing the better rank.
+        """
+        return self.better_than(score) + 1
+
+    def top_percent(self, score: int | np.ndarray) -> float | np.ndarray:
+        """
+        The "Top X%" of a score, the share of plays ranked at or above it. The best score of
+        ten plays is in the top 10%.
+        """
+        return 100.0 * self.rank(score) / max(len(self.scores), 1)
+
+    def percentiles(self, quantiles: Iterable[int] = PERCENTILES) -> dict[int, float]:
+        """
+        The raw scores at each percentile, in score order whichever way the game ranks.
+        """
+        quantiles = list(quantiles)
+        if not len(self.scores):
+            return {}
+        values = np.percentile(self.scores, quantiles)
+        return dict(zip(quantiles, values.tolist()))
+
+    def histogram(self, bins: int = HISTOGRAM_BINS) -> tuple[list[int], list[float]]:
+        """
+        Play counts per score bin and the bin edges, one more edge than counts. Bins never get
+        narrower than one score point.
+        """
+        if not len(self.scores):
+            return [], []
+        spread = int(self.scores[-1]) - int(self.scores[0]) + 1
+        counts, edges = np.histogram(self.scores, bins=min(bins, spread))
+        return counts.tolist(), edges.tolist()
+
+    def z_scores(self, scores: int | np.ndarray | None = None) -> float | np.ndarray:
+        """
+        How many standard deviations scores sit above the mean, all of the plays' by default.
+        Positive means a higher raw score, whether or not that is better in the game.
+        """
+        values = self.scores if scores is None else np.asarray(scores, dtype=np.float64)
+        std = self.scores.std() if len(self.scores) else 0.0
+        if not std:
+            return np.zeros_like(values, dtype=np.float64)
+        return (values - self.scores.mean()) / std
+
+    def summary(self, bins: int = HISTOGRAM_BINS) -> dict:
+        counts, edges = self.histogram(bins)
+        return {
+            "plays": len(self.scores),
+            "mean": float(self.scores.mean()) if len(self.scores) else 0.0,
+            "std": float(self.scores.std()) if len(self.scores) else 0.0,
+            "percentiles": self.percentiles(),
+            "histogram": counts,
+            "edges": edges,
+        }
+
+
+async def load_distribution(
+    game: Type[Game], chat_id: int = DEFAULT_CHAT_ID, game_number: int | None = None
+) -> ScoreDistribution:
+    """
+    Loads the scores of a chat's plays of a game, archived ones included, with the usernames
+    when game_number is given.
+    Args:
+        game (Type[Game]): The game.
+        chat_id (int): The chat.
+        game_number (int | None): One game number, or None for all of them.
+    Returns:
+        ScoreDistribution: The distribution of the scores.
+    """
+    if game_number is None:
+        plays_sql, params = game._plays_sql('WHERE "chat_id" = ?', [chat_id])
+        _, rows = await game.db_model._meta.db.execute_query(
+            f'SELECT "score" FROM ({plays_sql})', params
+        )
+        return ScoreDistribution((row[0] for row in rows), game.higher_score_first)
+    plays_sql, params = game._plays_sql(
+        'WHERE "chat_id" = ? AND "game_number" = ?', [chat_id, game_number]
+    )
+    _, rows = await game.db_model._meta.db.execute_query(
+        f'SELECT "username", "score" FROM ({plays_sql})', params
+    )
+    return ScoreDistribution(
+        (row[1] for row in rows), game.higher_score_first, [row[0] for row in rows]
+    )
+
+
+class DistributionCache:
+    """
+    Loaded score distributions per (game, chat, game number), with None standing for all of a
+    chat's game numbers.
+
+    Every committed write through `Game` drops the entries of the game numbers it touched and
+    the all game numbers entry of its chat, so the next read loads them again. Submissions
+    still waiting in the write buffer are not seen until they are written. Past max_entries,
+    the least recently read entries go first.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[Type[Game], int, int | None], ScoreDistribution] = (
+            OrderedDict()
+        )
+        self.counters = Counter(hits=0, misses=0, invalidations=0)
+        # bumped on every invalidation, a load that overlapped one may hold stale scores
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(
+        self, game: Type[Game], chat_id: int, game_number: int | None = None
+    ) -> ScoreDistribution:
+        key = (game, chat_id, game_number)
+        distribution = self._entries.get(key)
+        if distribution is not None:
+            self.counters["hits"] += 1
+            self._entries.move_to_end(key)
+            return distribution
+        self.counters["misses"] += 1
+        generation = self._generation
+        distribution = await load_distribution(game, chat_id, game_number)
+        if generation != self._generation:
+            return distribution
+        self._entries[key] = distribution
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return distribution
+
+    def invalidate(self, game: Type[Game], chat_id: int, game_numbers: Iterable[int]) -> None:
+        self._generation += 1
+        for game_number in (None, *game_numbers):
+            if self._entries.pop((game, chat_id, game_number), None) is not None:
+                self.counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def enable(self) -> None:
+        """
+        Makes `Game` writes invalidate this cache, and reads through score_distribution use it.
+        """
+        Game.distribution_cache = self
+
+    def disable(self) -> None:
+        if Game.distribution_cache is self:
+            Game.distribution_cache = None
+
+
+async def score_distribution(
+    game: Type[Game], chat_id: int = DEFAULT_CHAT_ID, game_number: int | None = None
+) -> ScoreDistribution:
+    """
+    The distribution of load_distribution, served from the distribution cache if one is enabled.
+    """
+    if Game.distribution_cache is None:
+        return await load_distribution(game, chat_id, game_number)
+    return await Game.distribution_cache.get(game, chat_id, game_number)
+
+
+async def todays_standings(
+    games: Iterable[Type[Game]],
+    username: str,
+    override_date: date | None = None,
+    chat_id: int = DEFAULT_CHAT_ID,
+) -> list[dict]:
+    """
+    Where a player's play of the day sits among everyone's plays of it in the chat.
+    Args:
+        games (Iterable[Type[Game]]): The games, in display order.
+        username (str): The player.
+        override_date (date | None): The day to show instead of today.
+        chat_id (int): The chat to show.
+    Returns:
+        list[dict]: The game_type, score, rank, plays and top_percent of each game the player
+            has played that day, in the order of games.
+    """
+    my_date = override_date or date.today()
+    standings = []
+    for game in games:
+        distribution = await score_distribution(
+            game, chat_id, game.date_to_game_number(request_date=my_date)
+        )
+        score = distribution.score_of(username)
+        if score is None:
+            continue
+        standings.append(
+            {
+                "game_type": game.game_type,
+                "score": score,
+                "rank": int(distribution.rank(score)),
+                "plays": len(distribution),
+                "top_percent": float(distribution.top_percent(score)),
+            }
+        )
+    return standings
+
+
+async def distribution_data(
+    games: Iterable[Type[Game]], chat_id: int = DEFAULT_CHAT_ID, bins: int = HISTOGRAM_BINS
+) -> list[dict]:
+    """
+    The score distribution of every play of several games in a chat.
+    Args:
+        games (Iterable[Type[Game]]): The games, in display order.
+        chat_id (int): The chat to show.
+        bins (int): The most histogram bins per game.
+    Returns:
+        list[dict]: The game_type, plays, mean, std, percentiles, histogram and edges of each
+            game with plays, in the order of games.
+    """
+    data = []
+    for game in games:
+        distribution = await score_distribution(game, chat_id)
+        if len(distribution):
+            data.append({"game_type": game.game_type, **distribution.summary(bins)})
+    return data
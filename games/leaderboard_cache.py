@@ -0,0 +1,162 @@
+import bisect
+from collections import Counter
+from typing import Type
+
+from games.base import DAILY_LEADERBOARD_DEPTH, LEADERBOARD_SIZE, Game
+
+
+class TopPlays:
+    """
+    The best plays of one game number, kept sorted best first.
+
+    Entries are (sort key, play id, username, score) tuples. The sort key is the score, negated
+    when higher scores come first, and ties go to the lower play id like in the database.
+    Once plays have been cut off the end, `truncated` is set: the entries are still the true top
+    of the game number, but nothing is known about the plays after them.
+    """
+
+    __slots__ = ("higher_score_first", "depth", "entries", "truncated")
+
+    def __init__(self, higher_score_first: bool, depth: int, rows: list[dict]):
+        self.higher_score_first = higher_score_first
+        self.depth = depth
+        self.entries = [self._entry(row["id"], row["username"], row["score"]) for row in rows]
+        self.entries.sort()
+        self.truncated = len(self.entries) >= depth
+        del self.entries[depth:]
+
+    def _entry(self, play_id: int, username: str, score: int) -> tuple[int, int, str, int]:
+        return (-score if self.higher_score_first else score, play_id, username, score)
+
+    def update(self, play_id: int, username: str, score: int) -> None:
+        for index, (_, _, entry_username, _) in enumerate(self.entries):
+            if entry_username == username:
+                del self.entries[index]
+                break
+        entry = self._entry(play_id, username, score)
+        # past the last entry of a truncated list, the play may rank below unknown plays
+        if self.truncated and (not self.entries or entry > self.entries[-1]):
+            return
+        bisect.insort(self.entries, entry)
+        if len(self.entries) > self.depth:
+            self.entries.pop()
+            self.truncated = True
+
+    def complete_top(self) -> bool:
+        """
+        Whether the entries are enough to show a full leaderboard.
+        """
+        return not self.truncated or len(self.entries) >= LEADERBOARD_SIZE
+
+    def rows(self) -> list[dict[str, str | int]]:
+        return [{"username": username, "score": score} for _, _, username, score in self.entries]
+
+
+class LeaderboardCache:
+    """
+    In-memory top plays per (game, chat, game number), served instead of querying the database.
+
+    Reads fill the cache from daily_leaderboard on a miss. Every accepted score updates the
+    cached entry of its game number, if there is one, once its transaction has committed.
+    Filling a game number evicts the game's older game numbers in that chat, so only the
+    current day stays. Past max_entries, the least recently read entries go first, so quiet
+    chats make room for active ones.
+
+    Writes that bypass `Game` (direct model saves, the daily_leaderboard rebuild tool) are not
+    seen, call `clear` after them.
+    """
+
+    def __init__(self, depth: int = DAILY_LEADERBOARD_DEPTH, max_entries: int = 1024):
+        self.depth = depth
+        self.max_entries = max_entries
+        self._entries: dict[tuple[Type[Game], int, int], TopPlays] = {}
+        self.counters = Counter(hits=0, misses=0, updates=0, evictions=0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of reads served from memory.
+        """
+        reads = self.counters["hits"] + self.counters["misses"]
+        if not reads:
+            return 0.0
+        return self.counters["hits"] / reads
+
+    def get(
+        self, game: Type[Game], chat_id: int, game_number: int
+    ) -> list[dict[str, str | int]] | None:
+        """
+        Returns the cached ranked username and score rows, or None on a miss.
+        """
+        key = (game, chat_id, game_number)
+        top = self._entries.get(key)
+        if top is None or not top.complete_top():
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        # dicts keep insertion order, moving the entry to the end keeps them in read order
+        self._entries[key] = self._entries.pop(key)
+        return top.rows()
+
+    def put(
+        self, game: Type[Game], chat_id: int, game_number: int, rows: list[dict[str, str | int]]
+    ) -> list[dict[str, str | int]]:
+        """
+        Caches the top plays of a game number in a chat loaded from the database.
+        Args:
+            game (Type[Game]): The game.
+            chat_id (int): The chat.
+            game_number (int): The game number.
+            rows (list[dict]): Its best plays with their id, username and score, at most
+                `depth` of them.
+        Returns:
+            list[dict]: The ranked username and score rows.
+        """
+        for key in [
+            key
+            for key in self._entries
+            if key[0] is game and key[1] == chat_id and key[2] < game_number
+        ]:
+            del self._entries[key]
+            self.counters["evictions"] += 1
+        top = TopPlays(game.higher_score_first, self.depth, rows)
+        self._entries.pop((game, chat_id, game_number), None)
+        self._entries[(game, chat_id, game_number)] = top
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+            self.counters["evictions"] += 1
+        return top.rows()
+
+    def record(
+        self,
+        game: Type[Game],
+        chat_id: int,
+        game_number: int,
+        play_id: int,
+        username: str,
+        score: int,
+    ) -> None:
+        """
+        Applies a committed play to the cached entry of its chat and game number, if there is
+        one.
+        """
+        top = self._entries.get((game, chat_id, game_number))
+        if top is not None:
+            top.update(play_id, username, score)
+            self.counters["updates"] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def enable(self) -> None:
+        """
+        Makes the leaderboard reads and writes of every game go through this cache.
+        """
+        Game.leaderboard_cache = self
+
+    def disable(self) -> None:
+        if Game.leaderboard_cache is self:
+            Game.leaderboard_cache = None
@@ -1,6 +1,5 @@
-import re
 from games.base import Game
-from orm.models import MiniCrosswordPlay
+from orm.models import MiniCrosswordPlay, MiniCrosswordPlayArchive
 from datetime import date
 
 
@@ -15,11 +14,18 @@ class MiniCrosswordGame(Game):
     start_date = date(2014, 8, 21)
     game_type = "miniCrossword"
     db_model = MiniCrosswordPlay
+    archive_model = MiniCrosswordPlayArchive
     higher_score_first = False
+    dispatch_anchored = False
+    dispatch_anchor = "New York Times Mini Crossword"
 
     @classmethod
-    def str_matches(cls, input_text: str) -> bool:
-        return "I solved the " in input_text and "New York Times Mini Crossword in " in input_text
+    def dispatch_regex(cls) -> str:
+        return r"I solved the \d++/\d++/\d++ New York Times Mini Crossword in "
+
+    @classmethod
+    def parse_regex(cls) -> str:
+        return r"I solved the (?P<date>\d++/\d++/\d++) New York Times Mini Crossword in (?P<minutes>\d++):(?P<seconds>\d++)"
 
     @classmethod
     def get_update_defaults(cls, data: dict[str, int | bool]) -> dict[str, int | bool]:
@@ -38,16 +44,16 @@ class MiniCrosswordGame(Game):
         }
 
     @classmethod
-    def process_to_dict(cls, text: str) -> dict[str, str | int | bool]:
+    def process_to_dict(cls, text: str, start: int = 0) -> dict[str, str | int | bool]:
         """
         Processes the input text to extract game information.
         Args:
             text (str): The input text containing MiniCrossword game information.
+            start (int): Position in the text to start searching from.
         Returns:
             dict[str, str | int | bool]: A dictionary with the extracted game information.
         """
-        regex = r"I solved the (?P<date>\d+/\d+/\d+) New York Times Mini Crossword in (?P<minutes>\d+):(?P<seconds>\d+)"
-        match = re.search(regex, text)
+        match = cls.parse_pattern.search(text, start, start + cls.parse_window)
         if not match:
             raise ValueError("Invalid MiniCrossword game format. Please check the input text.")
 
@@ -1,7 +1,7 @@
 from datetime import date
 
 from games.base import LinkedInSimpleTime
-from orm.models import MiniSudokuPlay
+from orm.models import MiniSudokuPlay, MiniSudokuPlayArchive
 
 
 class MiniSudokuGame(LinkedInSimpleTime):
@@ -23,4 +23,5 @@ class MiniSudokuGame(LinkedInSimpleTime):
     start_date = date(2025, 8, 12)
     game_type = "mini sudoku"
     db_model = MiniSudokuPlay
+    archive_model = MiniSudokuPlayArchive
     higher_score_first = False
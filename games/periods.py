@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from typing import Callable, Type
+
+from orm.models import MonthlyStats, PeriodStats, WeeklyStats
+
+
+class Rollup:
+    """
+    A rollup table and how days map to its periods. A period is stored as
+    year * 100 + its number in the year, so periods sort in time order.
+    """
+
+    __slots__ = ("name", "model", "period_of", "days_of")
+
+    def __init__(
+        self,
+        name: str,
+        model: Type[PeriodStats],
+        period_of: Callable[[date], int],
+        days_of: Callable[[int], tuple[date, date]],
+    ):
+        self.name = name
+        self.model = model
+        self.period_of = period_of
+        self.days_of = days_of
+
+
+def iso_week(day: date) -> int:
+    year, week, _ = day.isocalendar()
+    return year * 100 + week
+
+
+def iso_week_days(period: int) -> tuple[date, date]:
+    monday = date.fromisocalendar(period // 100, period % 100, 1)
+    return monday, monday + timedelta(days=6)
+
+
+def month(day: date) -> int:
+    return day.year * 100 + day.month
+
+
+def month_days(period: int) -> tuple[date, date]:
+    year, number = divmod(period, 100)
+    first = date(year, number, 1)
+    following = date(year + number // 12, number % 12 + 1, 1)
+    return first, following - timedelta(days=1)
+
+
+WEEK = Rollup("week", WeeklyStats, iso_week, iso_week_days)
+MONTH = Rollup("month", MonthlyStats, month, month_days)
+ROLLUPS = {rollup.name: rollup for rollup in (WEEK, MONTH)}
@@ -1,5 +1,5 @@
 from games.base import LinkedInSimpleTime
-from orm.models import QueensPlay
+from orm.models import QueensPlay, QueensPlayArchive
 from datetime import date
 
 
@@ -17,3 +17,4 @@ class QueensGame(LinkedInSimpleTime):
     start_date = date(2024, 5, 1)
     game_type = "queens"
     db_model = QueensPlay
+    archive_model = QueensPlayArchive
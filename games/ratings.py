@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Iterable, Type
+
+import numpy as np
+from tortoise import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
+
+from games.base import UPSERT_CHUNK_SIZE, Game
+from orm.models import PlayerRating, RatingProgress
+
+logger = logging.getLogger(__name__)
+
+INITIAL_RATING = 1500.0
+# Most a rating moves in one game number, against a field that all finished ahead or behind.
+K_FACTOR = 32.0
+
+
+def match_deltas(ratings: np.ndarray, scores: np.ndarray, higher_score_first: bool) -> np.ndarray:
+    """
+    Rating changes of one game number, scored as if every player played everyone else: a better
+    score wins, an equal one draws. Each pairing uses the Elo expectation, and K_FACTOR is split
+    over the opponents so a day weighs the same however many played it.
+    Args:
+        ratings (np.ndarray): Ratings of the players before the game number.
+        scores (np.ndarray): Their scores, in the same order.
+        higher_score_first (bool): Whether higher scores are better.
+    Returns:
+        np.ndarray: The change of each rating.
+    """
+    if len(ratings) < 2:
+        return np.zeros_like(ratings)
+    signed = scores if higher_score_first else -scores
+    actual = (signed[:, None] > signed[None, :]) + 0.5 * (signed[:, None] == signed[None, :])
+    expected = 1 / (1 + 10 ** ((ratings[None, :] - ratings[:, None]) / 400))
+    # the diagonal is a draw against oneself, expected and actual are both 0.5
+    return K_FACTOR / (len(ratings) - 1) * (actual - expected).sum(axis=1)
+
+
+def rate_plays(
+    plays: list[tuple[int, int, str, int]],
+    ratings: dict[tuple[int, str], tuple[float, int]],
+    higher_score_first: bool,
+) -> dict[tuple[int, str], tuple[float, int]]:
+    """
+    Rates game numbers in order, starting from known ratings.
+    Args:
+        plays (list[tuple[int, int, str, int]]): (chat_id, game_number, username, score) plays,
+            sorted by chat_id and game_number.
+        ratings (dict[tuple[int, str], tuple[float, int]]): Rating and matches so far of
+            (chat_id, username) players, others start at INITIAL_RATING.
+        higher_score_first (bool): Whether higher scores are better.
+    Returns:
+        dict[tuple[int, str], tuple[float, int]]: The new rating and matches of every player of
+            the plays.
+    """
+    if not plays:
+        return {}
+    players = {}
+    index = np.fromiter(
+        (
+            players.setdefault((chat_id, username), len(players))
+            for chat_id, _, username, _ in plays
+        ),
+        dtype=np.intp,
+        count=len(plays),
+    )
+    columns = np.array([(chat_id, number, score) for chat_id, number, _, score in plays]).T
+    chats, numbers, scores = columns[0], columns[1], columns[2].astype(float)
+    rating = np.full(len(players), INITIAL_RATING)
+    matches = np.zeros(len(players), dtype=int)
+    for player, position in players.items():
+        if player in ratings:
+            rating[position], matches[position] = ratings[player]
+    # one match per chat and game number, played in order
+    bounds = np.flatnonzero((chats[1:] != chats[:-1]) | (numbers[1:] != numbers[:-1])) + 1
+    for start, end in zip([0, *bounds], [*bounds, len(plays)]):
+        if end - start < 2:
+            continue
+        match = index[start:end]
+        rating[match] += match_deltas(rating[match], scores[start:end], higher_score_first)
+        matches[match] += 1
+    return {
+        player: (float(rating[position]), int(matches[position]))
+        for player, position in players.items()
+    }
+
+
+class RatingEngine:
+    """
+    Keeps player_rating up to date as game numbers close.
+
+    Each pass rates the game numbers that closed since the last one, starting from the stored
+    ratings of their players, so a day costs one small transaction. The first pass, and any
+    chat that got a late play for a game number that was already rated, is recomputed from its
+    whole history with `rate_plays`, in a worker thread so the event loop keeps serving the bot,
+    and written one chat per transaction. Corrections of an already rated play keep its id and are
+    only picked up by a recompute, see tools/ratings.py.
+    """
+
+    def __init__(self, games: Iterable[Type[Game]], interval: float = 3600):
+        self.games = list(games)
+        self.interval = interval
+        self.counters = Counter(game_numbers=0, recomputes=0, runs=0)
+        self._task: asyncio.Task | None = None
+
+    async def _max_play_id(self, game: Type[Game], connection: BaseDBAsyncClient) -> int:
+        play_id = 0
+        for model in (game.db_model, game.archive_model):
+            if model is not None:
+                _, rows = await connection.execute_query(
+                    f'SELECT MAX("id") AS "id" FROM "{model._meta.db_table}"'
+                )
+                play_id = max(play_id, rows[0]["id"] or 0)
+        return play_id
+
+    async def _load_plays(
+        self, game: Type[Game], connection: BaseDBAsyncClient, where_sql: str, params: list
+    ) -> list[tuple[int, int, str, int]]:
+        plays_sql, params = game._plays_sql(where_sql, params)
+        _, rows = await connection.execute_query(
+            f'SELECT "chat_id", "game_number", "username", "score" FROM ({plays_sql}) '
+            'ORDER BY "chat_id", "game_number"',
+            params,
+        )
+        return [tuple(row) for row in rows]
+
+    async def _store(
+        self,
+        game: Type[Game],
+        connection: BaseDBAsyncClient,
+        ratings: dict[tuple[int, str], tuple[float, int]],
+    ) -> None:
+        items = list(ratings.items())
+        for offset in range(0, len(items), UPSERT_CHUNK_SIZE):
+            chunk = items[offset : offset + UPSERT_CHUNK_SIZE]
+            await connection.execute_query(
+                f'INSERT INTO "{PlayerRating._meta.db_table}" '
+                '("chat_id", "username", "game_type", "rating", "matches") '
+                f"VALUES {', '.join(['(?, ?, ?, ?, ?)'] * len(chunk))} "
+                'ON CONFLICT ("chat_id", "username", "game_type") '
+                'DO UPDATE SET "rating" = excluded."rating", "matches" = excluded."matches"',
+                [
+                    value
+                    for (chat_id, username), (rating, matches) in chunk
+                    for value in (chat_id, username, game.game_type, rating, matches)
+                ],
+            )
+
+    async def recompute(
+        self,
+        game: Type[Game],
+        through_game_number: int,
+        chat_ids: Iterable[int] | None = None,
+    ) -> int:
+        """
+        Rates the whole history of a game again, in one pass over its plays.
+        The plays are rated off the event loop, and the ratings of each chat replaced in a short
+        transaction of their own.
+        Args:
+            game (Type[Game]): The game to rate.
+            through_game_number (int): The last game number to rate.
+            chat_ids (Iterable[int] | None): The chats to recompute, None for all of them.
+        Returns:
+            int: The number of plays rated.
+        """
+        where_sql, params = 'WHERE "game_number" <= ?', [through_game_number]
+        rated_sql, rated_params = 'WHERE "game_type" = ?', [game.game_type]
+        if chat_ids is not None:
+            chat_ids = sorted(set(chat_ids))
+            in_sql = f'"chat_id" IN ({", ".join("?" * len(chat_ids))})'
+            where_sql, params = f"{where_sql} AND {in_sql}", [*params, *chat_ids]
+            rated_sql, rated_params = f"{rated_sql} AND {in_sql}", [*rated_params, *chat_ids]
+        async with in_transaction() as connection:
+            plays = await self._load_plays(game, connection, where_sql, params)
+            _, rated = await connection.execute_query(
+                f'SELECT DISTINCT "chat_id" FROM "{PlayerRating._meta.db_table}" {rated_sql}',
+                rated_params,
+            )
+        ratings = await asyncio.to_thread(rate_plays, plays, {}, game.higher_score_first)
+        # chats rated before without any play left lose their ratings
+        ratings_by_chat = {row["chat_id"]: {} for row in rated}
+        for (chat_id, username), rating in ratings.items():
+            ratings_by_chat.setdefault(chat_id, {})[(chat_id, username)] = rating
+        for chat_id, chat_ratings in ratings_by_chat.items():
+            async with in_transaction() as connection:
+                await connection.execute_query(
+                    f'DELETE FROM "{PlayerRating._meta.db_table}" '
+                    'WHERE "game_type" = ? AND "chat_id" = ?',
+                    [game.game_type, chat_id],
+                )
+                await self._store(game, connection, chat_ratings)
+        self.counters["recomputes"] += 1
+        return len(plays)
+
+    async def update_game(self, game: Type[Game]) -> int:
+        """
+        Rates the game numbers of a game that closed since the last pass.
+        Returns:
+            int: The number of game numbers rated.
+        """
+        through = game.current_game_number() - 1
+        async with in_transaction() as connection:
+            progress = await RatingProgress.get_or_none(
+                game_type=game.game_type, using_db=connection
+            )
+            # later plays are checked for late ones by the next pass
+            play_id = await self._max_play_id(game, connection)
+            stale = []
+            if progress is not None:
+                # a late play changes every rating after it, redo the chats that got one
+                plays_sql, params = game._plays_sql(
+                    'WHERE "id" > ? AND "game_number" <= ?',
+                    [progress.play_id, progress.game_number],
+                )
+                _, stale = await connection.execute_query(
+                    f'SELECT DISTINCT "chat_id" FROM ({plays_sql})', params
+                )
+        if progress is None:
+            await self.recompute(game, through)
+            rated = through
+        elif stale:
+            await self.recompute(game, progress.game_number, [row["chat_id"] for row in stale])
+        async with in_transaction() as connection:
+            if progress is not None:
+                plays = await self._load_plays(
+                    game,
+                    connection,
+                    'WHERE "game_number" > ? AND "game_number" <= ?',
+                    [progress.game_number, through],
+                )
+                chat_ids = sorted({chat_id for chat_id, _, _, _ in plays})
+                ratings = {}
+                for offset in range(0, len(chat_ids), UPSERT_CHUNK_SIZE):
+                    chunk = chat_ids[offset : offset + UPSERT_CHUNK_SIZE]
+                    for row in (
+                        await PlayerRating.filter(game_type=game.game_type, chat_id__in=chunk)
+                        .using_db(connection)
+                        .values_list("chat_id", "username", "rating", "matches")
+                    ):
+                        ratings[(row[0], row[1])] = (row[2], row[3])
+                await self._store(
+                    game, connection, rate_plays(plays, ratings, game.higher_score_first)
+                )
+                rated = max(through - progress.game_number, 0)
+            await RatingProgress.update_or_create(
+                game_type=game.game_type,
+                defaults={"game_number": max(through, 0), "play_id": play_id},
+                using_db=connection,
+            )
+        self.counters["game_numbers"] += rated
+        return rated
+
+    async def update_once(self) -> int:
+        """
+        Rates the newly closed game numbers of every game.
+        Returns:
+            int: The number of game numbers rated.
+        """
+        rated = 0
+        for game in self.games:
+            rated += await self.update_game(game)
+        self.counters["runs"] += 1
+        return rated
+
+    async def rebuild(self) -> int:
+        """
+        Forgets every rating and rates the whole history again.
+        Returns:
+            int: The number of game numbers rated.
+        """
+        await RatingProgress.filter(game_type__in=[game.game_type for game in self.games]).delete()
+        return await self.update_once()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                start = time.perf_counter()
+                rated = await self.update_once()
+                if rated:
+                    logger.info(
+                        "Rated %d game numbers in %.1f ms",
+                        rated,
+                        (time.perf_counter() - start) * 1000,
+                    )
+            except Exception:
+                logger.exception("Updating ratings failed, will retry")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Starts rating closed game numbers in the background every interval seconds.
+        Must be called from a running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,7 +1,7 @@
 from datetime import date
 
 from games.base import LinkedInSimpleTime
-from orm.models import TangoPlay
+from orm.models import TangoPlay, TangoPlayArchive
 
 
 class TangoGame(LinkedInSimpleTime):
@@ -24,4 +24,5 @@ class TangoGame(LinkedInSimpleTime):
     start_date = date(2024, 10, 8)
     game_type = "tango"
     db_model = TangoPlay
+    archive_model = TangoPlayArchive
     higher_score_first = False
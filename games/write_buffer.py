@@ -0,0 +1,213 @@
+import asyncio
+import logging
+from typing import Type
+
+from games.base import Game, bulk_update_or_create_records
+from orm.models import DEFAULT_CHAT_ID
+
+logger = logging.getLogger(__name__)
+
+# (chat_id, username, game_number)
+RecordKey = tuple[int, str, int]
+
+
+class SubmissionBuffer:
+    """
+    Write-behind buffer between the message handler and the database.
+
+    Submissions are only queued in memory, so the handler can acknowledge a share without
+    waiting for a write. A repeat from the same user for the same game replaces the pending
+    one. Pending submissions are written together, in one transaction per chat, every
+    `flush_interval` seconds, or as soon as `max_rows` are waiting.
+
+    When a chat's transaction fails its submissions are written one at a time, so a bad record
+    does not hold back the rest of the chat. A record that still fails is retried with the
+    next flushes and, after `max_attempts` failed writes, dropped into `dead_letters`.
+
+    While the buffer is running, `Game.todays_data` merges pending submissions into the
+    leaderboard so reads never miss a score that was already acknowledged.
+    """
+
+    def __init__(self, flush_interval: float = 0.25, max_rows: int = 200, max_attempts: int = 5):
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_attempts = max_attempts
+        self._pending: dict[Type[Game], dict[RecordKey, dict]] = {}
+        # the batch currently being written, still visible to reads until it commits
+        self._in_flight: dict[Type[Game], dict[RecordKey, dict]] = {}
+        self._size = 0
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        # failed writes of the records that were put back
+        self._attempts: dict[tuple[Type[Game], RecordKey], int] = {}
+        # (game, key, defaults) of the records given up on
+        self.dead_letters: list[tuple[Type[Game], RecordKey, dict]] = []
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def submit(
+        self,
+        game: Type[Game],
+        username: str,
+        game_number: int,
+        defaults: dict,
+        chat_id: int = DEFAULT_CHAT_ID,
+    ) -> None:
+        """
+        Queues a play to be written with the next flush.
+        Args:
+            game (Type[Game]): The game the play belongs to.
+            username (str): The username of the player.
+            game_number (int): The game number.
+            defaults (dict): The column values, as returned by `get_update_defaults`.
+            chat_id (int): The chat the play was shared in.
+        """
+        records = self._pending.setdefault(game, {})
+        if (chat_id, username, game_number) not in records:
+            self._size += 1
+        records[(chat_id, username, game_number)] = defaults
+        if self._size >= self.max_rows:
+            self._wake.set()
+
+    def pending_records(
+        self, game: Type[Game], game_number: int, chat_id: int = DEFAULT_CHAT_ID
+    ) -> list[tuple[str, dict]]:
+        """
+        Returns the submissions in a chat for a game number that are not committed yet.
+        Args:
+            game (Type[Game]): The game to look up.
+            game_number (int): The game number to look up.
+            chat_id (int): The chat to look up.
+        Returns:
+            list[tuple[str, dict]]: The username and defaults of each pending play.
+        """
+        merged = {}
+        for records in (self._in_flight.get(game, {}), self._pending.get(game, {})):
+            for (chat, username, number), defaults in records.items():
+                if number == game_number and chat == chat_id:
+                    merged[username] = defaults
+        return list(merged.items())
+
+    async def flush(self) -> int:
+        """
+        Writes every pending submission, in a single transaction per chat.
+        If a chat fails its records are written one by one, and the ones that fail are put back,
+        without overriding newer submissions, or dead lettered after `max_attempts` failures.
+        Returns:
+            int: The number of records that were created.
+        """
+        async with self._flush_lock:
+            if not self._size:
+                return 0
+            self._in_flight, self._pending, self._size = self._pending, {}, 0
+            records_by_chat: dict[int, dict[Type[Game], list]] = {}
+            for game, records in self._in_flight.items():
+                for (chat_id, username, number), defaults in records.items():
+                    records_by_chat.setdefault(chat_id, {}).setdefault(game, []).append(
+                        (username, number, defaults)
+                    )
+            created, written = 0, set()
+            try:
+                for chat_id, records_by_game in records_by_chat.items():
+                    try:
+                        created += await bulk_update_or_create_records(records_by_game, chat_id)
+                    except Exception:
+                        logger.exception("Writing the submissions of chat %d failed", chat_id)
+                        created += await self._write_one_by_one(records_by_game, chat_id)
+                    else:
+                        for game, records in records_by_game.items():
+                            for username, number, _ in records:
+                                self._attempts.pop((game, (chat_id, username, number)), None)
+                    written.add(chat_id)
+            except BaseException:
+                # cancelled mid flush, the chats that were not written yet are put back
+                for game, records in self._in_flight.items():
+                    newer = self._pending.setdefault(game, {})
+                    for key, defaults in records.items():
+                        if key[0] not in written and key not in newer:
+                            newer[key] = defaults
+                            self._size += 1
+                raise
+            finally:
+                self._in_flight = {}
+            self.flushes += 1
+            return created
+
+    async def _write_one_by_one(self, records_by_game: dict[Type[Game], list], chat_id: int) -> int:
+        created = 0
+        for game, records in records_by_game.items():
+            for username, number, defaults in records:
+                key = (chat_id, username, number)
+                try:
+                    created += await bulk_update_or_create_records(
+                        {game: [(username, number, defaults)]}, chat_id
+                    )
+                except Exception:
+                    self._put_back(game, key, defaults)
+                else:
+                    self._attempts.pop((game, key), None)
+        return created
+
+    def _put_back(self, game: Type[Game], key: RecordKey, defaults: dict) -> None:
+        newer = self._pending.setdefault(game, {})
+        if key in newer:
+            # a newer submission replaces the failing one
+            self._attempts.pop((game, key), None)
+            return
+        attempts = self._attempts.get((game, key), 0) + 1
+        if attempts >= self.max_attempts:
+            self._attempts.pop((game, key), None)
+            self.dead_letters.append((game, key, defaults))
+            logger.exception(
+                "Dropping the %s play of %s for #%d in chat %d after %d failed writes",
+                game.game_type,
+                key[1],
+                key[2],
+                key[0],
+                attempts,
+            )
+            return
+        self._attempts[(game, key)] = attempts
+        newer[key] = defaults
+        self._size += 1
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing %d pending submissions failed, will retry", self._size)
+
+    def start(self) -> None:
+        """
+        Starts the background flush task and makes pending submissions visible to reads.
+        Must be called from a running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        Game.write_buffer = self
+
+    async def stop(self) -> None:
+        """
+        Stops the background flush task and writes whatever is still pending.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        finally:
+            if Game.write_buffer is self:
+                Game.write_buffer = None
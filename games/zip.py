@@ -1,8 +1,7 @@
-import re
 from datetime import date
 
 from games.base import Game
-from orm.models import ZipPlay
+from orm.models import ZipPlay, ZipPlayArchive
 
 
 class ZipGame(Game):
@@ -23,11 +22,20 @@ class ZipGame(Game):
     start_date = date(2025, 3, 18)
     game_type = "zip"
     db_model = ZipPlay
+    archive_model = ZipPlayArchive
     higher_score_first = False
+    stats_counts = ("flawless",)
+    # Seconds added to the time for each backtrack. Rescore the stored plays with
+    # tools/rescore.py after a change.
+    backtrack_penalty = 5
 
     @classmethod
-    def str_matches(cls, input_text: str) -> bool:
-        return input_text.startswith("Zip #")
+    def dispatch_regex(cls) -> str:
+        return r"Zip #"
+
+    @classmethod
+    def parse_regex(cls) -> str:
+        return r"Zip\s++#(?P<game_number>\d++)\s*+\|\s*+(?P<minutes>\d++):(?P<seconds>\d++)(?:[^\n]*+\n(?:With\s++(?:(?P<backtracks>\d++)|no)\s++backtracks?)?)?"
 
     @classmethod
     def get_update_defaults(cls, data: dict[str, int | bool]) -> dict[str, int | bool]:
@@ -47,17 +55,17 @@ class ZipGame(Game):
         }
 
     @classmethod
-    def process_to_dict(cls, text: str) -> dict[str, str | int | bool]:
+    def process_to_dict(cls, text: str, start: int = 0) -> dict[str, str | int | bool]:
         """
         Processes the input text to extract game information.
         Args:
             text (str): The input text containing Zip game information.
+            start (int): Position in the text to start searching from.
         Returns:
             dict[str, str | int | bool]: A dictionary with the extracted game information.
         """
-        backtracks_value = 5  # Value assigned to each backtrack
-        regex = r"Zip\s+#(?P<game_number>\d+)\s*\|\s*(?P<minutes>\d+):(?P<seconds>\d+)(?:.*?\n)?(?:With\s+(?:(?P<backtracks>\d+)|no)\s+backtracks?)?"
-        match = re.search(regex, text)
+        end = start + cls.parse_window
+        match = cls.parse_pattern.search(text, start, end)
         if not match:
             raise ValueError("No Zip game information found.")
         game_number = match.group("game_number")
@@ -75,14 +83,14 @@ class ZipGame(Game):
             backtracks = 0
         else:
             backtracks = int(backtracks)
-        score = total_seconds + (backtracks * backtracks_value)
+        score = total_seconds + (backtracks * cls.backtrack_penalty)
         data = {
             "game_type": "zip",
             "game_number": game_number,
             "score": score,
             "total_seconds": total_seconds,
             "backtracks": backtracks,
-            "flawless": "and flawless" in text,
+            "flawless": text.find("and flawless", start, end) != -1,
             "raw_text": text,
         }
         return data
@@ -1,5 +1,6 @@
 from html import escape
-import requests
+
+from image_generators.renderer import RendererClient
 
 # import BROWSERLESS_URL if not running pytest otherwise use mock
 if "pytest" in __import__("sys").modules:
@@ -7,6 +8,9 @@ if "pytest" in __import__("sys").modules:
 else:
     from secret import BROWSERLESS_URL
 
+# One pooled client for every render, closed when the bot shuts down.
+renderer = RendererClient(BROWSERLESS_URL)
+
 
 def generate_leaderboard_payload(games_data, viewport_width=1000, viewport_height=390):
     def get_rank_class(index):
@@ -158,13 +162,4 @@ async def generate_leaderboard_image(games_data: list[dict]) -> bytes:
         bytes: The generated image in PNG format.
     """
     payload = generate_leaderboard_payload(games_data)
-    response = requests.post(
-        f"{BROWSERLESS_URL}/screenshot",
-        json=payload,
-        headers={"Content-Type": "application/json"},
-    )
-
-    if response.status_code != 200:
-        raise Exception(f"Failed to generate image: {response.text}")
-
-    return response.content
+    return await renderer.screenshot(payload)
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Statuses of a renderer that is restarting or overloaded, worth another attempt.
+RETRY_STATUSES = {502, 503, 504}
+
+
+class RendererClient:
+    """
+    Client of the browserless screenshot API, sharing one pooled async HTTP client.
+
+    Renders wait on the event loop instead of blocking it, so other updates keep being handled
+    while a screenshot is taken, and consecutive renders reuse kept-alive connections. Connection
+    errors, timeouts and RETRY_STATUSES are retried up to `retries` more times, waiting
+    `backoff` seconds and then twice as long before each further attempt.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_connections: int = 4,
+    ):
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # created on first use, so it belongs to the running event loop
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, limits=self.limits
+            )
+        return self._client
+
+    async def screenshot(self, payload: dict) -> bytes:
+        """
+        Renders a page with the /screenshot endpoint.
+        Args:
+            payload (dict): The html, viewport and options of the screenshot.
+        Returns:
+            bytes: The image.
+        """
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = await self.client.post("/screenshot", json=payload)
+            except httpx.TransportError as error:
+                if attempt == self.retries:
+                    raise
+                logger.warning("Render attempt %d failed: %r, retrying", attempt + 1, error)
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                logger.warning(
+                    "Render attempt %d got status %d, retrying", attempt + 1, response.status_code
+                )
+                continue
+            if response.status_code != 200:
+                raise Exception(f"Failed to generate image: {response.text}")
+            return response.content
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
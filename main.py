@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import sys
 
 from rich import print  # noqa: F401
 from telegram import Update
@@ -12,33 +14,47 @@ from telegram.ext import (
 )
 from tortoise import Tortoise
 
-from games.crossclimb import CrossClimbGame
-from games.mini_crossword import MiniCrosswordGame
-from games.mini_sudoku import MiniSudokuGame
-from games.queens import QueensGame
-from games.tango import TangoGame
-from games.zip import ZipGame
-from image_generators.leaderboard import generate_leaderboard_image
-from games.connections import ConnectionsGame
+from games import GAMES
+from games.archive import PlayArchiver
+from games.base import (
+    PERIOD_RANKINGS,
+    period_leaderboards,
+    rating_leaderboards,
+    todays_leaderboards,
+    user_stats,
+)
+from games.dispatch import GameDispatcher
+from games.leaderboard_cache import LeaderboardCache
+from games.write_buffer import SubmissionBuffer
+from orm.schema_version import check_schema_version
 from aerich_config import TORTOISE_ORM
 from telegram.constants import ReactionEmoji
 
 TOKEN = "SECRET"
-games = [
-    ConnectionsGame,
-    QueensGame,
-    TangoGame,
-    ZipGame,
-    MiniCrosswordGame,
-    MiniSudokuGame,
-    CrossClimbGame,
-]
+games = GAMES
+dispatcher = GameDispatcher(games)
+write_buffer = SubmissionBuffer()
+leaderboard_cache = LeaderboardCache()
+# numpy backed, created by init_db so importing main does not load numpy
+distribution_cache = None
+DISPATCH_LOG_EVERY = 1000
 
 if TOKEN == "SECRET":
     try:
         from secret import TOKEN
     except:  # noqa: E722
         raise Exception("You need to set your telegram token in secret.py!")
+try:
+    from secret import ARCHIVE_AFTER_DAYS
+except ImportError:
+    ARCHIVE_AFTER_DAYS = 30
+archiver = PlayArchiver(games, horizon_days=ARCHIVE_AFTER_DAYS)
+# also created by init_db, for the same reason
+rating_engine = None
+try:
+    from secret import BOT_API_URL
+except ImportError:
+    BOT_API_URL = None
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
@@ -88,6 +104,74 @@ async def chart_test(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return
 
 
+def format_stats(username: str, stats: list[dict], standings: list[dict] = ()) -> str:
+    if not stats:
+        return f"No plays recorded for {username} yet."
+    lines = [f"Stats for {username}:"]
+    for game in stats:
+        line = (
+            f"{game['game_type'].title()}: {game['plays']} plays, best {game['best']}, "
+            f"worst {game['worst']}, average {game['average']:.1f}"
+        )
+        for name, count in game["counts"].items():
+            line += f", {count} {name}"
+        line += f", streak {game['streak']} (longest {game['longest_streak']})"
+        lines.append(line)
+    for standing in standings:
+        lines.append(
+            f"{standing['game_type'].title()} today: top {standing['top_percent']:.0f}%, "
+            f"#{standing['rank']} of {standing['plays']} with {standing['score']}"
+        )
+    return "\n".join(lines)
+
+
+def format_distributions(distributions: list[dict]) -> str:
+    if not distributions:
+        return "No plays recorded yet."
+    bars = "▁▂▃▄▅▆▇█"
+    lines = []
+    for data in distributions:
+        percentiles = data["percentiles"]
+        peak = max(data["histogram"])
+        histogram = "".join(bars[(len(bars) - 1) * count // peak] for count in data["histogram"])
+        lines.append(
+            f"{data['game_type'].title()}: {data['plays']} plays, median {percentiles[50]:.0f}, "
+            f"middle half {percentiles[25]:.0f}-{percentiles[75]:.0f}, "
+            f"mean {data['mean']:.1f} ± {data['std']:.1f}"
+        )
+        lines.append(f"{data['edges'][0]:.0f} {histogram} {data['edges'][-1]:.0f}")
+    return "\n".join(lines)
+
+
+def format_ratings(leaderboards: list[dict]) -> str:
+    lines = []
+    for data in leaderboards:
+        if not data["leaderboard"]:
+            continue
+        lines.append(f"{data['game_type'].title()}:")
+        for rank, row in enumerate(data["leaderboard"], start=1):
+            lines.append(f"{rank}. {row['username']} {row['rating']} ({row['matches']} days)")
+    if not lines:
+        return "No ratings yet, they start once a game day is over."
+    return "\n".join(lines)
+
+
+def format_period_leaderboards(period: str, ranking: str, leaderboards: list[dict]) -> str:
+    lines = [f"This {period}'s leaderboard by {ranking}:"]
+    for data in leaderboards:
+        if not data["leaderboard"]:
+            continue
+        lines.append(f"{data['game_type'].title()}:")
+        for rank, row in enumerate(data["leaderboard"], start=1):
+            lines.append(
+                f"{rank}. {row['username']} {row['days']} days, total {row['total']}, "
+                f"average {row['average']:.1f}"
+            )
+    if len(lines) == 1:
+        return f"No plays recorded this {period} yet."
+    return "\n".join(lines)
+
+
 async def handle_text_input(text: str, update: Update, context: ContextTypes.DEFAULT_TYPE):
     async def respond(text: str):
         if not update.effective_chat or not update.message:
@@ -106,17 +190,21 @@ async def handle_text_input(text: str, update: Update, context: ContextTypes.DEF
         return
 
     resp = None
-    json = None
-    for game in games:
-        if game.str_matches(text):
-            _, json = await game.parse_text(text, username)
-            break
+    # every chat keeps its own plays and leaderboards
+    chat_id = update.effective_chat.id
+    plays = dispatcher.parse_all(text)
+    for game, data in plays:
+        # written in the background, todays_data already includes it
+        write_buffer.submit(
+            game, username, data["game_number"], game.get_update_defaults(data), chat_id
+        )
 
-    if not json:
+    if not plays:
         if text.startswith("/todays_leaderboard"):
-            data = []
-            for game in games:
-                data.append(await game.todays_data())
+            # imported on first use, it needs BROWSERLESS_URL which only this command uses
+            from image_generators.leaderboard import generate_leaderboard_image
+
+            data = await todays_leaderboards(games, chat_id=chat_id)
             image = await generate_leaderboard_image(data)
             await context.bot.send_photo(
                 chat_id=update.effective_chat.id,
@@ -126,6 +214,35 @@ async def handle_text_input(text: str, update: Update, context: ContextTypes.DEF
                 disable_notification=True,
             )
 
+        elif text.startswith("/stats"):
+            # the per-player totals, plus where today's plays sit from the distribution cache
+            from games.distribution import todays_standings
+
+            resp = format_stats(
+                username,
+                await user_stats(games, username, chat_id),
+                await todays_standings(games, username, chat_id=chat_id),
+            )
+
+        elif text.startswith("/distribution"):
+            from games.distribution import distribution_data
+
+            resp = format_distributions(await distribution_data(games, chat_id))
+
+        elif text.startswith(("/week_leaderboard", "/month_leaderboard")):
+            # read from the weekly and monthly rollups, e.g. "/week_leaderboard average"
+            command, _, ranking = text.partition(" ")
+            period = "week" if command.startswith("/week") else "month"
+            ranking = ranking.strip() or "total"
+            if ranking in PERIOD_RANKINGS:
+                data = await period_leaderboards(games, period, ranking, chat_id=chat_id)
+                resp = format_period_leaderboards(period, ranking, data)
+            else:
+                resp = f"Rank the {period} by one of: {', '.join(PERIOD_RANKINGS)}"
+
+        elif text.startswith("/ratings"):
+            resp = format_ratings(await rating_leaderboards(games, chat_id))
+
         elif text.startswith("/chart_test"):
             print("Chart test command received")
             await chart_test(update, context)
@@ -133,8 +250,8 @@ async def handle_text_input(text: str, update: Update, context: ContextTypes.DEF
         else:
             # ignore chatter
             ...
-    if json:
-        # react to the message by thumbs upping it
+    if plays:
+        # react once to the message, however many scores it contained
         await context.bot.set_message_reaction(
             chat_id=update.effective_chat.id,
             message_id=update.effective_message.message_id,
@@ -149,17 +266,27 @@ async def text_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         print("Update does not contain a message or text!")
         return
     text = update.message.text.strip()
-    print("~" * 80)
-    print(text)
-    print("~" * 80)
-
     await handle_text_input(text, update, context)
+    if dispatcher.counters["messages"] % DISPATCH_LOG_EVERY == 0:
+        logging.info(
+            "Dispatcher counters: %s, %.1f%% rejected by pre-filter",
+            dict(dispatcher.counters),
+            dispatcher.rejection_rate * 100,
+        )
+        logging.info(
+            "Leaderboard cache counters: %s, %.1f%% hit rate",
+            dict(leaderboard_cache.counters),
+            leaderboard_cache.hit_rate * 100,
+        )
 
 
 def start_telegram_agent():
     """
     Start the Telegram bot agent."""
-    application = ApplicationBuilder().token(TOKEN).post_init(post_init).build()
+    builder = ApplicationBuilder().token(TOKEN).post_init(post_init).post_shutdown(post_shutdown)
+    if BOT_API_URL:
+        builder = builder.base_url(BOT_API_URL)
+    application = builder.build()
     start_handler = CommandHandler("start", start)
 
     # message handler to handle random strings
@@ -171,23 +298,63 @@ def start_telegram_agent():
     application.run_polling()
 
 
-async def post_init(application: Application):
+async def init_db():
     """
-    This function is called after the telegram application is built."""
+    Opens the database and starts the background writers."""
     # Startup Tortoise
     await Tortoise.init(config=TORTOISE_ORM)
-    # Generate schemas
-    await Tortoise.generate_schemas()
-    # Set bot commands
-    await application.bot.set_my_commands(
-        [
-            # ("start", "Starts the bot"),
-            ("todays_leaderboard", "Shows today's leaderboard"),
-            ("stats", "Shows your game stats"),
-            ("chart_test", "Test command for chart"),
-        ]
+    # The schema is owned by the aerich migrations, only check they were applied
+    await check_schema_version(Tortoise.get_connection("default"))
+    # imported here rather than with main, they load numpy
+    from games.distribution import DistributionCache
+    from games.ratings import RatingEngine
+
+    global distribution_cache, rating_engine
+    distribution_cache = DistributionCache()
+    rating_engine = RatingEngine(games)
+    leaderboard_cache.enable()
+    distribution_cache.enable()
+    write_buffer.start()
+    archiver.start()
+    rating_engine.start()
+
+
+async def post_init(application: Application):
+    """
+    This function is called after the telegram application is built."""
+    # The database and the Telegram API don't depend on each other, wait for both at once
+    await asyncio.gather(
+        init_db(),
+        # Set bot commands
+        application.bot.set_my_commands(
+            [
+                # ("start", "Starts the bot"),
+                ("todays_leaderboard", "Shows today's leaderboard"),
+                ("week_leaderboard", "Shows this week's leaderboard"),
+                ("month_leaderboard", "Shows this month's leaderboard"),
+                ("stats", "Shows your game stats"),
+                ("ratings", "Shows the skill ratings"),
+                ("distribution", "Shows how everyone's scores are spread"),
+                ("chart_test", "Test command for chart"),
+            ]
+        ),
     )
 
 
+async def post_shutdown(application: Application):
+    """
+    This function is called when the telegram application shuts down."""
+    # Write any pending submissions before closing the database
+    if rating_engine is not None:
+        await rating_engine.stop()
+    await archiver.stop()
+    await write_buffer.stop()
+    await Tortoise.close_connections()
+    if "image_generators.leaderboard" in sys.modules:
+        from image_generators.leaderboard import renderer
+
+        await renderer.aclose()
+
+
 if __name__ == "__main__":
     start_telegram_agent()
@@ -0,0 +1,51 @@
+from tortoise import BaseDBAsyncClient
+
+# daily_leaderboard keeps the id of each ranked play, so the leaderboard cache can be filled
+# from it and still break ties like the play tables. The table is refilled from the plays, with
+# the ranking of Game._ranked_plays_sql: archived plays count unless resubmitted after being
+# archived, and ties go to the lower id.
+# (game_type, hot table, higher score first)
+GAMES = [
+    ("connections", "connections_play", True),
+    ("crossclimb", "crossclimb_play", False),
+    ("miniCrossword", "minicrosswordplay", False),
+    ("mini sudoku", "minisudoku_play", False),
+    ("queens", "queens_play", False),
+    ("tango", "tango_play", False),
+    ("zip", "zip_play", False),
+]
+DEPTH = 25
+
+
+def ranked_sql(game_type: str, table: str, higher_score_first: bool) -> str:
+    plays = (
+        f'SELECT "id", "chat_id", "game_number", "username", "score" FROM "{table}" '
+        f'UNION ALL SELECT "id", "chat_id", "game_number", "username", "score" '
+        f'FROM "{table}_archive" AS "a" WHERE NOT EXISTS ('
+        f'SELECT 1 FROM "{table}" AS "h" WHERE "h"."chat_id" = "a"."chat_id" '
+        'AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number")'
+    )
+    order = "DESC" if higher_score_first else "ASC"
+    return (
+        'INSERT INTO "daily_leaderboard" '
+        '("game_type", "chat_id", "game_number", "rank", "play_id", "username", "score") '
+        f'SELECT \'{game_type}\', "chat_id", "game_number", "rank", "id", "username", "score" '
+        'FROM (SELECT "id", "chat_id", "game_number", "username", "score", ROW_NUMBER() OVER ('
+        f'PARTITION BY "chat_id", "game_number" ORDER BY "score" {order}, "id") AS "rank" '
+        f'FROM ({plays})) WHERE "rank" <= {DEPTH};'
+    )
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return "\n".join(
+        [
+            'ALTER TABLE "daily_leaderboard" ADD "play_id" INT NOT NULL DEFAULT 0;',
+            'DELETE FROM "daily_leaderboard";',
+            *(ranked_sql(*game) for game in GAMES),
+        ]
+    )
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "daily_leaderboard" DROP COLUMN "play_id";"""
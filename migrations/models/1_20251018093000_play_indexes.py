@@ -0,0 +1,64 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # crossclimb_play and minisudoku_play were only ever created by generate_schemas.
+    # Duplicate plays are dropped, keeping the latest one, before the unique index is added.
+    return """
+        CREATE TABLE IF NOT EXISTS "crossclimb_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "raw_text" TEXT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "minisudoku_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "raw_text" TEXT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL
+);
+DELETE FROM "connections_play" WHERE "id" NOT IN (SELECT MAX("id") FROM "connections_play" GROUP BY "username", "game_number");
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_connections_usernam_37a052" ON "connections_play" ("username", "game_number");
+CREATE INDEX IF NOT EXISTS "idx_connections_game_nu_435a99" ON "connections_play" ("game_number", "score");
+DELETE FROM "crossclimb_play" WHERE "id" NOT IN (SELECT MAX("id") FROM "crossclimb_play" GROUP BY "username", "game_number");
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_crossclimb__usernam_5be30b" ON "crossclimb_play" ("username", "game_number");
+CREATE INDEX IF NOT EXISTS "idx_crossclimb__game_nu_31357a" ON "crossclimb_play" ("game_number", "score");
+DELETE FROM "minicrosswordplay" WHERE "id" NOT IN (SELECT MAX("id") FROM "minicrosswordplay" GROUP BY "username", "game_number");
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_minicrosswo_usernam_fc9b1b" ON "minicrosswordplay" ("username", "game_number");
+CREATE INDEX IF NOT EXISTS "idx_minicrosswo_game_nu_28d1b6" ON "minicrosswordplay" ("game_number", "score");
+DELETE FROM "minisudoku_play" WHERE "id" NOT IN (SELECT MAX("id") FROM "minisudoku_play" GROUP BY "username", "game_number");
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_minisudoku__usernam_7c8439" ON "minisudoku_play" ("username", "game_number");
+CREATE INDEX IF NOT EXISTS "idx_minisudoku__game_nu_e9b681" ON "minisudoku_play" ("game_number", "score");
+DELETE FROM "queens_play" WHERE "id" NOT IN (SELECT MAX("id") FROM "queens_play" GROUP BY "username", "game_number");
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_queens_play_usernam_71d176" ON "queens_play" ("username", "game_number");
+CREATE INDEX IF NOT EXISTS "idx_queens_play_game_nu_277f1f" ON "queens_play" ("game_number", "score");
+DELETE FROM "tango_play" WHERE "id" NOT IN (SELECT MAX("id") FROM "tango_play" GROUP BY "username", "game_number");
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_tango_play_usernam_1a8fc2" ON "tango_play" ("username", "game_number");
+CREATE INDEX IF NOT EXISTS "idx_tango_play_game_nu_ec4fff" ON "tango_play" ("game_number", "score");
+DELETE FROM "zip_play" WHERE "id" NOT IN (SELECT MAX("id") FROM "zip_play" GROUP BY "username", "game_number");
+CREATE UNIQUE INDEX IF NOT EXISTS "uid_zip_play_usernam_1ad619" ON "zip_play" ("username", "game_number");
+CREATE INDEX IF NOT EXISTS "idx_zip_play_game_nu_4027ae" ON "zip_play" ("game_number", "score");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "uid_connections_usernam_37a052";
+DROP INDEX IF EXISTS "idx_connections_game_nu_435a99";
+DROP INDEX IF EXISTS "uid_crossclimb__usernam_5be30b";
+DROP INDEX IF EXISTS "idx_crossclimb__game_nu_31357a";
+DROP INDEX IF EXISTS "uid_minicrosswo_usernam_fc9b1b";
+DROP INDEX IF EXISTS "idx_minicrosswo_game_nu_28d1b6";
+DROP INDEX IF EXISTS "uid_minisudoku__usernam_7c8439";
+DROP INDEX IF EXISTS "idx_minisudoku__game_nu_e9b681";
+DROP INDEX IF EXISTS "uid_queens_play_usernam_71d176";
+DROP INDEX IF EXISTS "idx_queens_play_game_nu_277f1f";
+DROP INDEX IF EXISTS "uid_tango_play_usernam_1a8fc2";
+DROP INDEX IF EXISTS "idx_tango_play_game_nu_ec4fff";
+DROP INDEX IF EXISTS "uid_zip_play_usernam_1ad619";
+DROP INDEX IF EXISTS "idx_zip_play_game_nu_4027ae";"""
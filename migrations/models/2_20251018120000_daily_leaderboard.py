@@ -0,0 +1,55 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Filled with the top 25 plays of every game number, like Game.refresh_daily_leaderboard.
+    return """
+        CREATE TABLE IF NOT EXISTS "daily_leaderboard" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "game_type" VARCHAR(32) NOT NULL,
+    "game_number" INT NOT NULL,
+    "rank" INT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "score" INT NOT NULL,
+    CONSTRAINT "uid_daily_leade_game_ty_e39f38" UNIQUE ("game_type", "game_number", "rank")
+) /* Top plays of every game and game number, ranked. */;
+INSERT INTO "daily_leaderboard" ("game_type", "game_number", "rank", "username", "score")
+SELECT 'connections', "game_number", "rank", "username", "score" FROM (
+    SELECT "game_number", "username", "score", ROW_NUMBER() OVER (PARTITION BY "game_number" ORDER BY "score" DESC, "id") AS "rank"
+    FROM "connections_play"
+) WHERE "rank" <= 25;
+INSERT INTO "daily_leaderboard" ("game_type", "game_number", "rank", "username", "score")
+SELECT 'crossclimb', "game_number", "rank", "username", "score" FROM (
+    SELECT "game_number", "username", "score", ROW_NUMBER() OVER (PARTITION BY "game_number" ORDER BY "score" ASC, "id") AS "rank"
+    FROM "crossclimb_play"
+) WHERE "rank" <= 25;
+INSERT INTO "daily_leaderboard" ("game_type", "game_number", "rank", "username", "score")
+SELECT 'miniCrossword', "game_number", "rank", "username", "score" FROM (
+    SELECT "game_number", "username", "score", ROW_NUMBER() OVER (PARTITION BY "game_number" ORDER BY "score" ASC, "id") AS "rank"
+    FROM "minicrosswordplay"
+) WHERE "rank" <= 25;
+INSERT INTO "daily_leaderboard" ("game_type", "game_number", "rank", "username", "score")
+SELECT 'mini sudoku', "game_number", "rank", "username", "score" FROM (
+    SELECT "game_number", "username", "score", ROW_NUMBER() OVER (PARTITION BY "game_number" ORDER BY "score" ASC, "id") AS "rank"
+    FROM "minisudoku_play"
+) WHERE "rank" <= 25;
+INSERT INTO "daily_leaderboard" ("game_type", "game_number", "rank", "username", "score")
+SELECT 'queens', "game_number", "rank", "username", "score" FROM (
+    SELECT "game_number", "username", "score", ROW_NUMBER() OVER (PARTITION BY "game_number" ORDER BY "score" ASC, "id") AS "rank"
+    FROM "queens_play"
+) WHERE "rank" <= 25;
+INSERT INTO "daily_leaderboard" ("game_type", "game_number", "rank", "username", "score")
+SELECT 'tango', "game_number", "rank", "username", "score" FROM (
+    SELECT "game_number", "username", "score", ROW_NUMBER() OVER (PARTITION BY "game_number" ORDER BY "score" ASC, "id") AS "rank"
+    FROM "tango_play"
+) WHERE "rank" <= 25;
+INSERT INTO "daily_leaderboard" ("game_type", "game_number", "rank", "username", "score")
+SELECT 'zip', "game_number", "rank", "username", "score" FROM (
+    SELECT "game_number", "username", "score", ROW_NUMBER() OVER (PARTITION BY "game_number" ORDER BY "score" ASC, "id") AS "rank"
+    FROM "zip_play"
+) WHERE "rank" <= 25;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "daily_leaderboard";"""
@@ -0,0 +1,98 @@
+import zlib
+
+from tortoise import BaseDBAsyncClient
+
+# Plays moved per statement, so memory stays flat however big the tables are.
+BATCH_SIZE = 1000
+PLAY_TABLES = {
+    "connections_play": "connections",
+    "crossclimb_play": "crossclimb",
+    "minicrosswordplay": "miniCrossword",
+    "minisudoku_play": "mini sudoku",
+    "queens_play": "queens",
+    "tango_play": "tango",
+    "zip_play": "zip",
+}
+# A copy of version 1 of the shared dictionary of orm/raw_text.py and its codec, so the
+# migration keeps writing what it wrote whatever orm.raw_text becomes.
+DICTIONARY_VERSION = 1
+DICTIONARY = "".join(
+    [
+        "I solved the New York Times Mini Crossword in ! https://www.nytimes.com/crosswords/game/mini",
+        "Mini Sudoku # |  ✏️\n\n🏅 I’m on a -day win streak!\n\n",
+        "The classic game, made mini. Handcrafted by the originators of “Sudoku.”\n\nlnkd.in/minisudoku.",
+        "Crossclimb # |  and flawless\nFill order: 1️⃣ 2️⃣ 3️⃣ 4️⃣ 5️⃣ ⬆️ ⬇️ 🪜\nlnkd.in/crossclimb.",
+        "Tango # |  and flawless\nFirst 5 placements:\n🟨🟨🟨🟨🟨🟨\n1️⃣2️⃣3️⃣4️⃣5️⃣\nlnkd.in/tango.",
+        "Zip # |  and flawless 🏁\nWith no backtracks 🟢\nWith  backtracks 🛑\nlnkd.in/zip.",
+        "Queens # |  and flawless\nFirst 👑s: 🟩 🟦 🟨 🟪 🟧 ⬜ \nlnkd.in/queens",
+        "🏅 I’m in the Top 1% of all players today!\n🏅 I’m in the Top 5% of all players today!",
+        "🏅 I’m in the Top 10% of all players today!\n🏅 I’m in the Top 25% of all players today!",
+        "Connections\nPuzzle #\n🟪🟦🟨🟩\n🟨🟨🟨🟩\n🟦🟦🟦🟪\n🟩🟩🟩🟨\n🟪🟪🟪🟦\n",
+        "🟪🟪🟪🟪\n🟦🟦🟦🟦\n🟩🟩🟩🟩\n🟨🟨🟨🟨\n",
+    ]
+).encode()
+
+
+def compress_text(text: str) -> bytes:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=DICTIONARY)
+    return bytes([DICTIONARY_VERSION]) + compressor.compress(text.encode()) + compressor.flush()
+
+
+def decompress_text(data: bytes) -> str:
+    if data[0] != DICTIONARY_VERSION:
+        raise ValueError(f"Share text of dictionary {data[0]}, this migration only knows 1.")
+    decompressor = zlib.decompressobj(-15, zdict=DICTIONARY)
+    return (decompressor.decompress(data[1:]) + decompressor.flush()).decode()
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # raw_text moves to play_text compressed, in batches by id, before the columns are dropped.
+    await db.execute_script(
+        """
+        CREATE TABLE IF NOT EXISTS "play_text" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "game_type" VARCHAR(32) NOT NULL,
+    "play_id" INT NOT NULL,
+    "compressed" BLOB NOT NULL,
+    CONSTRAINT "uid_play_text_game_ty_d6f342" UNIQUE ("game_type", "play_id")
+) /* Share message of a play, compressed with the shared dictionaries in orm\\/raw_text.py. */;"""
+    )
+    for table, game_type in PLAY_TABLES.items():
+        last_id = 0
+        while True:
+            _, rows = await db.execute_query(
+                f'SELECT "id", "raw_text" FROM "{table}" WHERE "id" > ? ORDER BY "id" LIMIT ?',
+                [last_id, BATCH_SIZE],
+            )
+            if not rows:
+                break
+            await db.execute_many(
+                'INSERT OR REPLACE INTO "play_text" ("game_type", "play_id", "compressed") '
+                "VALUES (?, ?, ?)",
+                [[game_type, row["id"], compress_text(row["raw_text"])] for row in rows],
+            )
+            last_id = rows[-1]["id"]
+    return "\n".join(f'ALTER TABLE "{table}" DROP COLUMN "raw_text";' for table in PLAY_TABLES)
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    for table, game_type in PLAY_TABLES.items():
+        await db.execute_script(
+            f'ALTER TABLE "{table}" ADD COLUMN "raw_text" TEXT NOT NULL DEFAULT \'\''
+        )
+        last_id = 0
+        while True:
+            _, rows = await db.execute_query(
+                'SELECT "play_id", "compressed" FROM "play_text" '
+                'WHERE "game_type" = ? AND "play_id" > ? ORDER BY "play_id" LIMIT ?',
+                [game_type, last_id, BATCH_SIZE],
+            )
+            if not rows:
+                break
+            await db.execute_many(
+                f'UPDATE "{table}" SET "raw_text" = ? WHERE "id" = ?',
+                [[decompress_text(row["compressed"]), row["play_id"]] for row in rows],
+            )
+            last_id = rows[-1]["play_id"]
+    return """
+        DROP TABLE IF EXISTS "play_text";"""
@@ -0,0 +1,96 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "connections_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "purple_first" INT NOT NULL,
+    "mistakes" INT NOT NULL,
+    "won" INT NOT NULL,
+    CONSTRAINT "uid_connections_usernam_4052e6" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_connections_game_nu_0b50a6" ON "connections_play_archive" ("game_number", "score");
+CREATE TABLE IF NOT EXISTS "crossclimb_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_crossclimb__usernam_bd1355" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_crossclimb__game_nu_733f92" ON "crossclimb_play_archive" ("game_number", "score");
+CREATE TABLE IF NOT EXISTS "minicrosswordplay_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "game_date" DATE NOT NULL,
+    "seconds" INT NOT NULL,
+    CONSTRAINT "uid_minicrosswo_usernam_83ba6e" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minicrosswo_game_nu_e2f478" ON "minicrosswordplay_archive" ("game_number", "score");
+CREATE TABLE IF NOT EXISTS "minisudoku_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_minisudoku__usernam_2cf446" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minisudoku__game_nu_c9153b" ON "minisudoku_play_archive" ("game_number", "score");
+CREATE TABLE IF NOT EXISTS "queens_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_queens_play_usernam_4bded7" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_queens_play_game_nu_fe2d20" ON "queens_play_archive" ("game_number", "score");
+CREATE TABLE IF NOT EXISTS "tango_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_tango_play__usernam_f4c435" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_tango_play__game_nu_d3ad57" ON "tango_play_archive" ("game_number", "score");
+CREATE TABLE IF NOT EXISTS "zip_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "backtracks" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_zip_play_ar_usernam_b95105" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_zip_play_ar_game_nu_cd794f" ON "zip_play_archive" ("game_number", "score");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    # Archived plays are moved back before their tables are dropped.
+    return """
+        INSERT OR IGNORE INTO "connections_play" ("id", "username", "game_number", "score", "purple_first", "mistakes", "won") SELECT "id", "username", "game_number", "score", "purple_first", "mistakes", "won" FROM "connections_play_archive";
+INSERT OR IGNORE INTO "crossclimb_play" ("id", "username", "game_number", "score", "seconds", "flawless") SELECT "id", "username", "game_number", "score", "seconds", "flawless" FROM "crossclimb_play_archive";
+INSERT OR IGNORE INTO "minicrosswordplay" ("id", "username", "game_number", "score", "game_date", "seconds") SELECT "id", "username", "game_number", "score", "game_date", "seconds" FROM "minicrosswordplay_archive";
+INSERT OR IGNORE INTO "minisudoku_play" ("id", "username", "game_number", "score", "seconds", "flawless") SELECT "id", "username", "game_number", "score", "seconds", "flawless" FROM "minisudoku_play_archive";
+INSERT OR IGNORE INTO "queens_play" ("id", "username", "game_number", "score", "seconds", "flawless") SELECT "id", "username", "game_number", "score", "seconds", "flawless" FROM "queens_play_archive";
+INSERT OR IGNORE INTO "tango_play" ("id", "username", "game_number", "score", "seconds", "flawless") SELECT "id", "username", "game_number", "score", "seconds", "flawless" FROM "tango_play_archive";
+INSERT OR IGNORE INTO "zip_play" ("id", "username", "game_number", "score", "seconds", "backtracks", "flawless") SELECT "id", "username", "game_number", "score", "seconds", "backtracks", "flawless" FROM "zip_play_archive";
+DROP TABLE IF EXISTS "connections_play_archive";
+DROP TABLE IF EXISTS "crossclimb_play_archive";
+DROP TABLE IF EXISTS "minicrosswordplay_archive";
+DROP TABLE IF EXISTS "minisudoku_play_archive";
+DROP TABLE IF EXISTS "queens_play_archive";
+DROP TABLE IF EXISTS "tango_play_archive";
+DROP TABLE IF EXISTS "zip_play_archive";"""
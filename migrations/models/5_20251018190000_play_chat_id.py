@@ -0,0 +1,431 @@
+from tortoise import BaseDBAsyncClient
+
+try:
+    from secret import LEGACY_CHAT_ID
+except ImportError:
+    LEGACY_CHAT_ID = 0
+
+# SQLite cannot change the unique constraint of a table, so the play tables and
+# daily_leaderboard are rebuilt: the old table is renamed, the new one created and filled from
+# it, then the old one dropped. Every existing play belongs to the chat the bot served before
+# plays were kept per chat, LEGACY_CHAT_ID in secret.py.
+
+CHAT_TABLES = {
+    "connections_play": """
+CREATE TABLE IF NOT EXISTS "connections_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "purple_first" INT NOT NULL,
+    "mistakes" INT NOT NULL,
+    "won" INT NOT NULL,
+    CONSTRAINT "uid_connections_chat_id_c4ae77" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_connections_chat_id_268e6c" ON "connections_play" ("chat_id", "game_number", "score");""",
+    "connections_play_archive": """
+CREATE TABLE IF NOT EXISTS "connections_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "purple_first" INT NOT NULL,
+    "mistakes" INT NOT NULL,
+    "won" INT NOT NULL,
+    CONSTRAINT "uid_connections_chat_id_3f5751" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_connections_chat_id_3c90ab" ON "connections_play_archive" ("chat_id", "game_number", "score");""",
+    "crossclimb_play": """
+CREATE TABLE IF NOT EXISTS "crossclimb_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_crossclimb__chat_id_6c5ef5" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_crossclimb__chat_id_35666b" ON "crossclimb_play" ("chat_id", "game_number", "score");""",
+    "crossclimb_play_archive": """
+CREATE TABLE IF NOT EXISTS "crossclimb_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_crossclimb__chat_id_161da4" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_crossclimb__chat_id_e237f9" ON "crossclimb_play_archive" ("chat_id", "game_number", "score");""",
+    "daily_leaderboard": """
+CREATE TABLE IF NOT EXISTS "daily_leaderboard" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "game_type" VARCHAR(32) NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "game_number" INT NOT NULL,
+    "rank" INT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "score" INT NOT NULL,
+    CONSTRAINT "uid_daily_leade_game_ty_b8aa8c" UNIQUE ("game_type", "chat_id", "game_number", "rank")
+) /* Top plays of every game, chat and game number, ranked. */;""",
+    "minicrosswordplay": """
+CREATE TABLE IF NOT EXISTS "minicrosswordplay" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "game_date" DATE NOT NULL,
+    "seconds" INT NOT NULL,
+    CONSTRAINT "uid_minicrosswo_chat_id_438cb9" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minicrosswo_chat_id_3e44d7" ON "minicrosswordplay" ("chat_id", "game_number", "score");""",
+    "minicrosswordplay_archive": """
+CREATE TABLE IF NOT EXISTS "minicrosswordplay_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "game_date" DATE NOT NULL,
+    "seconds" INT NOT NULL,
+    CONSTRAINT "uid_minicrosswo_chat_id_f7381a" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minicrosswo_chat_id_08d40b" ON "minicrosswordplay_archive" ("chat_id", "game_number", "score");""",
+    "minisudoku_play": """
+CREATE TABLE IF NOT EXISTS "minisudoku_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_minisudoku__chat_id_51aaf6" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minisudoku__chat_id_042ffb" ON "minisudoku_play" ("chat_id", "game_number", "score");""",
+    "minisudoku_play_archive": """
+CREATE TABLE IF NOT EXISTS "minisudoku_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_minisudoku__chat_id_6e7522" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minisudoku__chat_id_2fe9f7" ON "minisudoku_play_archive" ("chat_id", "game_number", "score");""",
+    "queens_play": """
+CREATE TABLE IF NOT EXISTS "queens_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_queens_play_chat_id_72bbe3" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_queens_play_chat_id_c60818" ON "queens_play" ("chat_id", "game_number", "score");""",
+    "queens_play_archive": """
+CREATE TABLE IF NOT EXISTS "queens_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_queens_play_chat_id_8a7ffd" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_queens_play_chat_id_33f2cb" ON "queens_play_archive" ("chat_id", "game_number", "score");""",
+    "tango_play": """
+CREATE TABLE IF NOT EXISTS "tango_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_tango_play_chat_id_d9d720" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_tango_play_chat_id_dd2b61" ON "tango_play" ("chat_id", "game_number", "score");""",
+    "tango_play_archive": """
+CREATE TABLE IF NOT EXISTS "tango_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_tango_play__chat_id_9598cd" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_tango_play__chat_id_3ab625" ON "tango_play_archive" ("chat_id", "game_number", "score");""",
+    "zip_play": """
+CREATE TABLE IF NOT EXISTS "zip_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "backtracks" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_zip_play_chat_id_d96d87" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_zip_play_chat_id_f8e50c" ON "zip_play" ("chat_id", "game_number", "score");""",
+    "zip_play_archive": """
+CREATE TABLE IF NOT EXISTS "zip_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "backtracks" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_zip_play_ar_chat_id_87e1c3" UNIQUE ("chat_id", "username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_zip_play_ar_chat_id_0098b4" ON "zip_play_archive" ("chat_id", "game_number", "score");""",
+}
+UNCHAT_TABLES = {
+    "connections_play": """
+CREATE TABLE IF NOT EXISTS "connections_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "purple_first" INT NOT NULL,
+    "mistakes" INT NOT NULL,
+    "won" INT NOT NULL,
+    CONSTRAINT "uid_connections_usernam_37a052" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_connections_game_nu_435a99" ON "connections_play" ("game_number", "score");""",
+    "connections_play_archive": """
+CREATE TABLE IF NOT EXISTS "connections_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "purple_first" INT NOT NULL,
+    "mistakes" INT NOT NULL,
+    "won" INT NOT NULL,
+    CONSTRAINT "uid_connections_usernam_4052e6" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_connections_game_nu_0b50a6" ON "connections_play_archive" ("game_number", "score");""",
+    "crossclimb_play": """
+CREATE TABLE IF NOT EXISTS "crossclimb_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_crossclimb__usernam_5be30b" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_crossclimb__game_nu_31357a" ON "crossclimb_play" ("game_number", "score");""",
+    "crossclimb_play_archive": """
+CREATE TABLE IF NOT EXISTS "crossclimb_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_crossclimb__usernam_bd1355" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_crossclimb__game_nu_733f92" ON "crossclimb_play_archive" ("game_number", "score");""",
+    "daily_leaderboard": """
+CREATE TABLE IF NOT EXISTS "daily_leaderboard" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "game_type" VARCHAR(32) NOT NULL,
+    "game_number" INT NOT NULL,
+    "rank" INT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "score" INT NOT NULL,
+    CONSTRAINT "uid_daily_leade_game_ty_e39f38" UNIQUE ("game_type", "game_number", "rank")
+) /* Top plays of every game and game number, ranked. */;""",
+    "minicrosswordplay": """
+CREATE TABLE IF NOT EXISTS "minicrosswordplay" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "game_date" DATE NOT NULL,
+    "seconds" INT NOT NULL,
+    CONSTRAINT "uid_minicrosswo_usernam_fc9b1b" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minicrosswo_game_nu_28d1b6" ON "minicrosswordplay" ("game_number", "score");""",
+    "minicrosswordplay_archive": """
+CREATE TABLE IF NOT EXISTS "minicrosswordplay_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "game_date" DATE NOT NULL,
+    "seconds" INT NOT NULL,
+    CONSTRAINT "uid_minicrosswo_usernam_83ba6e" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minicrosswo_game_nu_e2f478" ON "minicrosswordplay_archive" ("game_number", "score");""",
+    "minisudoku_play": """
+CREATE TABLE IF NOT EXISTS "minisudoku_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_minisudoku__usernam_7c8439" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minisudoku__game_nu_e9b681" ON "minisudoku_play" ("game_number", "score");""",
+    "minisudoku_play_archive": """
+CREATE TABLE IF NOT EXISTS "minisudoku_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_minisudoku__usernam_2cf446" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_minisudoku__game_nu_c9153b" ON "minisudoku_play_archive" ("game_number", "score");""",
+    "queens_play": """
+CREATE TABLE IF NOT EXISTS "queens_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_queens_play_usernam_71d176" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_queens_play_game_nu_277f1f" ON "queens_play" ("game_number", "score");""",
+    "queens_play_archive": """
+CREATE TABLE IF NOT EXISTS "queens_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_queens_play_usernam_4bded7" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_queens_play_game_nu_fe2d20" ON "queens_play_archive" ("game_number", "score");""",
+    "tango_play": """
+CREATE TABLE IF NOT EXISTS "tango_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_tango_play_usernam_1a8fc2" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_tango_play_game_nu_ec4fff" ON "tango_play" ("game_number", "score");""",
+    "tango_play_archive": """
+CREATE TABLE IF NOT EXISTS "tango_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_tango_play__usernam_f4c435" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_tango_play__game_nu_d3ad57" ON "tango_play_archive" ("game_number", "score");""",
+    "zip_play": """
+CREATE TABLE IF NOT EXISTS "zip_play" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "backtracks" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_zip_play_usernam_1ad619" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_zip_play_game_nu_4027ae" ON "zip_play" ("game_number", "score");""",
+    "zip_play_archive": """
+CREATE TABLE IF NOT EXISTS "zip_play_archive" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "game_number" INT NOT NULL,
+    "score" INT NOT NULL,
+    "seconds" INT NOT NULL,
+    "backtracks" INT NOT NULL,
+    "flawless" INT NOT NULL,
+    CONSTRAINT "uid_zip_play_ar_usernam_b95105" UNIQUE ("username", "game_number")
+);
+CREATE INDEX IF NOT EXISTS "idx_zip_play_ar_game_nu_cd794f" ON "zip_play_archive" ("game_number", "score");""",
+}
+
+
+async def rebuild_table(
+    db: BaseDBAsyncClient, table: str, create_sql: str, copy_sql: str, params: list
+) -> None:
+    """
+    Recreates a table with create_sql and fills it with copy_sql, which reads the old table
+    from "_old_<table>". The AUTOINCREMENT sequence is carried over, so ids of plays that were
+    archived or deleted are never handed out again. The old table is left for the caller to drop.
+    """
+    _, rows = await db.execute_query(
+        'SELECT "seq" FROM "sqlite_sequence" WHERE "name" = ?', [table]
+    )
+    last_id = rows[0]["seq"] if rows else 0
+    await db.execute_script(f'ALTER TABLE "{table}" RENAME TO "_old_{table}"')
+    await db.execute_script(create_sql)
+    await db.execute_query(copy_sql, params)
+    _, rows = await db.execute_query(
+        'SELECT "seq" FROM "sqlite_sequence" WHERE "name" = ?', [table]
+    )
+    if rows:
+        last_id = max(last_id, rows[0]["seq"])
+    await db.execute_query('DELETE FROM "sqlite_sequence" WHERE "name" = ?', [table])
+    if last_id:
+        await db.execute_query(
+            'INSERT INTO "sqlite_sequence" ("name", "seq") VALUES (?, ?)', [table, last_id]
+        )
+
+
+async def table_columns(db: BaseDBAsyncClient, table: str, skip: str = "") -> str:
+    _, rows = await db.execute_query(f'PRAGMA table_info("{table}")')
+    return ", ".join(f'"{row["name"]}"' for row in rows if row["name"] != skip)
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    for table, create_sql in CHAT_TABLES.items():
+        columns = await table_columns(db, table)
+        await rebuild_table(
+            db,
+            table,
+            create_sql,
+            f'INSERT INTO "{table}" ("chat_id", {columns}) SELECT ?, {columns} FROM "_old_{table}"',
+            [LEGACY_CHAT_ID],
+        )
+    return "\n".join(f'DROP TABLE "_old_{table}";' for table in CHAT_TABLES)
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    # Plays of other chats are merged back, keeping the latest play of a username and game
+    # number. Only the legacy chat's leaderboards fit in the old daily_leaderboard.
+    for table, create_sql in UNCHAT_TABLES.items():
+        columns = await table_columns(db, table, skip="chat_id")
+        where_sql, params = "", []
+        if table == "daily_leaderboard":
+            where_sql, params = 'WHERE "chat_id" = ? ', [LEGACY_CHAT_ID]
+        await rebuild_table(
+            db,
+            table,
+            create_sql,
+            f'INSERT OR IGNORE INTO "{table}" ({columns}) '
+            f'SELECT {columns} FROM "_old_{table}" {where_sql}ORDER BY "id" DESC',
+            params,
+        )
+    return "\n".join(f'DROP TABLE "_old_{table}";' for table in UNCHAT_TABLES)
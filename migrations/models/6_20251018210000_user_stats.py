@@ -0,0 +1,59 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Filled with the totals of every player's plays, like Game.refresh_user_stats.
+    return """
+        CREATE TABLE IF NOT EXISTS "user_stats" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_type" VARCHAR(32) NOT NULL,
+    "plays" INT NOT NULL,
+    "score_sum" BIGINT NOT NULL,
+    "min_score" INT NOT NULL,
+    "max_score" INT NOT NULL,
+    "flawless" INT NOT NULL DEFAULT 0,
+    "won" INT NOT NULL DEFAULT 0,
+    CONSTRAINT "uid_user_stats_chat_id_250134" UNIQUE ("chat_id", "username", "game_type")
+) /* Totals of every player's plays of a game in a chat, so stats never scan the play tables. */;
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won")
+SELECT "chat_id", "username", 'miniCrossword', COUNT(*), SUM("score"), MIN("score"), MAX("score"), 0, 0 FROM (
+    SELECT "chat_id", "username", "score" FROM "minicrosswordplay"
+    UNION ALL SELECT "chat_id", "username", "score" FROM "minicrosswordplay_archive" AS "a" WHERE NOT EXISTS (SELECT 1 FROM "minicrosswordplay" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number")
+) GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won")
+SELECT "chat_id", "username", 'connections', COUNT(*), SUM("score"), MIN("score"), MAX("score"), 0, SUM("won") FROM (
+    SELECT "chat_id", "username", "score", "won" FROM "connections_play"
+    UNION ALL SELECT "chat_id", "username", "score", "won" FROM "connections_play_archive" AS "a" WHERE NOT EXISTS (SELECT 1 FROM "connections_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number")
+) GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won")
+SELECT "chat_id", "username", 'crossclimb', COUNT(*), SUM("score"), MIN("score"), MAX("score"), SUM("flawless"), 0 FROM (
+    SELECT "chat_id", "username", "score", "flawless" FROM "crossclimb_play"
+    UNION ALL SELECT "chat_id", "username", "score", "flawless" FROM "crossclimb_play_archive" AS "a" WHERE NOT EXISTS (SELECT 1 FROM "crossclimb_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number")
+) GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won")
+SELECT "chat_id", "username", 'mini sudoku', COUNT(*), SUM("score"), MIN("score"), MAX("score"), SUM("flawless"), 0 FROM (
+    SELECT "chat_id", "username", "score", "flawless" FROM "minisudoku_play"
+    UNION ALL SELECT "chat_id", "username", "score", "flawless" FROM "minisudoku_play_archive" AS "a" WHERE NOT EXISTS (SELECT 1 FROM "minisudoku_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number")
+) GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won")
+SELECT "chat_id", "username", 'queens', COUNT(*), SUM("score"), MIN("score"), MAX("score"), SUM("flawless"), 0 FROM (
+    SELECT "chat_id", "username", "score", "flawless" FROM "queens_play"
+    UNION ALL SELECT "chat_id", "username", "score", "flawless" FROM "queens_play_archive" AS "a" WHERE NOT EXISTS (SELECT 1 FROM "queens_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number")
+) GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won")
+SELECT "chat_id", "username", 'tango', COUNT(*), SUM("score"), MIN("score"), MAX("score"), SUM("flawless"), 0 FROM (
+    SELECT "chat_id", "username", "score", "flawless" FROM "tango_play"
+    UNION ALL SELECT "chat_id", "username", "score", "flawless" FROM "tango_play_archive" AS "a" WHERE NOT EXISTS (SELECT 1 FROM "tango_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number")
+) GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won")
+SELECT "chat_id", "username", 'zip', COUNT(*), SUM("score"), MIN("score"), MAX("score"), SUM("flawless"), 0 FROM (
+    SELECT "chat_id", "username", "score", "flawless" FROM "zip_play"
+    UNION ALL SELECT "chat_id", "username", "score", "flawless" FROM "zip_play_archive" AS "a" WHERE NOT EXISTS (SELECT 1 FROM "zip_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number")
+) GROUP BY "chat_id", "username";"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "user_stats";"""
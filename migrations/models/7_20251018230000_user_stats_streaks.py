@@ -0,0 +1,31 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Refilled with the totals and streaks of every player's plays, like Game.refresh_user_stats.
+    return """
+        ALTER TABLE "user_stats" ADD "last_game_number" INT NOT NULL DEFAULT 0;
+ALTER TABLE "user_stats" ADD "current_streak" INT NOT NULL DEFAULT 0;
+ALTER TABLE "user_stats" ADD "longest_streak" INT NOT NULL DEFAULT 0;
+DELETE FROM "user_stats";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won", "last_game_number", "current_streak", "longest_streak")
+SELECT "chat_id", "username", 'connections', SUM("plays"), SUM("score_sum"), MIN("min_score"), MAX("max_score"), SUM("flawless"), SUM("won"), MAX("last_game_number"), MAX(CASE WHEN "recency" = 1 THEN "plays" ELSE 0 END), MAX("plays") FROM (SELECT "chat_id", "username", COUNT(*) AS "plays", SUM("score") AS "score_sum", MIN("score") AS "min_score", MAX("score") AS "max_score", 0 AS "flawless", SUM("won") AS "won", MAX("game_number") AS "last_game_number", ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY MAX("game_number") DESC) AS "recency" FROM (SELECT *, "game_number" - ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY "game_number") AS "run" FROM (SELECT "id", "chat_id", "game_number", "username", "score", "won" FROM "connections_play"  UNION ALL SELECT "id", "chat_id", "game_number", "username", "score", "won" FROM "connections_play_archive" AS "a"  WHERE NOT EXISTS (SELECT 1 FROM "connections_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number"))) GROUP BY "chat_id", "username", "run") GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won", "last_game_number", "current_streak", "longest_streak")
+SELECT "chat_id", "username", 'queens', SUM("plays"), SUM("score_sum"), MIN("min_score"), MAX("max_score"), SUM("flawless"), SUM("won"), MAX("last_game_number"), MAX(CASE WHEN "recency" = 1 THEN "plays" ELSE 0 END), MAX("plays") FROM (SELECT "chat_id", "username", COUNT(*) AS "plays", SUM("score") AS "score_sum", MIN("score") AS "min_score", MAX("score") AS "max_score", SUM("flawless") AS "flawless", 0 AS "won", MAX("game_number") AS "last_game_number", ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY MAX("game_number") DESC) AS "recency" FROM (SELECT *, "game_number" - ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY "game_number") AS "run" FROM (SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "queens_play"  UNION ALL SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "queens_play_archive" AS "a"  WHERE NOT EXISTS (SELECT 1 FROM "queens_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number"))) GROUP BY "chat_id", "username", "run") GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won", "last_game_number", "current_streak", "longest_streak")
+SELECT "chat_id", "username", 'tango', SUM("plays"), SUM("score_sum"), MIN("min_score"), MAX("max_score"), SUM("flawless"), SUM("won"), MAX("last_game_number"), MAX(CASE WHEN "recency" = 1 THEN "plays" ELSE 0 END), MAX("plays") FROM (SELECT "chat_id", "username", COUNT(*) AS "plays", SUM("score") AS "score_sum", MIN("score") AS "min_score", MAX("score") AS "max_score", SUM("flawless") AS "flawless", 0 AS "won", MAX("game_number") AS "last_game_number", ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY MAX("game_number") DESC) AS "recency" FROM (SELECT *, "game_number" - ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY "game_number") AS "run" FROM (SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "tango_play"  UNION ALL SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "tango_play_archive" AS "a"  WHERE NOT EXISTS (SELECT 1 FROM "tango_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number"))) GROUP BY "chat_id", "username", "run") GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won", "last_game_number", "current_streak", "longest_streak")
+SELECT "chat_id", "username", 'zip', SUM("plays"), SUM("score_sum"), MIN("min_score"), MAX("max_score"), SUM("flawless"), SUM("won"), MAX("last_game_number"), MAX(CASE WHEN "recency" = 1 THEN "plays" ELSE 0 END), MAX("plays") FROM (SELECT "chat_id", "username", COUNT(*) AS "plays", SUM("score") AS "score_sum", MIN("score") AS "min_score", MAX("score") AS "max_score", SUM("flawless") AS "flawless", 0 AS "won", MAX("game_number") AS "last_game_number", ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY MAX("game_number") DESC) AS "recency" FROM (SELECT *, "game_number" - ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY "game_number") AS "run" FROM (SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "zip_play"  UNION ALL SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "zip_play_archive" AS "a"  WHERE NOT EXISTS (SELECT 1 FROM "zip_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number"))) GROUP BY "chat_id", "username", "run") GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won", "last_game_number", "current_streak", "longest_streak")
+SELECT "chat_id", "username", 'miniCrossword', SUM("plays"), SUM("score_sum"), MIN("min_score"), MAX("max_score"), SUM("flawless"), SUM("won"), MAX("last_game_number"), MAX(CASE WHEN "recency" = 1 THEN "plays" ELSE 0 END), MAX("plays") FROM (SELECT "chat_id", "username", COUNT(*) AS "plays", SUM("score") AS "score_sum", MIN("score") AS "min_score", MAX("score") AS "max_score", 0 AS "flawless", 0 AS "won", MAX("game_number") AS "last_game_number", ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY MAX("game_number") DESC) AS "recency" FROM (SELECT *, "game_number" - ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY "game_number") AS "run" FROM (SELECT "id", "chat_id", "game_number", "username", "score" FROM "minicrosswordplay"  UNION ALL SELECT "id", "chat_id", "game_number", "username", "score" FROM "minicrosswordplay_archive" AS "a"  WHERE NOT EXISTS (SELECT 1 FROM "minicrosswordplay" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number"))) GROUP BY "chat_id", "username", "run") GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won", "last_game_number", "current_streak", "longest_streak")
+SELECT "chat_id", "username", 'mini sudoku', SUM("plays"), SUM("score_sum"), MIN("min_score"), MAX("max_score"), SUM("flawless"), SUM("won"), MAX("last_game_number"), MAX(CASE WHEN "recency" = 1 THEN "plays" ELSE 0 END), MAX("plays") FROM (SELECT "chat_id", "username", COUNT(*) AS "plays", SUM("score") AS "score_sum", MIN("score") AS "min_score", MAX("score") AS "max_score", SUM("flawless") AS "flawless", 0 AS "won", MAX("game_number") AS "last_game_number", ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY MAX("game_number") DESC) AS "recency" FROM (SELECT *, "game_number" - ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY "game_number") AS "run" FROM (SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "minisudoku_play"  UNION ALL SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "minisudoku_play_archive" AS "a"  WHERE NOT EXISTS (SELECT 1 FROM "minisudoku_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number"))) GROUP BY "chat_id", "username", "run") GROUP BY "chat_id", "username";
+INSERT INTO "user_stats" ("chat_id", "username", "game_type", "plays", "score_sum", "min_score", "max_score", "flawless", "won", "last_game_number", "current_streak", "longest_streak")
+SELECT "chat_id", "username", 'crossclimb', SUM("plays"), SUM("score_sum"), MIN("min_score"), MAX("max_score"), SUM("flawless"), SUM("won"), MAX("last_game_number"), MAX(CASE WHEN "recency" = 1 THEN "plays" ELSE 0 END), MAX("plays") FROM (SELECT "chat_id", "username", COUNT(*) AS "plays", SUM("score") AS "score_sum", MIN("score") AS "min_score", MAX("score") AS "max_score", SUM("flawless") AS "flawless", 0 AS "won", MAX("game_number") AS "last_game_number", ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY MAX("game_number") DESC) AS "recency" FROM (SELECT *, "game_number" - ROW_NUMBER() OVER (PARTITION BY "chat_id", "username" ORDER BY "game_number") AS "run" FROM (SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "crossclimb_play"  UNION ALL SELECT "id", "chat_id", "game_number", "username", "score", "flawless" FROM "crossclimb_play_archive" AS "a"  WHERE NOT EXISTS (SELECT 1 FROM "crossclimb_play" AS "h" WHERE "h"."chat_id" = "a"."chat_id" AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number"))) GROUP BY "chat_id", "username", "run") GROUP BY "chat_id", "username";"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "user_stats" DROP COLUMN "last_game_number";
+ALTER TABLE "user_stats" DROP COLUMN "current_streak";
+ALTER TABLE "user_stats" DROP COLUMN "longest_streak";"""
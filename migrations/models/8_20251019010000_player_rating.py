@@ -0,0 +1,28 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    # Left empty, the bot rates the whole history on its first start, see games.ratings.
+    return """
+        CREATE TABLE IF NOT EXISTS "player_rating" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "username" VARCHAR(255) NOT NULL,
+    "game_type" VARCHAR(32) NOT NULL,
+    "rating" REAL NOT NULL,
+    "matches" INT NOT NULL DEFAULT 0,
+    CONSTRAINT "uid_player_rati_chat_id_fab3f8" UNIQUE ("chat_id", "username", "game_type")
+) /* Skill rating of every player of a game in a chat, maintained by games.ratings.RatingEngine. */;
+CREATE INDEX IF NOT EXISTS "idx_player_rati_game_ty_002c7d" ON "player_rating" ("game_type", "chat_id", "rating");
+CREATE TABLE IF NOT EXISTS "rating_progress" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "game_type" VARCHAR(32) NOT NULL UNIQUE,
+    "game_number" INT NOT NULL,
+    "play_id" INT NOT NULL
+) /* How far the ratings of each game got. */;"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "player_rating";
+DROP TABLE IF EXISTS "rating_progress";"""
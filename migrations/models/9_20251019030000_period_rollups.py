@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+
+from tortoise import BaseDBAsyncClient
+
+# The rollups are filled from the plays with the periods worked out in Python, like
+# Game.refresh_rollup, since the date functions of SQLite have no ISO weeks before 3.46.
+# Game numbers count days from the start date of their game, game number 1 being that day.
+GAMES = {
+    "connections": ("connections_play", date(2023, 6, 12)),
+    "queens": ("queens_play", date(2024, 5, 1)),
+    "tango": ("tango_play", date(2024, 10, 8)),
+    "zip": ("zip_play", date(2025, 3, 18)),
+    "miniCrossword": ("minicrosswordplay", date(2014, 8, 21)),
+    "mini sudoku": ("minisudoku_play", date(2025, 8, 12)),
+    "crossclimb": ("crossclimb_play", date(2024, 5, 1)),
+}
+# Plays read per statement, so memory stays flat however big the tables are.
+BATCH_SIZE = 1000
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS "weekly_stats" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "game_type" VARCHAR(32) NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "period" INT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "plays" INT NOT NULL,
+    "score_sum" BIGINT NOT NULL,
+    CONSTRAINT "uid_weekly_stat_game_ty_ac4345" UNIQUE ("game_type", "chat_id", "period", "username")
+) /* Totals of every player's plays of a game in a chat per ISO week. */;
+CREATE TABLE IF NOT EXISTS "monthly_stats" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "game_type" VARCHAR(32) NOT NULL,
+    "chat_id" BIGINT NOT NULL DEFAULT 0,
+    "period" INT NOT NULL,
+    "username" VARCHAR(255) NOT NULL,
+    "plays" INT NOT NULL,
+    "score_sum" BIGINT NOT NULL,
+    CONSTRAINT "uid_monthly_sta_game_ty_0a7bdc" UNIQUE ("game_type", "chat_id", "period", "username")
+) /* Totals of every player's plays of a game in a chat per calendar month. */;"""
+
+
+def iso_week(day: date) -> int:
+    year, week, _ = day.isocalendar()
+    return year * 100 + week
+
+
+def month(day: date) -> int:
+    return day.year * 100 + day.month
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    await db.execute_script(CREATE_SQL)
+    rollups = {"weekly_stats": iso_week, "monthly_stats": month}
+    for game_type, (table, start_date) in GAMES.items():
+        totals = {rollup: {} for rollup in rollups}
+        # archived plays count unless they were resubmitted after being archived
+        resubmitted_sql = (
+            f'AND NOT EXISTS (SELECT 1 FROM "{table}" AS "h" WHERE "h"."chat_id" = "a"."chat_id" '
+            'AND "h"."username" = "a"."username" AND "h"."game_number" = "a"."game_number")'
+        )
+        for source, where_sql in ((table, ""), (f"{table}_archive", resubmitted_sql)):
+            last_id = 0
+            while True:
+                _, plays = await db.execute_query(
+                    'SELECT "id", "chat_id", "username", "game_number", "score" '
+                    f'FROM "{source}" AS "a" WHERE "id" > ? {where_sql} ORDER BY "id" LIMIT ?',
+                    [last_id, BATCH_SIZE],
+                )
+                if not plays:
+                    break
+                for play in plays:
+                    day = start_date + timedelta(days=play["game_number"] - 1)
+                    for rollup, period_of in rollups.items():
+                        row = totals[rollup].setdefault(
+                            (play["chat_id"], period_of(day), play["username"]), [0, 0]
+                        )
+                        row[0] += 1
+                        row[1] += play["score"]
+                last_id = plays[-1]["id"]
+        for rollup, rollup_totals in totals.items():
+            items = list(rollup_totals.items())
+            for offset in range(0, len(items), 500):
+                chunk = items[offset : offset + 500]
+                await db.execute_query(
+                    f'INSERT INTO "{rollup}" '
+                    '("game_type", "chat_id", "period", "username", "plays", "score_sum") '
+                    f"VALUES {', '.join(['(?, ?, ?, ?, ?, ?)'] * len(chunk))}",
+                    [
+                        value
+                        for (chat_id, period, username), (count, score_sum) in chunk
+                        for value in (game_type, chat_id, period, username, count, score_sum)
+                    ],
+                )
+    # everything ran above, the rollups need the plays to be read first
+    return ""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP TABLE IF EXISTS "weekly_stats";
+DROP TABLE IF EXISTS "monthly_stats";"""
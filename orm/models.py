@@ -1,74 +1,342 @@
 from tortoise import fields
 from tortoise.models import Model
 
+# Chat of plays recorded without one, like the ones from before plays were kept per chat.
+DEFAULT_CHAT_ID = 0
+
 
 class Play(Model):
+    """
+    Fields shared by every game's plays.
+    Each game has a hot table for recent game numbers and an archive table with the same
+    fields, see games/archive.py.
+    Plays are kept per Telegram chat, every chat has its own leaderboards.
+    """
+
     id = fields.IntField(primary_key=True)
+    chat_id = fields.BigIntField(default=DEFAULT_CHAT_ID)
     username = fields.CharField(max_length=255)
     game_number = fields.IntField()
     score = fields.IntField()
-    raw_text = fields.TextField()
+    # The share text lives compressed in PlayText, see Game.get_raw_texts.
 
     class Meta:
         abstract = True
 
 
-class ConnectionsPlay(Play):
+class ConnectionsPlayBase(Play):
     purple_first = fields.BooleanField()
     mistakes = fields.IntField()
     won = fields.BooleanField()
 
+    class Meta:
+        abstract = True
+
+
+class ConnectionsPlay(ConnectionsPlayBase):
     class Meta:
         table = "connections_play"
         default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
 
 
-class QueensPlay(Play):
+class ConnectionsPlayArchive(ConnectionsPlayBase):
+    class Meta:
+        table = "connections_play_archive"
+        default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
+
+
+class QueensPlayBase(Play):
     seconds = fields.IntField()
     flawless = fields.BooleanField()
 
+    class Meta:
+        abstract = True
+
+
+class QueensPlay(QueensPlayBase):
     class Meta:
         table = "queens_play"
         default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
+
+
+class QueensPlayArchive(QueensPlayBase):
+    class Meta:
+        table = "queens_play_archive"
+        default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
 
 
-class TangoPlay(Play):
+class TangoPlayBase(Play):
     seconds = fields.IntField()
     flawless = fields.BooleanField()
 
+    class Meta:
+        abstract = True
+
+
+class TangoPlay(TangoPlayBase):
     class Meta:
         table = "tango_play"
         default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
 
 
-class MiniSudokuPlay(Play):
+class TangoPlayArchive(TangoPlayBase):
+    class Meta:
+        table = "tango_play_archive"
+        default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
+
+
+class MiniSudokuPlayBase(Play):
     seconds = fields.IntField()
     flawless = fields.BooleanField()
 
+    class Meta:
+        abstract = True
+
+
+class MiniSudokuPlay(MiniSudokuPlayBase):
     class Meta:
         table = "minisudoku_play"
         default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
 
 
-class ZipPlay(Play):
+class MiniSudokuPlayArchive(MiniSudokuPlayBase):
+    class Meta:
+        table = "minisudoku_play_archive"
+        default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
+
+
+class ZipPlayBase(Play):
     seconds = fields.IntField()
     backtracks = fields.IntField()
     flawless = fields.BooleanField()
 
+    class Meta:
+        abstract = True
+
+
+class ZipPlay(ZipPlayBase):
     class Meta:
         table = "zip_play"
         default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
 
 
-class CrossClimbPlay(Play):
+class ZipPlayArchive(ZipPlayBase):
+    class Meta:
+        table = "zip_play_archive"
+        default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
+
+
+class CrossClimbPlayBase(Play):
     seconds = fields.IntField()
     flawless = fields.BooleanField()
 
+    class Meta:
+        abstract = True
+
+
+class CrossClimbPlay(CrossClimbPlayBase):
     class Meta:
         table = "crossclimb_play"
         default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
+
+
+class CrossClimbPlayArchive(CrossClimbPlayBase):
+    class Meta:
+        table = "crossclimb_play_archive"
+        default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
 
 
-class MiniCrosswordPlay(Play):
+class MiniCrosswordPlayBase(Play):
     game_date = fields.DateField()
     seconds = fields.IntField()
+
+    class Meta:
+        abstract = True
+
+
+class MiniCrosswordPlay(MiniCrosswordPlayBase):
+    class Meta:
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
+
+
+class MiniCrosswordPlayArchive(MiniCrosswordPlayBase):
+    class Meta:
+        table = "minicrosswordplay_archive"
+        default_connection = "default"
+        unique_together = (("chat_id", "username", "game_number"),)
+        indexes = (("chat_id", "game_number", "score"),)
+
+
+class DailyLeaderboard(Model):
+    """
+    Top plays of every game, chat and game number, ranked, see games.base.DAILY_LEADERBOARD_DEPTH.
+    Every Game upsert refreshes the game numbers it wrote, in the same transaction as the plays,
+    and todays_leaderboards and the leaderboard cache read today's leaderboards from it.
+    """
+
+    id = fields.IntField(primary_key=True)
+    game_type = fields.CharField(max_length=32)
+    chat_id = fields.BigIntField(default=DEFAULT_CHAT_ID)
+    game_number = fields.IntField()
+    rank = fields.IntField()
+    # the id of the play in its hot or archive table, ties between equal scores go to the lower
+    play_id = fields.IntField()
+    username = fields.CharField(max_length=255)
+    score = fields.IntField()
+
+    class Meta:
+        table = "daily_leaderboard"
+        default_connection = "default"
+        unique_together = (("game_type", "chat_id", "game_number", "rank"),)
+
+
+class UserStats(Model):
+    """
+    Totals of every player's plays of a game in a chat, so stats never scan the play tables.
+    Kept up to date by the Game upserts, in the same transaction as the play itself.
+    """
+
+    id = fields.IntField(primary_key=True)
+    chat_id = fields.BigIntField(default=DEFAULT_CHAT_ID)
+    username = fields.CharField(max_length=255)
+    game_type = fields.CharField(max_length=32)
+    plays = fields.IntField()
+    score_sum = fields.BigIntField()
+    min_score = fields.IntField()
+    max_score = fields.IntField()
+    # Plays with the play field of the same name set, for the games that have it.
+    flawless = fields.IntField(default=0)
+    won = fields.IntField(default=0)
+    # Streaks of consecutive game numbers, current_streak being the one that ends with the
+    # player's last play, however long ago that was.
+    last_game_number = fields.IntField(default=0)
+    current_streak = fields.IntField(default=0)
+    longest_streak = fields.IntField(default=0)
+
+    class Meta:
+        table = "user_stats"
+        default_connection = "default"
+        unique_together = (("chat_id", "username", "game_type"),)
+
+    @property
+    def average_score(self) -> float:
+        return self.score_sum / self.plays
+
+
+class PeriodStats(Model):
+    """
+    Totals of every player's plays of a game in a chat over a period of days.
+    Kept up to date by the Game upserts, in the same transaction as the play itself.
+    """
+
+    id = fields.IntField(primary_key=True)
+    game_type = fields.CharField(max_length=32)
+    chat_id = fields.BigIntField(default=DEFAULT_CHAT_ID)
+    # year * 100 + the number of the period in the year, see games.periods
+    period = fields.IntField()
+    username = fields.CharField(max_length=255)
+    plays = fields.IntField()
+    score_sum = fields.BigIntField()
+
+    class Meta:
+        abstract = True
+
+
+class WeeklyStats(PeriodStats):
+    """
+    Totals of every player's plays of a game in a chat per ISO week.
+    """
+
+    class Meta:
+        table = "weekly_stats"
+        default_connection = "default"
+        unique_together = (("game_type", "chat_id", "period", "username"),)
+
+
+class MonthlyStats(PeriodStats):
+    """
+    Totals of every player's plays of a game in a chat per calendar month.
+    """
+
+    class Meta:
+        table = "monthly_stats"
+        default_connection = "default"
+        unique_together = (("game_type", "chat_id", "period", "username"),)
+
+
+class PlayerRating(Model):
+    """
+    Skill rating of every player of a game in a chat, maintained by games.ratings.RatingEngine.
+    Every closed game number is one match between everyone who played it.
+    """
+
+    id = fields.IntField(primary_key=True)
+    chat_id = fields.BigIntField(default=DEFAULT_CHAT_ID)
+    username = fields.CharField(max_length=255)
+    game_type = fields.CharField(max_length=32)
+    rating = fields.FloatField()
+    matches = fields.IntField(default=0)
+
+    class Meta:
+        table = "player_rating"
+        default_connection = "default"
+        unique_together = (("chat_id", "username", "game_type"),)
+        indexes = (("game_type", "chat_id", "rating"),)
+
+
+class RatingProgress(Model):
+    """
+    How far the ratings of each game got.
+    Every game number up to game_number is rated, from the plays recorded up to play_id.
+    """
+
+    id = fields.IntField(primary_key=True)
+    game_type = fields.CharField(max_length=32, unique=True)
+    game_number = fields.IntField()
+    play_id = fields.IntField()
+
+    class Meta:
+        table = "rating_progress"
+        default_connection = "default"
+
+
+class PlayText(Model):
+    """
+    Share message of a play, compressed with the shared dictionaries in orm/raw_text.py.
+    Kept out of the play tables so leaderboard and whole row reads never load it.
+    """
+
+    id = fields.IntField(primary_key=True)
+    game_type = fields.CharField(max_length=32)
+    play_id = fields.IntField()
+    compressed = fields.BinaryField()
+
+    class Meta:
+        table = "play_text"
+        default_connection = "default"
+        unique_together = (("game_type", "play_id"),)
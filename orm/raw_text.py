@@ -0,0 +1,41 @@
+import zlib
+
+# Share texts are short and mostly boilerplate, so on its own deflate barely shrinks them.
+# Priming it with the boilerplate of every game makes most of a share a back reference.
+# Dictionaries can only ever be added: stored texts name the version they were compressed with.
+# zlib favours the end of the dictionary, so the most common strings come last.
+DICTIONARIES: dict[int, bytes] = {
+    1: "".join(
+        [
+            "I solved the New York Times Mini Crossword in ! https://www.nytimes.com/crosswords/game/mini",
+            "Mini Sudoku # |  ✏️\n\n🏅 I’m on a -day win streak!\n\n",
+            "The classic game, made mini. Handcrafted by the originators of “Sudoku.”\n\nlnkd.in/minisudoku.",
+            "Crossclimb # |  and flawless\nFill order: 1️⃣ 2️⃣ 3️⃣ 4️⃣ 5️⃣ ⬆️ ⬇️ 🪜\nlnkd.in/crossclimb.",
+            "Tango # |  and flawless\nFirst 5 placements:\n🟨🟨🟨🟨🟨🟨\n1️⃣2️⃣3️⃣4️⃣5️⃣\nlnkd.in/tango.",
+            "Zip # |  and flawless 🏁\nWith no backtracks 🟢\nWith  backtracks 🛑\nlnkd.in/zip.",
+            "Queens # |  and flawless\nFirst 👑s: 🟩 🟦 🟨 🟪 🟧 ⬜ \nlnkd.in/queens",
+            "🏅 I’m in the Top 1% of all players today!\n🏅 I’m in the Top 5% of all players today!",
+            "🏅 I’m in the Top 10% of all players today!\n🏅 I’m in the Top 25% of all players today!",
+            "Connections\nPuzzle #\n🟪🟦🟨🟩\n🟨🟨🟨🟩\n🟦🟦🟦🟪\n🟩🟩🟩🟨\n🟪🟪🟪🟦\n",
+            "🟪🟪🟪🟪\n🟦🟦🟦🟦\n🟩🟩🟩🟩\n🟨🟨🟨🟨\n",
+        ]
+    ).encode(),
+}
+DICTIONARY_VERSION = max(DICTIONARIES)
+
+
+def compress_text(text: str) -> bytes:
+    """
+    Compresses a share text with the current shared dictionary.
+    The first byte of the result is the dictionary version.
+    """
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=DICTIONARIES[DICTIONARY_VERSION])
+    return bytes([DICTIONARY_VERSION]) + compressor.compress(text.encode()) + compressor.flush()
+
+
+def decompress_text(data: bytes) -> str:
+    """
+    Restores a share text compressed by compress_text, with whichever dictionary it used.
+    """
+    decompressor = zlib.decompressobj(-15, zdict=DICTIONARIES[data[0]])
+    return (decompressor.decompress(data[1:]) + decompressor.flush()).decode()
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from tortoise import BaseDBAsyncClient
+from tortoise.exceptions import OperationalError
+
+# Where `aerich migrate` writes the migrations of the models app, see pyproject.toml.
+MIGRATIONS_LOCATION = Path(__file__).resolve().parent.parent / "migrations" / "models"
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def latest_migration(location: Path = MIGRATIONS_LOCATION) -> str | None:
+    """
+    Returns the file name of the newest migration, the version aerich records once applied.
+    """
+    versions = [path.name for path in location.glob("*.py") if path.name[0].isdigit()]
+    if not versions:
+        return None
+    return max(versions, key=lambda name: int(name.split("_", 1)[0]))
+
+
+async def applied_migration(connection: BaseDBAsyncClient, app: str = "models") -> str | None:
+    """
+    Returns the last migration aerich applied to the database, or None if it never ran.
+    """
+    try:
+        _, rows = await connection.execute_query(
+            'SELECT "version" FROM "aerich" WHERE "app" = ? ORDER BY "id" DESC LIMIT 1', [app]
+        )
+    except OperationalError:
+        return None
+    return rows[0]["version"] if rows else None
+
+
+async def check_schema_version(
+    connection: BaseDBAsyncClient, location: Path = MIGRATIONS_LOCATION, app: str = "models"
+) -> str:
+    """
+    Makes sure the database is at the newest migration, instead of creating the schema on every
+    start. One indexed read of the aerich table, where generate_schemas runs a CREATE IF NOT
+    EXISTS for every table and index.
+    Args:
+        connection (BaseDBAsyncClient): Connection to the database.
+        location (Path): The migrations directory of the app.
+        app (str): The aerich app name.
+    Returns:
+        str: The applied migration.
+    Raises:
+        SchemaVersionError: If migrations are missing from the database, or the database has
+            migrations this checkout does not know.
+    """
+    expected = latest_migration(location)
+    applied = await applied_migration(connection, app)
+    if applied is None:
+        raise SchemaVersionError("The database has no migrations, run `aerich upgrade` first.")
+    if applied != expected:
+        raise SchemaVersionError(
+            f"The database is at migration {applied} but the code expects {expected}, "
+            "run `aerich upgrade` (or deploy the matching code)."
+        )
+    return applied
@@ -3,4 +3,13 @@ ACCEPTED_TELEGRAM_USERS = [
     "usernamehere",
 ]
 DB_URL = "sqlite://db.sqlite3"
+# SQLite storage profile, one of orm.sqlite_profile.SQLITE_PROFILES
+DB_PROFILE = "balanced"
+# Plays older than this many days are moved to the archive tables
+ARCHIVE_AFTER_DAYS = 30
+# Telegram chat id that plays recorded before plays were kept per chat are moved to by
+# `aerich upgrade`, normally the group the bot served until then
+LEGACY_CHAT_ID = 0
+# Optional Bot API server to use instead of api.telegram.org, e.g. a local telegram-bot-api
+# BOT_API_URL = "http://localhost:8081/bot"
 BROWSERLESS_URL = "http://10.0.0.12:3000"
@@ -0,0 +1,97 @@
+"""
+Sample share texts, chatter and play columns shared by the tests and benchmarks.
+"""
+
+from datetime import date
+
+from games.connections import ConnectionsGame
+from games.crossclimb import CrossClimbGame
+from games.mini_crossword import MiniCrosswordGame
+from games.mini_sudoku import MiniSudokuGame
+from games.queens import QueensGame
+from games.tango import TangoGame
+from games.zip import ZipGame
+
+SHARES = {
+    ConnectionsGame: [
+        "Connections\nPuzzle #736\n🟪🟪🟪🟪\n🟦🟦🟦🟦\n🟩🟩🟩🟩\n🟨🟨🟨🟨",
+        "Connections\nPuzzle #736\n🟪🟪🟪🟪\n🟦🟦🟦🟦\n🟨🟨🟨🟩\n🟩🟩🟩🟨\n🟨🟨🟨🟨\n🟩🟩🟩🟩",
+        "Connections\nPuzzle #736\n🟨🟨🟨🟩\n🟨🟨🟨🟩\n🟨🟨🟨🟩\n🟩🟩🟩🟨\n",
+    ],
+    QueensGame: [
+        "Queens #426 | 0:27 and flawless\nFirst 👑s: 🟩 🟦 ⬜ \n🏅 I’m in the Top 25% of all players today!\nlnkd.in/queens",
+        "Queens #426 | 1:00\nFirst 👑s: 🟩 🟦 ⬜ \n🏅 I’m in the Top 25% of all players today!\nlnkd.in/queens",
+    ],
+    TangoGame: [
+        "Tango #275 | 0:25 and flawless\nFirst 5 placements:\n🟨🟨2️⃣1️⃣🟨🟨\n3️⃣🟨🟨5️⃣🟨4️⃣\n🟨🟨🟨🟨🟨🟨\n🟨🟨🟨🟨🟨🟨\n🟨🟨🟨🟨🟨🟨\n🟨🟨🟨🟨🟨🟨\n🏅 I’m in the Top 5% of all players today!\nlnkd.in/tango.",
+    ],
+    ZipGame: [
+        "Zip #114 | 3:06 and flawless 🏁\nWith no backtracks 🟢\n🏅 I’m in the Top 1% of all players today!\nlnkd.in/zip.",
+        "Zip #109 | 0:08 🏁\nWith 2 backtracks 🛑\n🏅 I’m in the Top 1% of all players today!",
+    ],
+    MiniCrosswordGame: [
+        "I solved the 7/31/2025 New York Times Mini Crossword in 1:23! https://www.nytimes.com/crosswords/game/mini",
+    ],
+    MiniSudokuGame: [
+        "Mini Sudoku #10 | 10:45  ✏️\n\n🏅 I’m on a 2-day win streak!\n\nThe classic game, made mini. Handcrafted by the originators of “Sudoku.”\n\nlnkd.in/minisudoku.",
+    ],
+    CrossClimbGame: [
+        "Crossclimb #478 | 0:57 and flawless\nFill order: 1️⃣ 3️⃣ 4️⃣ 5️⃣ 2️⃣ ⬆️ ⬇️ 🪜\n🏅 I’m in the Top 10% of all players today!\nlnkd.in/crossclimb.",
+    ],
+}
+
+CHATTER = [
+    "lol",
+    "Good morning everyone!",
+    "Did anyone else think today's queens was brutal?",
+    "Zip was easy today, I solved the whole thing in my head",
+    "I'll be late, see you at 5",
+    "Connections today was rough 😩",
+    "https://www.nytimes.com/crosswords/game/mini",
+    "Who's up for lunch? Thinking tacos 🌮 or maybe that new ramen place downtown",
+]
+
+
+def timed_defaults(seconds: int, flawless: bool = False) -> dict:
+    """
+    Columns of a Queens, Tango, Mini Sudoku or CrossClimb play scored by its time.
+    """
+    return {"score": seconds, "seconds": seconds, "flawless": flawless, "raw_text": f"{seconds}"}
+
+
+def zip_defaults(seconds: int, flawless: bool = False, backtracks: int = 0) -> dict:
+    return {
+        "score": seconds,
+        "seconds": seconds,
+        "backtracks": backtracks,
+        "flawless": flawless,
+        "raw_text": f"{seconds}",
+    }
+
+
+def connections_defaults(score: int, won: bool = True, mistakes: int = 0) -> dict:
+    return {
+        "score": score,
+        "purple_first": False,
+        "mistakes": mistakes,
+        "won": won,
+        "raw_text": f"{score}",
+    }
+
+
+def play_defaults(game, score: int) -> dict:
+    """
+    Columns of a play of any game, with one of its sample shares as the share text.
+    """
+    fields = game.db_model._meta.fields_map
+    shares = SHARES[game]
+    defaults = {"score": score, "raw_text": shares[score % len(shares)]}
+    for name in ("seconds", "mistakes", "backtracks", "guesses"):
+        if name in fields:
+            defaults[name] = score
+    for name in ("flawless", "purple_first", "won"):
+        if name in fields:
+            defaults[name] = True
+    if "game_date" in fields:
+        defaults["game_date"] = date(2025, 1, 1)
+    return defaults
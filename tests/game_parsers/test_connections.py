@@ -118,7 +118,6 @@ async def test_connections_daily_leaderboard():
             purple_first=True,
             mistakes=0,
             won=True,
-            raw_text="",
         ),
         ConnectionsPlay(
             game_number=todays_game_number,
@@ -127,7 +126,6 @@ async def test_connections_daily_leaderboard():
             purple_first=True,
             mistakes=0,
             won=True,
-            raw_text="",
         ),
         ConnectionsPlay(
             game_number=todays_game_number,
@@ -136,7 +134,6 @@ async def test_connections_daily_leaderboard():
             purple_first=True,
             mistakes=0,
             won=True,
-            raw_text="",
         ),
         ConnectionsPlay(
             game_number=todays_game_number - 1,
@@ -145,7 +142,6 @@ async def test_connections_daily_leaderboard():
             purple_first=True,
             mistakes=0,
             won=True,
-            raw_text="",
         ),
         ConnectionsPlay(
             game_number=todays_game_number + 1,
@@ -154,11 +150,14 @@ async def test_connections_daily_leaderboard():
             purple_first=True,
             mistakes=0,
             won=True,
-            raw_text="",
         ),
     ]
+    # written through the upsert path, which keeps daily_leaderboard current
     for obj in con_game_objs:
-        await obj.save()
+        defaults = {
+            name: getattr(obj, name) for name in ("score", "purple_first", "mistakes", "won")
+        }
+        await ConnectionsGame.update_or_create_game_record(obj.username, obj.game_number, defaults)
     leaderboard = await ConnectionsGame.todays_data(override_date=test_date)
     assert leaderboard == {
         "game_type": "connections",
@@ -169,3 +168,14 @@ async def test_connections_daily_leaderboard():
             {"username": "user2", "score": 80},
         ],
     }
+
+
+def test_connections_grid_tolerates_whitespace():
+    text = "Connections\nPuzzle #736\n  🟪🟪🟪🟪 \r\n🟦🟦🟦🟦\r\n\n🟩🟩🟩🟨\n🟩🟩🟩🟩\n🟨🟨🟨🟨x\n🟨🟨🟨🟨"
+    data = ConnectionsGame.process_to_dict(text)
+    assert (data["score"], data["mistakes"], data["purple_first"], data["won"]) == (
+        96,
+        1,
+        True,
+        True,
+    )
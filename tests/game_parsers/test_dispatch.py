@@ -0,0 +1,105 @@
+#!python3
+import pytest
+
+from games import GAMES
+from games.base import bulk_update_or_create_records
+from games.crossclimb import CrossClimbGame
+from games.dispatch import GameDispatcher
+from games.mini_crossword import MiniCrosswordGame
+from games.queens import QueensGame
+from games.tango import TangoGame
+from games.zip import ZipGame
+from orm.models import QueensPlay, TangoPlay, ZipPlay
+from tests.game_parsers.samples import CHATTER, SHARES
+
+dispatcher = GameDispatcher(GAMES)
+
+
+def test_dispatch_matches_every_game():
+    for game, texts in SHARES.items():
+        for text in texts:
+            assert dispatcher.match(text) == (game, 0)
+            assert game.str_matches(text)
+
+
+def test_dispatch_rejects_chatter():
+    for text in CHATTER:
+        assert dispatcher.match(text) is None
+        assert not any(game.str_matches(text) for game in GAMES)
+
+
+def test_dispatch_returns_share_position():
+    share = SHARES[MiniCrosswordGame][0]
+    text = f"Finally got it!\n{share}"
+    assert dispatcher.match(text) == (MiniCrosswordGame, len("Finally got it!\n"))
+    assert MiniCrosswordGame.process_to_dict(text, start=len("Finally got it!\n"))["score"] == 83
+
+
+def test_dispatch_anchored_games_only_match_at_start():
+    share = SHARES[QueensGame][0]
+    assert dispatcher.match(f"look at this: {share}") is None
+
+
+def test_dispatch_prefilter_counters():
+    counting_dispatcher = GameDispatcher(GAMES)
+    assert counting_dispatcher.anchors == (" #", "New York Times Mini Crossword")
+    for text in CHATTER:
+        counting_dispatcher.match(text)
+    counting_dispatcher.match(SHARES[QueensGame][0])
+    counting_dispatcher.match("see issue #12")
+    assert counting_dispatcher.counters == {
+        "messages": len(CHATTER) + 2,
+        "prefiltered": len(CHATTER),
+        "unmatched": 1,
+        "matched": 1,
+    }
+    assert counting_dispatcher.rejection_rate == len(CHATTER) / (len(CHATTER) + 2)
+
+
+def test_dispatch_splits_multiple_shares():
+    queens, tango, zip_share = SHARES[QueensGame][0], SHARES[TangoGame][0], SHARES[ZipGame][1]
+    crossword = SHARES[MiniCrosswordGame][0]
+    text = f"{queens}\n\n{tango}\n{zip_share}\nand the mini: {crossword}"
+    blocks = dispatcher.split(text)
+    assert [(game, block) for game, block, _ in blocks] == [
+        (QueensGame, queens),
+        (TangoGame, tango),
+        (ZipGame, f"{zip_share}\nand the mini:"),
+        (MiniCrosswordGame, crossword),
+    ]
+    parsed = dispatcher.parse_all(text)
+    assert [(game, data["score"]) for game, data in parsed] == [
+        (QueensGame, 27),
+        (TangoGame, 25),
+        (ZipGame, 18),
+        (MiniCrosswordGame, 83),
+    ]
+
+
+def test_dispatch_skips_invalid_shares():
+    text = f"{SHARES[QueensGame][0]}\nCrossclimb #478 | oops\n{SHARES[ZipGame][0]}"
+    assert [game for game, _ in dispatcher.parse_all(text)] == [QueensGame, ZipGame]
+    assert [game for game, _, _ in dispatcher.split(text)] == [QueensGame, CrossClimbGame, ZipGame]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_or_create_records():
+    await QueensPlay.all().delete()
+    await TangoPlay.all().delete()
+    await ZipPlay.all().delete()
+    text = "\n".join([SHARES[QueensGame][1], SHARES[TangoGame][0], SHARES[ZipGame][0]])
+    records_by_game = {}
+    for game, data in dispatcher.parse_all(text):
+        records_by_game.setdefault(game, []).append(
+            ("bulkuser", data["game_number"], game.get_update_defaults(data))
+        )
+    assert await bulk_update_or_create_records(records_by_game) == 3
+
+    correction = dispatcher.parse_all(SHARES[QueensGame][0])[0][1]
+    records = {QueensGame: [("bulkuser", 426, QueensGame.get_update_defaults(correction))]}
+    assert await bulk_update_or_create_records(records) == 0
+    assert await QueensPlay.all().values("username", "game_number", "score") == [
+        {"username": "bulkuser", "game_number": 426, "score": 27}
+    ]
+    assert await TangoPlay.all().count() == 1
+    assert await ZipPlay.all().count() == 1
@@ -0,0 +1,92 @@
+#!python3
+"""
+Adversarial multi-megabyte inputs. Every parser must give up or finish in time linear in the
+size of the input, checked by timing each input at two sizes rather than against a wall clock.
+"""
+
+import time
+
+import pytest
+
+from games import GAMES
+from games.connections import ConnectionsGame
+from games.dispatch import GameDispatcher
+from games.mini_crossword import MiniCrosswordGame
+from games.queens import QueensGame
+from games.zip import ZipGame
+
+MB = 1 << 20
+# the large inputs are SCALE times the small ones: linear time grows as much, quadratic time
+# SCALE times more, the allowed growth is halfway between
+SCALE = 4
+MAX_GROWTH = 2 * SCALE
+# room for timer noise on inputs a parser gives up on right away
+NOISE_SECONDS = 0.01
+REPEATS = 3
+
+# size in MB -> input
+ADVERSARIAL_INPUTS = {
+    "digits": (ZipGame, lambda size: "Zip #" + "1" * (size * MB)),
+    "zip no newline": (ZipGame, lambda size: "Zip #1 | 0:08" + " " * (size * MB)),
+    "zip long line": (
+        ZipGame,
+        lambda size: "Zip #1 | 0:08" + "x" * (size * MB) + "\nWith 2 backtracks",
+    ),
+    "spaces": (QueensGame, lambda size: "Queens #1 |" + " " * (size * MB)),
+    "repeated headers": (QueensGame, lambda size: "Queens #1 " * (size * MB // 8)),
+    "flawless far away": (
+        QueensGame,
+        lambda size: "Queens #1 | 0:10\n" + "x" * (size * MB) + "and flawless",
+    ),
+    "grid noise": (
+        ConnectionsGame,
+        lambda size: "Connections\nPuzzle #1\n" + "🟩🟨🟦 \n" * (size * MB // 4),
+    ),
+    "grid whitespace": (
+        ConnectionsGame,
+        lambda size: "Connections\nPuzzle #1\n" + " " * (size * MB) + "x",
+    ),
+    "grid rows": (
+        ConnectionsGame,
+        lambda size: "Connections\nPuzzle #1\n" + "🟩🟨🟦🟪\n" * (size * MB // 8),
+    ),
+    "dates": (MiniCrosswordGame, lambda size: "I solved the " + "1/" * (size * MB // 2)),
+}
+
+
+def timed(func, text):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        try:
+            func(text)
+        except ValueError:
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def assert_linear(func, make_input):
+    small = timed(func, make_input(1))
+    large = timed(func, make_input(SCALE))
+    assert large < MAX_GROWTH * small + NOISE_SECONDS, (small, large)
+
+
+@pytest.mark.parametrize("name", ADVERSARIAL_INPUTS)
+def test_parser_worst_case_time(name):
+    game, make_input = ADVERSARIAL_INPUTS[name]
+    assert_linear(game.process_to_dict, make_input)
+
+
+@pytest.mark.parametrize("name", ADVERSARIAL_INPUTS)
+def test_dispatch_worst_case_time(name):
+    _, make_input = ADVERSARIAL_INPUTS[name]
+    dispatcher = GameDispatcher(GAMES)
+    assert_linear(dispatcher.parse_all, make_input)
+
+
+def test_dispatch_many_shares_worst_case_time():
+    dispatcher = GameDispatcher(GAMES)
+    assert_linear(
+        dispatcher.parse_all, lambda size: "Zip #1 | 0:08\nWith 1 backtrack\n" * (size * MB // 64)
+    )
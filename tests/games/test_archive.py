@@ -0,0 +1,86 @@
+#!python3
+from datetime import date, timedelta
+
+import pytest
+from tortoise import Tortoise
+
+from games.archive import PlayArchiver
+from games.base import todays_leaderboards_from_plays
+from games.zip import ZipGame
+from orm.models import ZipPlay, ZipPlayArchive
+from tests.game_parsers.samples import zip_defaults
+from tools.daily_leaderboard import check, rebuild
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_closed_game_numbers():
+    await ZipPlay.all().delete()
+    await ZipPlayArchive.all().delete()
+    await rebuild([ZipGame])
+    today = ZipGame.current_game_number()
+    old = today - 40
+    await ZipGame.bulk_update_or_create_game_records(
+        [(f"archive{i}", number, zip_defaults(10 + i)) for i in range(5) for number in (old, today)]
+    )
+
+    archiver = PlayArchiver([ZipGame], horizon_days=30, batch_size=2, pause=0)
+    assert await archiver.archive_once() == 5
+    assert archiver.counters["batches"] == 3
+    assert await ZipPlay.filter(game_number=old).count() == 0
+    assert await ZipPlay.filter(game_number=today).count() == 5
+    archived = await ZipPlayArchive.filter(game_number=old).order_by("score").values("id", "score")
+    assert [row["score"] for row in archived] == [10, 11, 12, 13, 14]
+    # plays keep their id, so their share text is still found
+    assert await ZipGame.get_raw_texts([archived[0]["id"]]) == {archived[0]["id"]: "10"}
+
+    old_date = date.today() - timedelta(days=40)
+    records = await ZipGame._get_game_records(old, high_score_first=False, quantity=3)
+    assert [record["score"] for record in records] == [10, 11, 12]
+
+    # a late resubmission for an archived game number overrides the archived play
+    await ZipGame.update_or_create_game_record("archive4", old, zip_defaults(1))
+    records = await ZipGame._get_game_records(old, high_score_first=False, quantity=10)
+    assert [(record["username"], record["score"]) for record in records][:2] == [
+        ("archive4", 1),
+        ("archive0", 10),
+    ]
+    assert len(records) == 5
+    [data] = await todays_leaderboards_from_plays([ZipGame], override_date=old_date)
+    assert data["leaderboard"] == records
+    assert await check([ZipGame]) == {}
+
+    assert await archiver.archive_once() == 1
+    assert await ZipPlayArchive.filter(game_number=old).count() == 5
+    # the replaced play's share text is deleted with it
+    resubmitted = await ZipPlayArchive.get(username="archive4", game_number=old)
+    assert await ZipGame.get_raw_texts([archived[4]["id"], resubmitted.id]) == {resubmitted.id: "1"}
+    assert await ZipGame._get_game_records(old, high_score_first=False, quantity=10) == records
+
+
+@pytest.mark.asyncio
+async def test_archive_batches_stay_short_on_a_large_table():
+    await ZipPlay.all().delete()
+    await ZipPlayArchive.all().delete()
+    today = ZipGame.current_game_number()
+    plays = 200_000
+    # closed and open game numbers interleaved, so batches have to skip the open ones
+    await Tortoise.get_connection("default").execute_query(
+        'INSERT INTO "zip_play" ("chat_id", "username", "game_number", "score", "seconds", '
+        '"backtracks", "flawless") '
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) "
+        "SELECT 0, 'bulk' || i, CASE WHEN i % 2 THEN ? - i % 20 ELSE ? END, i % 60, i % 60, 0, 1 "
+        "FROM n",
+        [plays, today - 40, today],
+    )
+
+    archiver = PlayArchiver([ZipGame], horizon_days=30, batch_size=100, pause=0)
+    try:
+        assert await archiver.archive_once() == plays // 2
+        assert archiver.counters["batches"] == plays // 2 // 100
+        assert await ZipPlay.all().count() == plays // 2
+        # a couple of milliseconds each, batches that scanned the hot table took up to 30
+        assert archiver.max_batch_seconds < 0.02
+    finally:
+        await ZipPlay.all().delete()
+        await ZipPlayArchive.all().delete()
+        await rebuild([ZipGame])
@@ -0,0 +1,87 @@
+#!python3
+from datetime import date
+
+import pytest
+
+from games import GAMES
+from games.base import (
+    bulk_update_or_create_records,
+    todays_leaderboards,
+    todays_leaderboards_from_plays,
+)
+from games.leaderboard_cache import LeaderboardCache
+from games.queens import QueensGame
+from games.write_buffer import SubmissionBuffer
+from orm.models import QueensPlay
+from tests.game_parsers.samples import timed_defaults
+from tools.daily_leaderboard import check, rebuild
+
+TODAY = date(2025, 9, 1)
+CHAT_A = -1001
+CHAT_B = -1002
+
+
+@pytest.mark.asyncio
+async def test_chats_keep_separate_plays_and_leaderboards():
+    await QueensPlay.all().delete()
+    await rebuild([QueensGame])
+    game_number = QueensGame.date_to_game_number(TODAY)
+    await bulk_update_or_create_records(
+        {QueensGame: [("chatuser", game_number, timed_defaults(40))]}, chat_id=CHAT_A
+    )
+    # the same player in another chat is another play, not an update
+    assert (
+        await QueensGame.update_or_create_game_record(
+            "chatuser", game_number, timed_defaults(90), chat_id=CHAT_B
+        )
+    )[1]
+    await QueensGame.bulk_update_or_create_game_records(
+        [("bonly", game_number, timed_defaults(20))], chat_id=CHAT_B
+    )
+    assert await QueensPlay.filter(username="chatuser").count() == 2
+    assert await check([QueensGame]) == {}
+
+    a = await QueensGame.todays_data(override_date=TODAY, chat_id=CHAT_A)
+    b = await QueensGame.todays_data(override_date=TODAY, chat_id=CHAT_B)
+    assert a["leaderboard"] == [{"username": "chatuser", "score": 40}]
+    assert b["leaderboard"] == [
+        {"username": "bonly", "score": 20},
+        {"username": "chatuser", "score": 90},
+    ]
+    assert await QueensGame.todays_data(override_date=TODAY) == {}
+    for chat_id, expected in ((CHAT_A, a), (CHAT_B, b)):
+        leaderboards = await todays_leaderboards(GAMES, override_date=TODAY, chat_id=chat_id)
+        assert leaderboards[GAMES.index(QueensGame)] == expected
+        assert leaderboards == await todays_leaderboards_from_plays(
+            GAMES, override_date=TODAY, chat_id=chat_id
+        )
+
+    cache = LeaderboardCache()
+    cache.enable()
+    try:
+        assert await QueensGame.todays_data(override_date=TODAY, chat_id=CHAT_A) == a
+        await QueensGame.update_or_create_game_record(
+            "chatuser", game_number, timed_defaults(10), chat_id=CHAT_B
+        )
+        assert await QueensGame.todays_data(override_date=TODAY, chat_id=CHAT_A) == a
+        assert cache.counters["hits"] == 1
+    finally:
+        cache.disable()
+
+
+@pytest.mark.asyncio
+async def test_buffer_keeps_chats_apart():
+    await QueensPlay.all().delete()
+    game_number = QueensGame.date_to_game_number(TODAY)
+    buffer = SubmissionBuffer(flush_interval=60, max_rows=100)
+    buffer.submit(QueensGame, "buffered", game_number, timed_defaults(30), CHAT_A)
+    buffer.submit(QueensGame, "buffered", game_number, timed_defaults(50), CHAT_B)
+    assert len(buffer) == 2
+    assert buffer.pending_records(QueensGame, game_number, CHAT_A) == [
+        ("buffered", timed_defaults(30))
+    ]
+
+    assert await buffer.flush() == 2
+    assert await QueensPlay.filter(chat_id=CHAT_B).values_list("score", flat=True) == [50]
+    data = await QueensGame.todays_data(override_date=TODAY, chat_id=CHAT_A)
+    assert data["leaderboard"] == [{"username": "buffered", "score": 30}]
@@ -0,0 +1,78 @@
+#!python3
+import numpy as np
+import pytest
+
+from games.distribution import (
+    DistributionCache,
+    ScoreDistribution,
+    distribution_data,
+    todays_standings,
+)
+from games.zip import ZipGame
+from orm.models import ZipPlay
+from tests.game_parsers.samples import zip_defaults
+
+CHAT = -1006
+
+
+def test_score_distribution():
+    # lower is better: 10 beats everyone, the two 30s tie for third
+    distribution = ScoreDistribution([40, 30, 10, 30, 20], False, ["d", "c", "a", "c2", "b"])
+    assert distribution.scores.dtype == np.int32
+    assert distribution.score_of("c2") == 30
+    assert distribution.score_of("nobody") is None
+    assert distribution.rank(np.array([10, 30, 40])).tolist() == [1, 3, 5]
+    assert distribution.top_percent(10) == 20.0
+    assert distribution.percentiles([0, 50, 100]) == {0: 10.0, 50: 30.0, 100: 40.0}
+    assert distribution.z_scores(26) == pytest.approx(0)
+    assert distribution.z_scores().mean() == pytest.approx(0)
+    counts, edges = distribution.histogram(3)
+    assert counts == [1, 1, 3] and edges == [10.0, 20.0, 30.0, 40.0]
+
+    higher = ScoreDistribution([1, 2, 2, 3], True)
+    assert higher.rank(np.array([3, 2, 1])).tolist() == [1, 2, 4]
+    # a score nobody had still ranks
+    assert higher.rank(4) == 1
+    # bins are never narrower than a score point
+    assert higher.histogram(10)[0] == [1, 2, 1]
+
+    empty = ScoreDistribution([], True)
+    assert len(empty) == 0 and empty.percentiles() == {} and empty.histogram() == ([], [])
+    assert empty.z_scores().size == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_is_invalidated_on_write():
+    await ZipPlay.filter(chat_id=CHAT).delete()
+    today = ZipGame.current_game_number()
+    for username, seconds in (("first", 10), ("second", 20), ("third", 30), ("fourth", 40)):
+        await ZipGame.update_or_create_game_record(
+            username, today, zip_defaults(seconds), chat_id=CHAT
+        )
+    await ZipGame.update_or_create_game_record("third", today - 1, zip_defaults(5), chat_id=CHAT)
+
+    cache = DistributionCache()
+    cache.enable()
+    try:
+        [standing] = await todays_standings([ZipGame], "third", chat_id=CHAT)
+        assert standing == {
+            "game_type": ZipGame.game_type,
+            "score": 30,
+            "rank": 3,
+            "plays": 4,
+            "top_percent": 75.0,
+        }
+        [data] = await distribution_data([ZipGame], CHAT)
+        assert data["plays"] == 5 and data["percentiles"][50] == 20.0
+        assert sum(data["histogram"]) == 5
+        await todays_standings([ZipGame], "third", chat_id=CHAT)
+        assert cache.counters["hits"] == 1 and len(cache) == 2
+
+        # a correction drops today's entry and the all game numbers one
+        await ZipGame.update_or_create_game_record("third", today, zip_defaults(1), chat_id=CHAT)
+        assert len(cache) == 0
+        [standing] = await todays_standings([ZipGame], "third", chat_id=CHAT)
+        assert (standing["rank"], standing["top_percent"]) == (1, 25.0)
+        assert await todays_standings([ZipGame], "nobody", chat_id=CHAT) == []
+    finally:
+        cache.disable()
@@ -0,0 +1,75 @@
+#!python3
+from datetime import date
+
+import pytest
+
+from games import GAMES
+from games.base import todays_leaderboards
+from games.leaderboard_cache import LeaderboardCache, TopPlays
+from games.tango import TangoGame
+from games.zip import ZipGame
+from orm.models import TangoPlay, ZipPlay
+from tests.game_parsers.samples import timed_defaults
+
+TODAY = date(2025, 8, 1)
+
+
+def test_top_plays_keeps_true_top_when_truncated():
+    rows = [{"id": i, "username": f"user{i}", "score": 10 * i} for i in range(1, 6)]
+    top = TopPlays(higher_score_first=False, depth=3, rows=rows)
+    assert top.truncated
+    assert [row["username"] for row in top.rows()] == ["user1", "user2", "user3"]
+
+    top.update(9, "new", 15)
+    assert [row["username"] for row in top.rows()] == ["user1", "new", "user2"]
+    # user2 getting worse may fall behind plays that were cut off, so it leaves the list
+    top.update(2, "user2", 100)
+    assert [row["username"] for row in top.rows()] == ["user1", "new"]
+    # ties go to the older play
+    top.update(0, "old", 10)
+    assert [row["username"] for row in top.rows()] == ["old", "user1", "new"]
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_reads_and_follows_writes():
+    await TangoPlay.all().delete()
+    await ZipPlay.all().delete()
+    game_number = TangoGame.date_to_game_number(TODAY)
+    for index in range(12):
+        await TangoGame.update_or_create_game_record(
+            f"cache{index}", game_number, timed_defaults(50 + index)
+        )
+    expected = await TangoGame.todays_data(override_date=TODAY)
+
+    cache = LeaderboardCache(depth=15)
+    cache.enable()
+    try:
+        assert await TangoGame.todays_data(override_date=TODAY) == expected
+        assert await TangoGame.todays_data(override_date=TODAY) == expected
+        assert cache.counters["misses"] == 1
+        assert cache.counters["hits"] == 1
+
+        await TangoGame.update_or_create_game_record("cache11", game_number, timed_defaults(1))
+        await TangoGame.bulk_update_or_create_game_records(
+            [("late", game_number, timed_defaults(2)), ("cache0", game_number, timed_defaults(99))]
+        )
+        cached = await TangoGame.todays_data(override_date=TODAY)
+        assert cache.counters["misses"] == 1
+        assert cache.counters["updates"] == 3
+
+        leaderboards = await todays_leaderboards(GAMES, override_date=TODAY)
+        assert leaderboards[GAMES.index(TangoGame)] == cached
+        assert leaderboards[GAMES.index(ZipGame)] == {}
+        assert cache.counters["misses"] == 1 + len(GAMES) - 1
+
+        # a newer game number evicts the older ones of the same game
+        await TangoGame.todays_data(override_date=date(2025, 8, 2))
+        assert cache.counters["evictions"] == 1
+    finally:
+        cache.disable()
+
+    assert await TangoGame.todays_data(override_date=TODAY) == cached
+    assert cached["leaderboard"][:2] == [
+        {"username": "cache11", "score": 1},
+        {"username": "late", "score": 2},
+    ]
@@ -0,0 +1,13 @@
+from datetime import date
+
+from games.periods import iso_week, iso_week_days, month_days
+from games.tango import TangoGame
+
+
+def test_periods():
+    assert iso_week(date(2025, 12, 29)) == 202601
+    assert iso_week_days(202601) == (date(2025, 12, 29), date(2026, 1, 4))
+    assert month_days(202402) == (date(2024, 2, 1), date(2024, 2, 29))
+    assert month_days(202512) == (date(2025, 12, 1), date(2025, 12, 31))
+    game_number = TangoGame.date_to_game_number(date(2025, 10, 18))
+    assert TangoGame.game_number_to_date(game_number) == date(2025, 10, 18)
@@ -0,0 +1,96 @@
+#!python3
+import threading
+
+import numpy as np
+import pytest
+
+from games.base import rating_leaderboards
+from games.queens import QueensGame
+from games import ratings
+from games.ratings import K_FACTOR, RatingEngine, match_deltas
+from orm.models import PlayerRating, QueensPlay, QueensPlayArchive, RatingProgress
+from tests.game_parsers.samples import timed_defaults
+
+CHAT = -1004
+TODAY = 500
+
+
+def test_match_deltas_is_a_round_robin():
+    deltas = match_deltas(np.full(3, 1500.0), np.array([10.0, 20.0, 30.0]), False)
+    assert deltas == pytest.approx([K_FACTOR / 2, 0, -K_FACTOR / 2])
+    # a tie is a draw, and a favourite gains less for the same win
+    deltas = match_deltas(np.array([1700.0, 1500.0]), np.array([5.0, 5.0]), True)
+    assert deltas[0] < 0 < deltas[1]
+    assert match_deltas(np.array([1500.0]), np.array([1.0]), True) == [0]
+
+
+async def stored_ratings() -> dict[str, tuple[float, int]]:
+    return {
+        username: (rating, matches)
+        for username, rating, matches in await PlayerRating.filter(
+            game_type=QueensGame.game_type, chat_id=CHAT
+        ).values_list("username", "rating", "matches")
+    }
+
+
+@pytest.mark.asyncio
+async def test_ratings_update_as_game_numbers_close(monkeypatch):
+    for model in (QueensPlay, QueensPlayArchive, PlayerRating, RatingProgress):
+        await model.all().delete()
+    today = TODAY
+    monkeypatch.setattr(QueensGame, "current_game_number", classmethod(lambda cls: today))
+
+    async def play(username: str, game_number: int, seconds: int) -> None:
+        await QueensGame.update_or_create_game_record(
+            username, game_number, timed_defaults(seconds), chat_id=CHAT
+        )
+
+    for game_number in (TODAY - 3, TODAY - 2):
+        await play("fast", game_number, 20)
+        await play("middle", game_number, 40)
+        await play("slow", game_number, 60)
+    await play("fast", TODAY, 90)
+    await play("slow", TODAY, 10)
+
+    threads = []
+
+    def rate_plays(*args):
+        threads.append(threading.current_thread())
+        return original_rate_plays(*args)
+
+    original_rate_plays = ratings.rate_plays
+    monkeypatch.setattr(ratings, "rate_plays", rate_plays)
+    engine = RatingEngine([QueensGame])
+    assert await engine.update_once() == TODAY - 1
+    assert engine.counters["recomputes"] == 1
+    # the full recompute rates in a worker thread, off the event loop
+    assert threads and threading.main_thread() not in threads
+    first = await stored_ratings()
+    assert first["fast"][0] > first["middle"][0] > first["slow"][0]
+    assert [matches for _, matches in first.values()] == [2, 2, 2]
+    assert sum(rating for rating, _ in first.values()) == pytest.approx(3 * 1500)
+
+    # today closes, only its plays are rated, from the stored ratings
+    today = TODAY + 1
+    assert await engine.update_once() == 1
+    assert engine.counters["recomputes"] == 1
+    incremental = await stored_ratings()
+    assert incremental["slow"][0] > first["slow"][0]
+    assert incremental["middle"] == first["middle"]
+
+    # a late play for a rated game number redoes the chat
+    await play("late", TODAY - 3, 5)
+    assert await engine.update_once() == 0
+    assert engine.counters["recomputes"] == 2
+    late = await stored_ratings()
+
+    assert await engine.rebuild() == TODAY
+    rebuilt = await stored_ratings()
+    assert rebuilt == pytest.approx(late)
+    assert rebuilt["late"][1] == 1
+
+    [data] = await rating_leaderboards([QueensGame], CHAT)
+    assert data == await QueensGame.rating_data(CHAT)
+    assert [row["username"] for row in data["leaderboard"]] == sorted(
+        rebuilt, key=lambda username: -rebuilt[username][0]
+    )
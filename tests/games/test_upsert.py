@@ -0,0 +1,67 @@
+#!python3
+import asyncio
+
+import pytest
+from tortoise.exceptions import IntegrityError
+
+from games.base import bulk_update_or_create_records
+from games.queens import QueensGame
+from games.zip import ZipGame
+from orm.models import QueensPlay, ZipPlay
+from tests.game_parsers.samples import timed_defaults, zip_defaults
+
+
+@pytest.mark.asyncio
+async def test_upsert_reports_insert_and_update():
+    await QueensPlay.all().delete()
+    record_id, is_new = await QueensGame.update_or_create_game_record(
+        "upsertuser", 1, timed_defaults(30)
+    )
+    assert is_new
+    assert await QueensGame.update_or_create_game_record("upsertuser", 1, timed_defaults(20)) == (
+        record_id,
+        False,
+    )
+    assert await QueensPlay.all().values("id", "score") == [{"id": record_id, "score": 20}]
+    assert await QueensGame.get_raw_texts([record_id]) == {record_id: "20"}
+
+
+@pytest.mark.asyncio
+async def test_unique_username_game_number():
+    await QueensPlay.all().delete()
+    await QueensPlay.create(username="upsertuser", game_number=1, **timed_defaults(30))
+    with pytest.raises(IntegrityError):
+        await QueensPlay.create(username="upsertuser", game_number=1, **timed_defaults(30))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_never_duplicate():
+    await QueensPlay.all().delete()
+    await ZipPlay.all().delete()
+    results = await asyncio.gather(
+        *(
+            QueensGame.update_or_create_game_record("upsertuser", 7, timed_defaults(seconds))
+            for seconds in range(1, 51)
+        )
+    )
+    assert sum(is_new for _, is_new in results) == 1
+    assert len({record_id for record_id, _ in results}) == 1
+
+    created = await asyncio.gather(
+        *(
+            bulk_update_or_create_records(
+                {
+                    QueensGame: [(f"user{i % 5}", 8, timed_defaults(i)) for i in range(start, 20)],
+                    ZipGame: [
+                        (f"user{i % 3}", 8, zip_defaults(9, flawless=True))
+                        for i in range(start, 20)
+                    ],
+                }
+            )
+            for start in range(10)
+        )
+    )
+    assert sum(created) == 5 + 3
+    assert await QueensPlay.all().count() == 6
+    assert await QueensPlay.filter(game_number=8).count() == 5
+    assert await ZipPlay.all().count() == 3
@@ -0,0 +1,93 @@
+#!python3
+import asyncio
+from datetime import date
+
+import pytest
+
+from games.queens import QueensGame
+from games.write_buffer import SubmissionBuffer
+from orm.models import DEFAULT_CHAT_ID, QueensPlay
+from tests.game_parsers.samples import timed_defaults
+
+
+@pytest.mark.asyncio
+async def test_buffer_coalesces_and_flushes_once():
+    await QueensPlay.all().delete()
+    buffer = SubmissionBuffer(flush_interval=60, max_rows=100)
+    buffer.submit(QueensGame, "bufferuser", 3, timed_defaults(40))
+    buffer.submit(QueensGame, "bufferuser", 3, timed_defaults(35))
+    buffer.submit(QueensGame, "otheruser", 3, timed_defaults(50))
+    assert len(buffer) == 2
+    assert await QueensPlay.all().count() == 0
+
+    assert await buffer.flush() == 2
+    assert len(buffer) == 0
+    assert buffer.flushes == 1
+    assert await QueensPlay.filter(username="bufferuser").values_list("score", flat=True) == [35]
+    assert await buffer.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_todays_data_sees_pending_writes():
+    await QueensPlay.all().delete()
+    today = date(2025, 6, 1)
+    game_number = QueensGame.date_to_game_number(today)
+    await QueensGame.update_or_create_game_record("bufferuser", game_number, timed_defaults(90))
+    await QueensGame.update_or_create_game_record("otheruser", game_number, timed_defaults(60))
+
+    buffer = SubmissionBuffer(flush_interval=60, max_rows=100)
+    buffer.start()
+    try:
+        buffer.submit(QueensGame, "bufferuser", game_number, timed_defaults(30))
+        buffer.submit(QueensGame, "newuser", game_number, timed_defaults(45))
+        buffer.submit(QueensGame, "newuser", game_number + 1, timed_defaults(10))
+        data = await QueensGame.todays_data(override_date=today)
+        assert data["leaderboard"] == [
+            {"username": "bufferuser", "score": 30},
+            {"username": "newuser", "score": 45},
+            {"username": "otheruser", "score": 60},
+        ]
+    finally:
+        await buffer.stop()
+
+    assert len(buffer) == 0
+    assert await QueensPlay.all().count() == 4
+    assert await QueensGame.todays_data(override_date=today) == data
+
+
+@pytest.mark.asyncio
+async def test_max_rows_wakes_flush_task():
+    await QueensPlay.all().delete()
+    buffer = SubmissionBuffer(flush_interval=60, max_rows=3)
+    buffer.start()
+    try:
+        for index in range(3):
+            buffer.submit(QueensGame, f"user{index}", 5, timed_defaults(index + 1))
+        for _ in range(100):
+            if buffer.flushes:
+                break
+            await asyncio.sleep(0.01)
+        assert buffer.flushes == 1
+        assert await QueensPlay.filter(game_number=5).count() == 3
+    finally:
+        await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_failing_record_is_dead_lettered():
+    await QueensPlay.all().delete()
+    buffer = SubmissionBuffer(flush_interval=60, max_rows=100, max_attempts=2)
+    # no score, which the table requires
+    broken = {"seconds": 10, "flawless": False, "raw_text": "10"}
+    buffer.submit(QueensGame, "broken", 7, broken)
+    buffer.submit(QueensGame, "healthy", 7, timed_defaults(20))
+
+    # the rest of the chat is written around the bad record
+    assert await buffer.flush() == 1
+    assert await QueensPlay.filter(game_number=7).values_list("username", flat=True) == ["healthy"]
+    assert len(buffer) == 1 and buffer.dead_letters == []
+
+    assert await buffer.flush() == 0
+    assert len(buffer) == 0
+    assert buffer.dead_letters == [(QueensGame, (DEFAULT_CHAT_ID, "broken", 7), broken)]
+    assert await buffer.flush() == 0
@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+
+from games import GAMES
+from games.dispatch import GameDispatcher
+from image_generators.renderer import RendererClient
+
+PNG = b"\x89PNG\r\n\x1a\nstub"
+PAYLOAD = {"html": "<p>hi</p>", "options": {"type": "png"}}
+ZIP_SHARE = "Zip #114 | 0:06 and flawless 🏁\nWith no backtracks 🟢"
+
+
+class StubRenderer:
+    """
+    A local HTTP/1.1 server standing in for browserless. Each request takes the next
+    (delay, status) of `responses`, the last one repeating.
+    """
+
+    def __init__(self, responses: list[tuple[float, int]]):
+        self.responses = responses
+        self.connections = 0
+        self.requests = 0
+        self.server: asyncio.Server | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def __aenter__(self) -> "StubRenderer":
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.server.close()
+        self.server.close_clients()
+        await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while head := await reader.readuntil(b"\r\n\r\n"):
+                headers = dict(
+                    line.split(": ", 1) for line in head.decode().split("\r\n")[1:] if line
+                )
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                delay, status = self.responses[min(self.requests, len(self.responses) - 1)]
+                self.requests += 1
+                await asyncio.sleep(delay)
+                body = PNG if status == 200 else b"busy"
+                writer.write(
+                    f"HTTP/1.1 {status} Stub\r\nContent-Type: image/png\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.mark.asyncio
+async def test_slow_render_does_not_block_other_updates():
+    async with StubRenderer([(0.3, 200)]) as stub:
+        client = RendererClient(stub.url)
+        render = asyncio.create_task(client.screenshot(PAYLOAD))
+        dispatcher = GameDispatcher(GAMES)
+        handled = []
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            handled.append(dispatcher.parse_all(ZIP_SHARE))
+        # every share was parsed while the screenshot was still being taken
+        assert not render.done()
+        assert len(handled) == 5 and handled[0][0][1]["score"] == 6
+        assert await render == PNG
+
+        # the next render reuses the kept-alive connection
+        assert await client.screenshot(PAYLOAD) == PNG
+        assert (stub.connections, stub.requests) == (1, 2)
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded():
+    async with StubRenderer([(0, 503), (0, 200)]) as stub:
+        client = RendererClient(stub.url, backoff=0)
+        assert await client.screenshot(PAYLOAD) == PNG
+        assert stub.requests == 2
+        await client.aclose()
+
+    async with StubRenderer([(0, 503)]) as stub:
+        client = RendererClient(stub.url, retries=1, backoff=0)
+        with pytest.raises(Exception, match="Failed to generate image: busy"):
+            await client.screenshot(PAYLOAD)
+        assert stub.requests == 2
+        await client.aclose()
+
+    async with StubRenderer([(1.0, 200)]) as stub:
+        client = RendererClient(stub.url, read_timeout=0.05, retries=2, backoff=0)
+        with pytest.raises(httpx.ReadTimeout):
+            await client.screenshot(PAYLOAD)
+        assert stub.requests == 3
+        await client.aclose()
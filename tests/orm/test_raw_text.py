@@ -0,0 +1,26 @@
+#!python3
+import importlib
+
+from orm.raw_text import DICTIONARIES, DICTIONARY_VERSION, compress_text, decompress_text
+from tests.game_parsers.samples import CHATTER, SHARES
+
+
+def test_compress_round_trip():
+    for text in [text for texts in SHARES.values() for text in texts] + CHATTER + [""]:
+        compressed = compress_text(text)
+        assert compressed[0] == DICTIONARY_VERSION
+        assert decompress_text(compressed) == text
+
+
+def test_shares_compress_well():
+    for texts in SHARES.values():
+        for text in texts:
+            assert len(compress_text(text)) * 3 < len(text.encode())
+
+
+def test_play_text_migration_keeps_dictionary_one():
+    migration = importlib.import_module("migrations.models.3_20251018150000_play_text")
+    assert migration.DICTIONARY == DICTIONARIES[migration.DICTIONARY_VERSION]
+    for text in [text for texts in SHARES.values() for text in texts]:
+        # orm.raw_text reads it whichever dictionary is current
+        assert decompress_text(migration.compress_text(text)) == text
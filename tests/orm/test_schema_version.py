@@ -0,0 +1,41 @@
+#!python3
+import pytest
+from tortoise import Tortoise
+
+from orm.schema_version import (
+    MIGRATIONS_LOCATION,
+    SchemaVersionError,
+    check_schema_version,
+    latest_migration,
+)
+
+
+def test_latest_migration_orders_by_number(tmp_path):
+    assert latest_migration(tmp_path) is None
+    for name in ("9_20250101000000_nine.py", "10_20250102000000_ten.py", "__init__.py"):
+        (tmp_path / name).write_text("")
+    assert latest_migration(tmp_path) == "10_20250102000000_ten.py"
+    assert (MIGRATIONS_LOCATION / latest_migration()).exists()
+
+
+@pytest.mark.asyncio
+async def test_check_schema_version(tmp_path):
+    connection = Tortoise.get_connection("default")
+    (tmp_path / "0_20250101000000_init.py").write_text("")
+    with pytest.raises(SchemaVersionError, match="no migrations"):
+        await check_schema_version(connection, tmp_path)
+
+    await connection.execute_script(
+        'CREATE TABLE "aerich" ("id" INTEGER PRIMARY KEY, "version" TEXT, "app" TEXT)'
+    )
+    try:
+        await connection.execute_query(
+            'INSERT INTO "aerich" ("version", "app") VALUES (?, ?)',
+            ["0_20250101000000_init.py", "models"],
+        )
+        assert await check_schema_version(connection, tmp_path) == "0_20250101000000_init.py"
+        (tmp_path / "1_20250102000000_next.py").write_text("")
+        with pytest.raises(SchemaVersionError, match="aerich upgrade"):
+            await check_schema_version(connection, tmp_path)
+    finally:
+        await connection.execute_script('DROP TABLE "aerich"')
@@ -0,0 +1,24 @@
+#!python3
+import pytest
+
+from orm.sqlite_profile import SQLITE_PROFILES, db_connection_config
+
+
+def test_profile_pragmas_become_credentials():
+    config = db_connection_config("sqlite://db.sqlite3", "balanced")
+    assert config["engine"] == "tortoise.backends.sqlite"
+    assert config["credentials"]["file_path"] == "db.sqlite3"
+    for pragma, value in SQLITE_PROFILES["balanced"].items():
+        assert config["credentials"][pragma] == value
+
+
+def test_url_pragmas_override_profile():
+    config = db_connection_config("sqlite://db.sqlite3?synchronous=FULL", "bulk")
+    assert config["credentials"]["synchronous"] == "FULL"
+    assert config["credentials"]["temp_store"] == "MEMORY"
+
+
+def test_other_databases_and_unknown_profiles():
+    assert db_connection_config("postgres://u:p@localhost/db") == "postgres://u:p@localhost/db"
+    with pytest.raises(ValueError):
+        db_connection_config("sqlite://db.sqlite3", "turbo")
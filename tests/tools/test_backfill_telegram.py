@@ -0,0 +1,77 @@
+import io
+import json
+
+import pytest
+
+from games.queens import QueensGame
+from games.zip import ZipGame
+from orm.models import QueensPlay, ZipPlay
+from tests.game_parsers.samples import CHATTER, SHARES
+from tools.backfill_telegram import backfill, iter_export_messages
+
+
+def make_export(messages: list[dict]) -> str:
+    return json.dumps(
+        {"name": "Scores", "type": "private_group", "id": 1, "messages": messages},
+        ensure_ascii=False,
+        indent=1,
+    )
+
+
+def make_messages() -> list[dict]:
+    queens = SHARES[QueensGame][0]
+    zip_share = SHARES[ZipGame][1]
+    return [
+        {"id": 1, "type": "service", "action": "create_group"},
+        {"id": 2, "type": "message", "from": "Alice", "from_id": "user1", "text": CHATTER[1]},
+        {"id": 3, "type": "message", "from": "Alice", "from_id": "user1", "text": queens},
+        {
+            "id": 4,
+            "type": "message",
+            "from": "Bob",
+            "from_id": "user2",
+            "text": [zip_share[:10], {"type": "bold", "text": zip_share[10:]}],
+        },
+        {"id": 5, "type": "message", "from": "Bob", "from_id": "user2", "text": CHATTER[2]},
+        {
+            "id": 6,
+            "type": "message",
+            "from": "Alice",
+            "from_id": "user1",
+            "text": queens.replace("0:27", "0:20"),
+        },
+    ]
+
+
+def test_iter_export_messages_across_chunks():
+    messages = make_messages()
+    export = make_export(messages)
+    assert list(iter_export_messages(io.StringIO(export), chunk_size=7)) == messages
+
+
+def test_iter_export_messages_truncated():
+    export = make_export(make_messages())[:-40]
+    with pytest.raises(ValueError):
+        list(iter_export_messages(io.StringIO(export), chunk_size=16))
+
+
+@pytest.mark.asyncio
+async def test_backfill_imports_and_resumes(tmp_path):
+    await QueensPlay.all().delete()
+    await ZipPlay.all().delete()
+    export_path = tmp_path / "result.json"
+    export_path.write_text(make_export(make_messages()), encoding="utf-8")
+    state_path = tmp_path / "state.json"
+
+    counts = await backfill(export_path, state_path, batch_size=2, user_map={"user2": "@bob"})
+    assert counts == {"messages": 6, "skipped": 0, "plays": 3, "created": 2}
+    assert await QueensPlay.all().values("username", "game_number", "score") == [
+        {"username": "Alice", "game_number": 426, "score": 20}
+    ]
+    assert await ZipPlay.all().values("username", "game_number", "score") == [
+        {"username": "@bob", "game_number": 109, "score": 18}
+    ]
+
+    counts = await backfill(export_path, state_path, batch_size=2)
+    assert counts == {"messages": 6, "skipped": 6, "plays": 0, "created": 0}
+    assert await QueensPlay.all().count() == 1
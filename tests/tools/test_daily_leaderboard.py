@@ -0,0 +1,84 @@
+from datetime import date
+
+import pytest
+
+from games import GAMES
+from games.base import (
+    DAILY_LEADERBOARD_DEPTH,
+    bulk_update_or_create_records,
+    todays_leaderboards,
+    todays_leaderboards_from_plays,
+)
+from games.connections import ConnectionsGame
+from games.leaderboard_cache import LeaderboardCache
+from games.tango import TangoGame
+from orm.models import DailyLeaderboard, TangoPlay
+from tests.game_parsers.samples import connections_defaults, timed_defaults
+from tools.daily_leaderboard import check, rebuild
+
+TODAY = date(2025, 7, 1)
+
+
+@pytest.mark.asyncio
+async def test_upserts_maintain_daily_leaderboard():
+    await rebuild()
+    tango_number = TangoGame.date_to_game_number(TODAY)
+    connections_number = ConnectionsGame.date_to_game_number(TODAY)
+    await bulk_update_or_create_records(
+        {
+            TangoGame: [(f"daily{i}", tango_number, timed_defaults(100 - i)) for i in range(30)],
+            ConnectionsGame: [("daily1", connections_number, connections_defaults(50))],
+        }
+    )
+    await TangoGame.update_or_create_game_record("daily0", tango_number, timed_defaults(5))
+    await ConnectionsGame.update_or_create_game_record(
+        "daily2", connections_number, connections_defaults(80)
+    )
+    assert await check() == {}
+
+    stored = (
+        await DailyLeaderboard.filter(game_type=TangoGame.game_type, game_number=tango_number)
+        .order_by("rank")
+        .values_list("rank", "play_id", "username", flat=False)
+    )
+    assert len(stored) == DAILY_LEADERBOARD_DEPTH
+    daily0 = await TangoPlay.get(username="daily0", game_number=tango_number)
+    assert stored[0] == (1, daily0.id, "daily0") and stored[1][::2] == (2, "daily29")
+
+    leaderboards = await todays_leaderboards(GAMES, override_date=TODAY)
+    assert leaderboards == [await game.todays_data(override_date=TODAY) for game in GAMES]
+    assert leaderboards == await todays_leaderboards_from_plays(GAMES, override_date=TODAY)
+    connections = leaderboards[GAMES.index(ConnectionsGame)]
+    assert connections["leaderboard"] == [
+        {"username": "daily2", "score": 80},
+        {"username": "daily1", "score": 50},
+    ]
+
+    # cache misses are filled from the table too, in one query
+    cache = LeaderboardCache()
+    cache.enable()
+    try:
+        assert await todays_leaderboards(GAMES, override_date=TODAY) == leaderboards
+        assert cache.counters["misses"] == len(GAMES)
+        await TangoGame.update_or_create_game_record("daily5", tango_number, timed_defaults(1))
+        [tango] = await todays_leaderboards([TangoGame], override_date=TODAY)
+        assert tango["leaderboard"][:2] == [
+            {"username": "daily5", "score": 1},
+            {"username": "daily0", "score": 5},
+        ]
+        assert cache.counters["misses"] == len(GAMES)
+    finally:
+        cache.disable()
+    assert await check() == {}
+
+
+@pytest.mark.asyncio
+async def test_check_finds_and_rebuild_fixes_drift():
+    await rebuild()
+    tango_number = TangoGame.date_to_game_number(TODAY) + 1
+    await TangoPlay.create(username="drift", game_number=tango_number, **timed_defaults(1))
+    assert await check() == {TangoGame.game_type: [tango_number]}
+    await rebuild()
+    assert await check() == {}
+    data = await TangoGame.todays_data(override_date=date(2025, 7, 2))
+    assert data["leaderboard"][0] == {"username": "drift", "score": 1}
@@ -0,0 +1,116 @@
+import hashlib
+import os
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from games import GAMES
+from games.base import bulk_update_or_create_records
+from orm.models import PlayText
+from tools.plays import export_plays, game_columns, import_plays
+
+# Plays generated for the quick round trip, PLAYS_ROUNDTRIP_ROWS=200000 makes it a bigger one.
+ROUNDTRIP_ROWS = int(os.environ.get("PLAYS_ROUNDTRIP_ROWS", "5000"))
+# Plays generated for the round trip at the scale the commands are meant for, with --run-slow.
+SCALE_ROWS = 2_000_000
+CHATS = (-1008, -1009, 0)
+
+
+def generated_defaults(game, i: int) -> dict:
+    defaults = {"score": i % 500}
+    for name in game_columns(game):
+        if name == "game_date":
+            defaults[name] = date(2025, 1, 1) + timedelta(days=i % 300)
+        elif name in ("flawless", "purple_first", "won"):
+            defaults[name] = bool(i % 2)
+        else:
+            defaults[name] = i % 7
+    # every tenth play has no share text
+    if i % 10:
+        defaults["raw_text"] = f"{game.game_type} #{i} ✅\nline two"
+    return defaults
+
+
+async def clear_plays() -> None:
+    for game in GAMES:
+        await game.db_model.all().delete()
+        await game.archive_model.all().delete()
+    await PlayText.all().delete()
+
+
+async def seed(rows: int) -> None:
+    batch = 5000
+    for offset in range(0, rows, batch):
+        for chat_id in CHATS:
+            records_by_game = {game: [] for game in GAMES}
+            for i in range(offset, min(offset + batch, rows)):
+                if CHATS[i % len(CHATS)] != chat_id:
+                    continue
+                game = GAMES[i % len(GAMES)]
+                records_by_game[game].append(
+                    (f"user{i % 101}", 1 + i // 101, generated_defaults(game, i))
+                )
+            await bulk_update_or_create_records(records_by_game, chat_id)
+
+
+def digest(path: Path) -> tuple[int, int]:
+    """
+    An order independent digest of an export, the line count and the sum of the line hashes.
+    """
+    lines = total = 0
+    with path.open(encoding="utf-8") as fp:
+        for line in fp:
+            lines += 1
+            total += int.from_bytes(hashlib.blake2b(line.encode(), digest_size=8).digest())
+    return lines, total % 2**64
+
+
+async def round_trip(tmp_path: Path, rows: int) -> None:
+    await clear_plays()
+    await seed(rows)
+    # archived plays are exported too, and come back as hot plays
+    archive = GAMES[0].archive_model
+    await archive.create(
+        chat_id=CHATS[0], username="archived", game_number=1, **generated_defaults(GAMES[0], 0)
+    )
+
+    exported = tmp_path / "plays.jsonl"
+    assert await export_plays(exported) == rows + 1
+    assert await export_plays(tmp_path / "plays.csv") == rows + 1
+    expected = digest(exported)
+
+    for path in (exported, tmp_path / "plays.csv"):
+        await clear_plays()
+        counts = await import_plays(path)
+        assert counts == {"plays": rows + 1, "created": rows + 1, "skipped": 0}
+        assert await archive.all().count() == 0
+        assert digest(await _reexport(tmp_path)) == expected
+
+    # importing again replaces every play instead of duplicating it
+    counts = await import_plays(exported)
+    assert counts["created"] == 0
+    assert digest(await _reexport(tmp_path)) == expected
+
+
+@pytest.mark.asyncio
+async def test_export_import_round_trips(tmp_path):
+    """
+    Round trips ROUNDTRIP_ROWS plays, 5000 unless PLAYS_ROUNDTRIP_ROWS says otherwise, through
+    both formats. test_round_trips_at_scale covers millions of plays.
+    """
+    await round_trip(tmp_path, ROUNDTRIP_ROWS)
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_round_trips_at_scale(tmp_path):
+    await round_trip(tmp_path, SCALE_ROWS)
+    # the session database is shared, leave it small for the tests after this one
+    await clear_plays()
+
+
+async def _reexport(tmp_path: Path) -> Path:
+    path = tmp_path / "again.jsonl"
+    await export_plays(path)
+    return path
@@ -0,0 +1,80 @@
+import pytest
+
+from games.connections import ConnectionsGame
+from games.zip import ZipGame
+from orm.models import DailyLeaderboard, RatingProgress, ZipPlay, ZipPlayArchive
+from tools import rollups, user_stats
+from tools.rescore import rescore, rescore_text
+
+CHAT = -1007
+SHARES = {
+    "backtracker": "Zip #109 | 0:08 🏁\nWith 2 backtracks 🛑\n🏅 I’m in the Top 1% of all players today!",
+    "clean": "Zip #109 | 0:15 🏁\nWith no backtracks 🟢",
+}
+
+
+def test_rescore_text_picks_the_share_of_the_game_number():
+    text = f"{SHARES['clean'].replace('#109', '#108')}\n\n{SHARES['backtracker']}"
+    assert rescore_text(ZipGame, text, 109)["score"] == 18
+    assert rescore_text(ZipGame, text, 108)["score"] == 15
+    assert rescore_text(ZipGame, text, 107) is None
+
+
+@pytest.mark.asyncio
+async def test_rescore_applies_new_rules(monkeypatch):
+    for model in (ZipPlay, ZipPlayArchive):
+        await model.all().delete()
+    await user_stats.rebuild([ZipGame])
+    await rollups.rebuild([ZipGame])
+    for username, text in SHARES.items():
+        data = ZipGame.process_to_dict(text)
+        await ZipGame.update_or_create_game_record(
+            username, 109, ZipGame.get_update_defaults(data), chat_id=CHAT
+        )
+    # a stored row whose text no longer parses is left alone
+    await ZipGame.update_or_create_game_record(
+        "broken",
+        109,
+        {"score": 1, "seconds": 1, "backtracks": 0, "flawless": False, "raw_text": "Zip"},
+        chat_id=CHAT,
+    )
+    await RatingProgress.create(game_type=ZipGame.game_type, game_number=109, play_id=0)
+
+    [report] = (await rescore([ZipGame], workers=0)).values()
+    assert (report["scanned"], report["changed"], report["unparsed"]) == (3, 0, 1)
+
+    monkeypatch.setattr(ZipGame, "backtrack_penalty", 10)
+    [report] = (await rescore([ZipGame], dry_run=True, workers=0)).values()
+    assert report["changed"] == 1
+    assert report["samples"] == [(CHAT, "backtracker", 109, {"score": (18, 28)})]
+    assert (await ZipPlay.get(username="backtracker")).score == 18
+
+    [report] = (await rescore([ZipGame], workers=0)).values()
+    assert report["changed"] == 1
+    assert (await ZipPlay.get(username="backtracker")).score == 28
+    leaderboard = await DailyLeaderboard.filter(
+        game_type=ZipGame.game_type, chat_id=CHAT, game_number=109
+    ).order_by("rank")
+    assert [(row.username, row.score) for row in leaderboard] == [
+        ("broken", 1),
+        ("clean", 15),
+        ("backtracker", 28),
+    ]
+    assert await user_stats.check([ZipGame]) == {}
+    assert await rollups.check([ZipGame]) == {}
+    assert not await RatingProgress.exists(game_type=ZipGame.game_type)
+    # nothing left to change
+    [report] = (await rescore([ZipGame], workers=0)).values()
+    assert report["changed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rescore_in_worker_processes():
+    text = "Connections\nPuzzle #736\n🟪🟪🟪🟪\n🟦🟦🟦🟦\n🟨🟨🟨🟨\n🟩🟩🟩🟩"
+    data = ConnectionsGame.process_to_dict(text)
+    await ConnectionsGame.update_or_create_game_record(
+        "pool", 736, ConnectionsGame.get_update_defaults(data), chat_id=CHAT
+    )
+    await ConnectionsGame.db_model.filter(username="pool", chat_id=CHAT).update(score=0)
+    report = (await rescore([ConnectionsGame], dry_run=True, workers=2))["connections"]
+    assert (CHAT, "pool", 736, {"score": (0, data["score"])}) in report["samples"]
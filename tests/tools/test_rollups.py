@@ -0,0 +1,73 @@
+from datetime import date
+
+import pytest
+
+from games import GAMES
+from games.base import bulk_update_or_create_records, period_leaderboards
+from games.connections import ConnectionsGame
+from games.periods import MONTH, WEEK
+from games.tango import TangoGame
+from orm.models import WeeklyStats
+from tests.game_parsers.samples import connections_defaults, timed_defaults
+from tools.rollups import check, rebuild
+
+CHAT = -1005
+
+
+@pytest.mark.asyncio
+async def test_upserts_maintain_rollups():
+    await rebuild([TangoGame, ConnectionsGame])
+    today = TangoGame.current_game_number()
+    await bulk_update_or_create_records(
+        {
+            TangoGame: [
+                ("weekly1", today, timed_defaults(50)),
+                ("weekly2", today, timed_defaults(40)),
+                # a late play recomputes the player's week and month of that day
+                ("weekly1", today - 40, timed_defaults(10)),
+            ],
+            ConnectionsGame: [
+                ("weekly1", ConnectionsGame.current_game_number(), connections_defaults(9))
+            ],
+        },
+        chat_id=CHAT,
+    )
+    await TangoGame.update_or_create_game_record("weekly3", today, timed_defaults(90), chat_id=CHAT)
+    # a correction replaces the score in the totals
+    await TangoGame.update_or_create_game_record("weekly1", today, timed_defaults(30), chat_id=CHAT)
+    assert await check([TangoGame, ConnectionsGame]) == {}
+
+    period = WEEK.period_of(date.today())
+    stored = await WeeklyStats.get(
+        game_type=TangoGame.game_type, chat_id=CHAT, period=period, username="weekly1"
+    )
+    assert (stored.plays, stored.score_sum) == (1, 30)
+
+    leaderboards = await period_leaderboards(GAMES, "week", chat_id=CHAT)
+    tango = leaderboards[GAMES.index(TangoGame)]
+    assert [row["username"] for row in tango["leaderboard"]] == ["weekly1", "weekly2", "weekly3"]
+    assert tango["leaderboard"][0] == {"username": "weekly1", "total": 30, "average": 30, "days": 1}
+    connections = leaderboards[GAMES.index(ConnectionsGame)]
+    assert connections["leaderboard"] == [
+        {"username": "weekly1", "total": 9, "average": 9, "days": 1}
+    ]
+    month = await period_leaderboards([TangoGame], MONTH.name, "average", chat_id=CHAT)
+    assert [row["username"] for row in month[0]["leaderboard"]] == ["weekly1", "weekly2", "weekly3"]
+    with pytest.raises(ValueError):
+        await period_leaderboards(GAMES, "week", "fastest")
+
+
+@pytest.mark.asyncio
+async def test_check_finds_and_rebuild_fixes_drift():
+    await rebuild([TangoGame])
+    await WeeklyStats.create(
+        game_type=TangoGame.game_type,
+        chat_id=CHAT,
+        period=190001,
+        username="drift",
+        plays=1,
+        score_sum=1,
+    )
+    assert await check([TangoGame]) == {"week": {TangoGame.game_type: [190001]}}
+    await rebuild([TangoGame])
+    assert await check([TangoGame]) == {}
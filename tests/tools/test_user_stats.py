@@ -0,0 +1,114 @@
+import pytest
+
+from games import GAMES
+from games.archive import PlayArchiver
+from games.base import bulk_update_or_create_records, user_stats
+from games.connections import ConnectionsGame
+from games.zip import ZipGame
+from orm.models import UserStats, ZipPlay, ZipPlayArchive
+from tests.game_parsers.samples import connections_defaults, zip_defaults
+from tools.user_stats import check, rebuild
+
+CHAT = -1003
+
+
+@pytest.mark.asyncio
+async def test_upserts_maintain_user_stats():
+    await rebuild([ZipGame, ConnectionsGame])
+    zip_number = ZipGame.current_game_number()
+    connections_number = ConnectionsGame.current_game_number()
+    await bulk_update_or_create_records(
+        {
+            ZipGame: [
+                ("stats1", zip_number, zip_defaults(40, flawless=True)),
+                ("stats1", zip_number - 1, zip_defaults(60)),
+                ("stats2", zip_number, zip_defaults(30)),
+            ],
+            ConnectionsGame: [("stats1", connections_number, connections_defaults(7))],
+        },
+        chat_id=CHAT,
+    )
+    # a new play of today only adds to the totals
+    await ZipGame.update_or_create_game_record(
+        "stats1", zip_number + 1, zip_defaults(20, flawless=True), chat_id=CHAT
+    )
+    # a correction takes the old score out of min and max
+    await ZipGame.update_or_create_game_record(
+        "stats1", zip_number - 1, zip_defaults(50), chat_id=CHAT
+    )
+    assert await check([ZipGame, ConnectionsGame]) == {}
+
+    assert await user_stats(GAMES, "stats1", CHAT) == [
+        {
+            "game_type": "connections",
+            "plays": 1,
+            "best": 7,
+            "worst": 7,
+            "average": 7,
+            "counts": {"won": 1},
+            "streak": 1,
+            "longest_streak": 1,
+        },
+        {
+            "game_type": "zip",
+            "plays": 3,
+            "best": 20,
+            "worst": 50,
+            "average": 110 / 3,
+            "counts": {"flawless": 2},
+            "streak": 3,
+            "longest_streak": 3,
+        },
+    ]
+    assert await user_stats(GAMES, "stats1") == []
+
+
+@pytest.mark.asyncio
+async def test_streaks_follow_game_number_continuity():
+    await rebuild([ZipGame])
+    today = ZipGame.current_game_number()
+
+    async def play(game_number: int) -> tuple[int, int]:
+        await ZipGame.update_or_create_game_record(
+            "streaker", game_number, zip_defaults(30), chat_id=CHAT
+        )
+        assert await check([ZipGame]) == {}
+        stats = await UserStats.get(chat_id=CHAT, username="streaker", game_type=ZipGame.game_type)
+        return stats.current_streak, stats.longest_streak
+
+    assert await play(today) == (1, 1)
+    assert await play(today + 1) == (2, 2)
+    assert await play(today + 3) == (1, 2)
+    # filling the gap joins both streaks
+    assert await play(today + 2) == (4, 4)
+    assert await play(today - 5) == (4, 4)
+    [stats] = await user_stats([ZipGame], "streaker", CHAT)
+    assert (stats["streak"], stats["longest_streak"]) == (4, 4)
+
+
+@pytest.mark.asyncio
+async def test_late_play_replacing_an_archived_one_is_counted_once():
+    await ZipPlay.all().delete()
+    await ZipPlayArchive.all().delete()
+    await rebuild([ZipGame])
+    old = ZipGame.current_game_number() - 40
+    await ZipGame.update_or_create_game_record("late", old, zip_defaults(90), chat_id=CHAT)
+    await PlayArchiver([ZipGame], horizon_days=30, pause=0).archive_once()
+    await ZipGame.update_or_create_game_record("late", old, zip_defaults(35), chat_id=CHAT)
+
+    stats = await UserStats.get(chat_id=CHAT, username="late", game_type=ZipGame.game_type)
+    assert (stats.plays, stats.min_score, stats.max_score) == (1, 35, 35)
+    assert await check([ZipGame]) == {}
+
+
+@pytest.mark.asyncio
+async def test_check_finds_and_rebuild_fixes_drift():
+    await rebuild([ZipGame])
+    await ZipPlay.create(
+        chat_id=CHAT, username="drift", game_number=1, **zip_defaults(5, flawless=True)
+    )
+    assert await check([ZipGame]) == {ZipGame.game_type: ["drift"]}
+    await rebuild([ZipGame])
+    assert await check([ZipGame]) == {}
+    stats = await UserStats.get(chat_id=CHAT, username="drift", game_type=ZipGame.game_type)
+    assert (stats.plays, stats.flawless, stats.average_score) == (1, 1, 5)
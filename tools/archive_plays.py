@@ -0,0 +1,43 @@
+"""
+Move plays of old game numbers from the hot play tables to the archive tables.
+
+The bot does this by itself every hour; this runs one pass by hand, e.g. after a backfill.
+Batches are separate transactions, so it is safe to run while the bot is up.
+
+Usage:
+    python -m tools.archive_plays [--horizon-days 30] [--batch-size 500] [--db-url sqlite://db.sqlite3]
+"""
+
+import argparse
+import asyncio
+
+from tortoise import Tortoise
+
+from games import GAMES
+from games.archive import PlayArchiver
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.db_url:
+        await Tortoise.init(db_url=args.db_url, modules={"models": ["orm.models"]})
+    else:
+        from aerich_config import TORTOISE_ORM
+
+        await Tortoise.init(config=TORTOISE_ORM)
+    archiver = PlayArchiver(GAMES, args.horizon_days, batch_size=args.batch_size, pause=0)
+    try:
+        moved = await archiver.archive_once()
+    finally:
+        await Tortoise.close_connections()
+    print(
+        f"Archived {moved:,} plays in {archiver.counters['batches']:,} batches, "
+        f"longest batch {archiver.max_batch_seconds * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--horizon-days", type=int, default=30, help="game numbers kept hot")
+    parser.add_argument("--batch-size", type=int, default=500, help="plays per transaction")
+    parser.add_argument("--db-url", help="database URL (default: aerich_config.TORTOISE_ORM)")
+    asyncio.run(main(parser.parse_args()))
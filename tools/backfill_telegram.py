@@ -0,0 +1,211 @@
+"""
+Backfill plays from a Telegram Desktop chat export.
+
+Streams the `messages` array of a single chat `result.json` export, runs every message through
+the game parsers and writes the plays of the chat given by `--chat-id` in large transactions.
+Progress is checkpointed to a state file after every committed batch, so an interrupted run
+picks up where it stopped.
+
+Usage:
+    python -m tools.backfill_telegram path/to/result.json [--chat-id -100123] [--batch-size 5000]
+        [--user-map map.json]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from typing import Iterator, TextIO, Type
+
+from tortoise import Tortoise
+
+from games import GAMES
+from games.base import Game, bulk_update_or_create_records
+from games.dispatch import GameDispatcher
+from orm.models import DEFAULT_CHAT_ID
+
+MESSAGES_ARRAY = re.compile(r'"messages"\s*:\s*\[')
+CHUNK_SIZE = 1 << 20
+
+
+def iter_export_messages(fp: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yields the messages of a Telegram export one at a time without loading the whole file.
+    Args:
+        fp (TextIO): The opened result.json file.
+        chunk_size (int): Number of characters read from the file at a time.
+    Returns:
+        Iterator[dict]: The message objects, in file order.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    def read_more() -> bool:
+        nonlocal buffer, eof
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        return not eof
+
+    while not (match := MESSAGES_ARRAY.search(buffer)):
+        if not read_more():
+            raise ValueError("No messages array found in the export.")
+    pos = match.end()
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            buffer, pos = "", 0
+            if not read_more():
+                raise ValueError("Export ended before the messages array was closed.")
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            message, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # the message is split across chunks
+            buffer, pos = buffer[pos:], 0
+            if not read_more():
+                raise
+            continue
+        yield message
+        pos = end
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+
+def message_text(message: dict) -> str:
+    """
+    Returns the plain text of an exported message.
+    Formatted messages are exported as a list of plain strings and entity objects.
+    """
+    text = message.get("text", "")
+    if isinstance(text, list):
+        text = "".join(part if isinstance(part, str) else part.get("text", "") for part in text)
+    return text.strip()
+
+
+def load_state(state_path: Path) -> int:
+    if not state_path.exists():
+        return 0
+    return json.loads(state_path.read_text())["last_message_id"]
+
+
+def save_state(state_path: Path, last_message_id: int) -> None:
+    tmp_path = state_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"last_message_id": last_message_id}))
+    tmp_path.replace(state_path)
+
+
+async def backfill(
+    export_path: Path,
+    state_path: Path,
+    batch_size: int = 5000,
+    user_map: dict[str, str] | None = None,
+    progress_every: int = 100_000,
+    chat_id: int = DEFAULT_CHAT_ID,
+) -> dict[str, int]:
+    """
+    Imports every score share in a Telegram export.
+    Args:
+        export_path (Path): Path to the result.json export.
+        state_path (Path): Checkpoint file. Messages up to the id stored in it are skipped.
+        batch_size (int): Number of plays written per transaction.
+        user_map (dict[str, str] | None): Maps `from_id` or display names to bot usernames.
+        progress_every (int): Print progress every this many messages.
+        chat_id (int): The chat the plays are recorded for, as the bot sees it.
+    Returns:
+        dict[str, int]: Counters for scanned messages, parsed plays and created records.
+    """
+    dispatcher = GameDispatcher(GAMES)
+    user_map = user_map or {}
+    resume_after = load_state(state_path)
+    counts = {"messages": 0, "skipped": 0, "plays": 0, "created": 0}
+    batch: dict[Type[Game], list[tuple[str, int, dict]]] = {}
+    pending = 0
+    last_id = resume_after
+    start_time = time.perf_counter()
+
+    async def flush() -> None:
+        nonlocal batch, pending
+        if batch:
+            counts["created"] += await bulk_update_or_create_records(batch, chat_id)
+        save_state(state_path, last_id)
+        batch, pending = {}, 0
+
+    with export_path.open(encoding="utf-8") as fp:
+        for message in iter_export_messages(fp):
+            counts["messages"] += 1
+            if counts["messages"] % progress_every == 0:
+                elapsed = time.perf_counter() - start_time
+                print(
+                    f"{counts['messages']:,} messages, {counts['plays']:,} plays "
+                    f"({counts['messages'] / elapsed:,.0f} msg/s)"
+                )
+            message_id = message.get("id", 0)
+            if message_id <= resume_after:
+                counts["skipped"] += 1
+                continue
+            last_id = message_id
+            if message.get("type") != "message":
+                continue
+            plays = dispatcher.parse_all(message_text(message))
+            if not plays:
+                continue
+            sender = message.get("from") or ""
+            username = user_map.get(message.get("from_id", ""), user_map.get(sender, sender))
+            for game, data in plays:
+                batch.setdefault(game, []).append(
+                    (username, data["game_number"], game.get_update_defaults(data))
+                )
+            counts["plays"] += len(plays)
+            pending += len(plays)
+            if pending >= batch_size:
+                await flush()
+    await flush()
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"Done: {counts['messages']:,} messages ({counts['skipped']:,} already imported), "
+        f"{counts['plays']:,} plays, {counts['created']:,} new records "
+        f"in {elapsed:.1f}s ({counts['messages'] / elapsed:,.0f} msg/s)"
+    )
+    return counts
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.db_url:
+        await Tortoise.init(db_url=args.db_url, modules={"models": ["orm.models"]})
+    else:
+        from aerich_config import TORTOISE_ORM
+
+        await Tortoise.init(config=TORTOISE_ORM)
+    user_map = json.loads(args.user_map.read_text()) if args.user_map else None
+    state_path = args.state or args.export.with_name(args.export.name + ".backfill-state.json")
+    try:
+        await backfill(args.export, state_path, args.batch_size, user_map, chat_id=args.chat_id)
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("export", type=Path, help="Telegram Desktop result.json export")
+    parser.add_argument(
+        "--chat-id",
+        type=int,
+        default=DEFAULT_CHAT_ID,
+        help="bot API id of the exported chat, supergroups start with -100 (default: 0)",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000, help="plays per transaction")
+    parser.add_argument(
+        "--user-map", type=Path, help="JSON object mapping from_id or display name to username"
+    )
+    parser.add_argument("--state", type=Path, help="checkpoint file (default: next to export)")
+    parser.add_argument("--db-url", help="database URL (default: aerich_config.TORTOISE_ORM)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,99 @@
+"""
+Rebuild or check the materialized daily_leaderboard table.
+
+`rebuild` recomputes every game's rows from the play tables in one transaction. `check` compares
+the table with a ranking computed from the play tables and lists the game numbers that differ,
+exiting with status 1 if any do.
+
+Usage:
+    python -m tools.daily_leaderboard {rebuild,check} [--db-url sqlite://db.sqlite3]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Iterable, Type
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from games import GAMES
+from games.base import Game
+from orm.models import DailyLeaderboard
+
+
+async def rebuild(games: Iterable[Type[Game]] = GAMES) -> int:
+    """
+    Recomputes daily_leaderboard from the play tables.
+    Returns:
+        int: The number of rows in the rebuilt table.
+    """
+    async with in_transaction() as connection:
+        for game in games:
+            await game.refresh_daily_leaderboard(None, connection)
+    return await DailyLeaderboard.all().count()
+
+
+async def check(games: Iterable[Type[Game]] = GAMES) -> dict[str, list[int]]:
+    """
+    Compares daily_leaderboard with the play tables.
+    Returns:
+        dict[str, list[int]]: The game numbers whose stored leaderboard differs in any chat, by
+            game type. Games without differences are left out.
+    """
+    mismatches = {}
+    for game in games:
+        connection = game.db_model._meta.db
+        _, expected_rows = await connection.execute_query(*game._ranked_plays_sql())
+        expected = {}
+        for row in expected_rows:
+            expected.setdefault((row["chat_id"], row["game_number"]), []).append(
+                (row["rank"], row["play_id"], row["username"], row["score"])
+            )
+        stored = {}
+        for row in (
+            await DailyLeaderboard.filter(game_type=game.game_type)
+            .order_by("chat_id", "game_number", "rank")
+            .values("chat_id", "game_number", "rank", "play_id", "username", "score")
+        ):
+            stored.setdefault((row["chat_id"], row["game_number"]), []).append(
+                (row["rank"], row["play_id"], row["username"], row["score"])
+            )
+        differing = sorted(
+            {
+                game_number
+                for chat_id, game_number in expected.keys() | stored.keys()
+                if expected.get((chat_id, game_number)) != stored.get((chat_id, game_number))
+            }
+        )
+        if differing:
+            mismatches[game.game_type] = differing
+    return mismatches
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.db_url:
+        await Tortoise.init(db_url=args.db_url, modules={"models": ["orm.models"]})
+    else:
+        from aerich_config import TORTOISE_ORM
+
+        await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        if args.command == "rebuild":
+            print(f"Rebuilt daily_leaderboard with {await rebuild():,} rows")
+            return 0
+        mismatches = await check()
+        for game_type, game_numbers in mismatches.items():
+            print(f"{game_type}: {len(game_numbers)} game numbers differ: {game_numbers[:20]}")
+        if not mismatches:
+            print("daily_leaderboard matches the play tables")
+        return 1 if mismatches else 0
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--db-url", help="database URL (default: aerich_config.TORTOISE_ORM)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
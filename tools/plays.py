@@ -0,0 +1,240 @@
+"""
+Export every play to a JSONL or CSV file, or import plays from one.
+
+`export` walks the archive and hot table of each game in id order, one keyset page at a time,
+and writes a line per play with its share text, so memory stays flat however many plays there
+are. Archived plays come first, so a play resubmitted after being archived is imported last and
+wins. `import` reads such a file back in batches of multi-row upserts, with the same semantics
+as recording each play again: a play of the same chat, username and game number is replaced,
+and the derived tables are kept current. The file format follows the extension unless
+`--format` is given.
+
+Usage:
+    python -m tools.plays {export,import} path/to/plays.jsonl [--format {jsonl,csv}]
+        [--batch-size 5000] [--db-url sqlite://db.sqlite3]
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import time
+from datetime import date
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Iterator, TextIO, Type
+
+from tortoise import Tortoise, fields
+
+from games import GAMES
+from games.base import Game, bulk_update_or_create_records
+
+FORMATS = ("jsonl", "csv")
+# Columns every game's plays have, in file order. Game specific columns follow them.
+KEY_COLUMNS = ("game_type", "chat_id", "username", "game_number", "score")
+
+
+def detect_format(path: Path, fmt: str | None = None) -> str:
+    if fmt is not None:
+        return fmt
+    return "csv" if path.suffix.lower() == ".csv" else "jsonl"
+
+
+def game_columns(game: Type[Game]) -> list[str]:
+    """
+    The columns of a game's plays besides KEY_COLUMNS and the share text, in model order.
+    """
+    meta = game.db_model._meta
+    return [
+        name
+        for name in meta.fields_map
+        if name in meta.db_fields and name not in KEY_COLUMNS and name != "id"
+    ]
+
+
+def csv_columns(games: Iterable[Type[Game]]) -> list[str]:
+    """
+    The header of a CSV export, every game's columns in one table. A play leaves the columns
+    of other games empty.
+    """
+    extra = {}
+    for game in games:
+        extra.update(dict.fromkeys(game_columns(game)))
+    return [*KEY_COLUMNS, *extra, "raw_text"]
+
+
+async def iter_plays(game: Type[Game], batch_size: int = 5000) -> AsyncIterator[dict]:
+    """
+    Yields the plays of a game as export rows, archived ones first.
+    Every page is an index range scan on the primary key, with the share texts of the page
+    loaded in one more query.
+    """
+    models = [game.db_model]
+    if game.archive_model is not None:
+        models.insert(0, game.archive_model)
+    columns = game_columns(game)
+    connection = game.db_model._meta.db
+    for model in models:
+        meta = model._meta
+        select_sql = ", ".join(
+            f'"{meta.fields_db_projection[name]}"' for name in ("id", *KEY_COLUMNS[1:], *columns)
+        )
+        last_id = 0
+        while True:
+            _, rows = await connection.execute_query(
+                f'SELECT {select_sql} FROM "{meta.db_table}" WHERE "id" > ? ORDER BY "id" LIMIT ?',
+                [last_id, batch_size],
+            )
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            texts = await game.get_raw_texts(row["id"] for row in rows)
+            for row in rows:
+                play = {"game_type": game.game_type}
+                for name in (*KEY_COLUMNS[1:], *columns):
+                    play[name] = meta.fields_map[name].to_python_value(row[name])
+                play["raw_text"] = texts.get(row["id"])
+                yield play
+
+
+async def export_plays(
+    path: Path, games: Iterable[Type[Game]] = GAMES, fmt: str | None = None, batch_size: int = 5000
+) -> int:
+    """
+    Writes every play of several games to a file.
+    Args:
+        path (Path): The file to write.
+        games (Iterable[Type[Game]]): The games to export.
+        fmt (str | None): One of FORMATS, None to follow the extension of path.
+        batch_size (int): Plays read at a time.
+    Returns:
+        int: The number of plays written.
+    """
+    games = list(games)
+    fmt = detect_format(path, fmt)
+    written = 0
+    with path.open("w", encoding="utf-8", newline="") as fp:
+        if fmt == "csv":
+            writer = csv.DictWriter(fp, csv_columns(games), restval="")
+            writer.writeheader()
+            write = writer.writerow
+        else:
+
+            def write(play: dict) -> None:
+                fp.write(json.dumps(play, ensure_ascii=False, default=date.isoformat))
+                fp.write("\n")
+
+        for game in games:
+            async for play in iter_plays(game, batch_size):
+                write(play)
+                written += 1
+    return written
+
+
+def _to_python(value: str | int | bool, field: fields.Field) -> int | bool | str | date:
+    # CSV cells are all strings, and bool("False") would be true
+    if isinstance(field, fields.BooleanField) and isinstance(value, str):
+        return value.lower() in ("true", "1")
+    return field.to_python_value(value)
+
+
+def read_plays(fp: TextIO, fmt: str, games: Iterable[Type[Game]] = GAMES) -> Iterator[dict]:
+    """
+    Yields the plays of an export one at a time, with the column types of the play tables.
+    Columns of other games are dropped, an empty raw_text is a play without a share text.
+    Plays of games not in games are yielded as read.
+    """
+    columns = {game.game_type: (game, game_columns(game)) for game in games}
+    if fmt == "csv":
+        rows = csv.DictReader(fp)
+    else:
+        rows = (json.loads(line) for line in fp if line.strip())
+    for row in rows:
+        if row["game_type"] not in columns:
+            yield row
+            continue
+        game, extra = columns[row["game_type"]]
+        fields_map = game.db_model._meta.fields_map
+        play = {"game_type": row["game_type"]}
+        for name in (*KEY_COLUMNS[1:], *extra):
+            play[name] = _to_python(row[name], fields_map[name])
+        play["raw_text"] = row.get("raw_text") or None
+        yield play
+
+
+async def import_plays(
+    path: Path, games: Iterable[Type[Game]] = GAMES, fmt: str | None = None, batch_size: int = 5000
+) -> dict[str, int]:
+    """
+    Records the plays of a file, replacing the ones with the same chat, username and game
+    number.
+    Args:
+        path (Path): The file to read.
+        games (Iterable[Type[Game]]): The games to import, plays of others are skipped.
+        fmt (str | None): One of FORMATS, None to follow the extension of path.
+        batch_size (int): Plays written per transaction.
+    Returns:
+        dict[str, int]: Counters for read, created and skipped plays.
+    """
+    columns = {game.game_type: (game, game_columns(game)) for game in games}
+    counts = {"plays": 0, "created": 0, "skipped": 0}
+    # pending records per chat, one bulk upsert per chat when the batch is full
+    batch: dict[int, dict[Type[Game], list[tuple[str, int, dict]]]] = {}
+    pending = 0
+
+    async def flush() -> None:
+        nonlocal batch, pending
+        for chat_id, records_by_game in batch.items():
+            counts["created"] += await bulk_update_or_create_records(records_by_game, chat_id)
+        batch, pending = {}, 0
+
+    with path.open(encoding="utf-8", newline="") as fp:
+        for play in read_plays(fp, detect_format(path, fmt), games):
+            if play["game_type"] not in columns:
+                counts["skipped"] += 1
+                continue
+            game, extra = columns[play["game_type"]]
+            defaults = {name: play[name] for name in ("score", *extra)}
+            if play.get("raw_text") is not None:
+                defaults["raw_text"] = play["raw_text"]
+            batch.setdefault(play["chat_id"], {}).setdefault(game, []).append(
+                (play["username"], play["game_number"], defaults)
+            )
+            counts["plays"] += 1
+            pending += 1
+            if pending >= batch_size:
+                await flush()
+    await flush()
+    return counts
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.db_url:
+        await Tortoise.init(db_url=args.db_url, modules={"models": ["orm.models"]})
+    else:
+        from aerich_config import TORTOISE_ORM
+
+        await Tortoise.init(config=TORTOISE_ORM)
+    start = time.perf_counter()
+    try:
+        if args.command == "export":
+            exported = await export_plays(args.path, fmt=args.format, batch_size=args.batch_size)
+            summary = f"Exported {exported:,} plays"
+        else:
+            counts = await import_plays(args.path, fmt=args.format, batch_size=args.batch_size)
+            summary = (
+                f"Imported {counts['plays']:,} plays, {counts['created']:,} new, "
+                f"{counts['skipped']:,} of unknown games skipped"
+            )
+    finally:
+        await Tortoise.close_connections()
+    print(f"{summary} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=FORMATS, help="file format (default: from extension)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--db-url", help="database URL (default: aerich_config.TORTOISE_ORM)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,48 @@
+"""
+Rate the closed game numbers of every game, or rate the whole history again.
+
+The bot updates player_rating by itself every hour; `update` runs one pass by hand, `rebuild`
+forgets every rating and recomputes them from the play tables, e.g. after corrections of old
+plays or a change of games.ratings.K_FACTOR.
+
+Usage:
+    python -m tools.ratings {update,rebuild} [--db-url sqlite://db.sqlite3]
+"""
+
+import argparse
+import asyncio
+import time
+
+from tortoise import Tortoise
+
+from games import GAMES
+from games.ratings import RatingEngine
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.db_url:
+        await Tortoise.init(db_url=args.db_url, modules={"models": ["orm.models"]})
+    else:
+        from aerich_config import TORTOISE_ORM
+
+        await Tortoise.init(config=TORTOISE_ORM)
+    engine = RatingEngine(GAMES)
+    try:
+        start = time.perf_counter()
+        if args.command == "rebuild":
+            rated = await engine.rebuild()
+        else:
+            rated = await engine.update_once()
+    finally:
+        await Tortoise.close_connections()
+    print(
+        f"Rated {rated:,} game numbers in {time.perf_counter() - start:.2f} s, "
+        f"{engine.counters['recomputes']} full recomputes"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["update", "rebuild"])
+    parser.add_argument("--db-url", help="database URL (default: aerich_config.TORTOISE_ORM)")
+    asyncio.run(main(parser.parse_args()))
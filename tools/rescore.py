@@ -0,0 +1,293 @@
+"""
+Rescore every stored play from its share text, after a change of the scoring rules.
+
+Walks the hot and archive tables of each game in id order, parses the share texts from
+play_text again in a process pool and writes back the plays whose columns changed, one
+transaction per batch. Each batch also refreshes the daily_leaderboard, user_stats and rollup
+rows of what it changed, and makes the next rating pass recompute the game. Run it with the bot
+stopped, or restart the bot afterwards: its in-memory caches cannot see writes made here.
+
+`--dry-run` writes nothing and lists a sample of the plays that would change.
+
+Usage:
+    python -m tools.rescore [--game zip] [--dry-run] [--batch-size 5000] [--workers 4]
+        [--db-url sqlite://db.sqlite3]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, Type
+
+from tortoise import BaseDBAsyncClient, Tortoise
+from tortoise.transactions import in_transaction
+
+from games import GAMES
+from games.base import Game
+from games.periods import ROLLUPS
+from orm.models import RatingProgress
+
+# Plays sent to a worker at a time, enough to amortize pickling them.
+WORKER_CHUNK_SIZE = 500
+
+
+def rescore_text(game: Type[Game], text: str, game_number: int) -> dict[str, int | bool] | None:
+    """
+    Parses a stored share text again.
+    A message can hold several shares, the one of game_number is used.
+    Args:
+        game (Type[Game]): The game the play belongs to.
+        text (str): The share text.
+        game_number (int): The game number of the play.
+    Returns:
+        dict[str, int | bool] | None: The play's columns as get_update_defaults gives them, without
+            raw_text, or None if no share of game_number parses anymore.
+    """
+    for match in game.parse_pattern.finditer(text):
+        try:
+            data = game.process_to_dict(text, match.start())
+        except ValueError:
+            continue
+        if data["game_number"] == game_number:
+            defaults = game.get_update_defaults(data)
+            defaults.pop("raw_text", None)
+            return defaults
+    return None
+
+
+def rescore_texts(
+    game: Type[Game], plays: list[tuple[int, int, str]]
+) -> list[dict[str, int | bool] | None]:
+    """
+    rescore_text of (play id, game number, text) tuples, run in the worker processes.
+    """
+    return [rescore_text(game, text, game_number) for _, game_number, text in plays]
+
+
+async def _parse(
+    game: Type[Game], plays: list[tuple[int, int, str]], executor: Executor | None
+) -> list[dict[str, int | bool] | None]:
+    if executor is None:
+        return rescore_texts(game, plays)
+    loop = asyncio.get_running_loop()
+    chunks = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                executor, rescore_texts, game, plays[offset : offset + WORKER_CHUNK_SIZE]
+            )
+            for offset in range(0, len(plays), WORKER_CHUNK_SIZE)
+        ]
+    )
+    return [defaults for chunk in chunks for defaults in chunk]
+
+
+async def _write(
+    game: Type[Game],
+    table: str,
+    changes: list[tuple[dict, dict[str, int | bool]]],
+    connection: BaseDBAsyncClient,
+) -> None:
+    """
+    Writes the changed columns of plays of a table, then refreshes what was derived from them.
+    """
+    # one prepared UPDATE per set of changed columns, run over all of its rows
+    by_columns: dict[tuple[str, ...], list[list]] = {}
+    for row, changed in changes:
+        by_columns.setdefault(tuple(changed), []).append([*changed.values(), row["id"]])
+    for columns, values in by_columns.items():
+        assignments = ", ".join(f'"{column}" = ?' for column in columns)
+        await connection.execute_many(f'UPDATE "{table}" SET {assignments} WHERE "id" = ?', values)
+    by_chat: dict[int, list[dict]] = {}
+    for row, _ in changes:
+        by_chat.setdefault(row["chat_id"], []).append(row)
+    for chat_id, rows in by_chat.items():
+        await game.refresh_daily_leaderboard(
+            {row["game_number"] for row in rows}, connection, chat_id
+        )
+        await game.refresh_user_stats({row["username"] for row in rows}, connection, chat_id)
+        for rollup in ROLLUPS.values():
+            keys = {
+                (rollup.period_of(game.game_number_to_date(row["game_number"])), row["username"])
+                for row in rows
+            }
+            await game.refresh_rollup(rollup, keys, connection, chat_id)
+    # ratings depend on the order of every later day, rate the game from scratch
+    await RatingProgress.filter(game_type=game.game_type).using_db(connection).delete()
+
+
+async def rescore_game(
+    game: Type[Game],
+    dry_run: bool = False,
+    batch_size: int = 5000,
+    executor: Executor | None = None,
+    sample_size: int = 20,
+) -> dict:
+    """
+    Rescores the plays of a game.
+    Args:
+        game (Type[Game]): The game.
+        dry_run (bool): Only report the changes.
+        batch_size (int): Plays read, parsed and written at a time.
+        executor (Executor | None): Pool to parse in, None to parse in this process.
+        sample_size (int): The most changed plays to list.
+    Returns:
+        dict: Counters of scanned, changed, unparsed and textless plays, the seconds spent
+            reading, parsing and writing, and the sample of changes as (chat_id, username,
+            game_number, {column: (stored, rescored)}) tuples.
+    """
+    counts = Counter(scanned=0, changed=0, unparsed=0, textless=0)
+    seconds = Counter(read=0.0, parse=0.0, write=0.0)
+    samples = []
+    connection = game.db_model._meta.db
+    tables = [game.db_model]
+    if game.archive_model is not None:
+        tables.append(game.archive_model)
+    for model in tables:
+        meta = model._meta
+        last_id = 0
+        columns = None
+        while True:
+            start = time.perf_counter()
+            # keyset pagination, every batch is an index range scan on the primary key
+            _, rows = await connection.execute_query(
+                f'SELECT * FROM "{meta.db_table}" WHERE "id" > ? ORDER BY "id" LIMIT ?',
+                [last_id, batch_size],
+            )
+            if not rows:
+                break
+            rows = [dict(row) for row in rows]
+            last_id = rows[-1]["id"]
+            texts = await game.get_raw_texts(row["id"] for row in rows)
+            seconds["read"] += time.perf_counter() - start
+            counts["scanned"] += len(rows)
+
+            start = time.perf_counter()
+            with_text = [row for row in rows if row["id"] in texts]
+            counts["textless"] += len(rows) - len(with_text)
+            rescored = await _parse(
+                game,
+                [(row["id"], row["game_number"], texts[row["id"]]) for row in with_text],
+                executor,
+            )
+            changes = []
+            for row, defaults in zip(with_text, rescored):
+                if defaults is None:
+                    counts["unparsed"] += 1
+                    continue
+                if columns is None:
+                    columns = {name: meta.fields_db_projection[name] for name in defaults}
+                changed = {
+                    columns[name]: meta.fields_map[name].to_db_value(value, model)
+                    for name, value in defaults.items()
+                }
+                changed = {
+                    column: value for column, value in changed.items() if row[column] != value
+                }
+                if changed:
+                    changes.append((row, changed))
+                    if len(samples) < sample_size:
+                        samples.append(
+                            (
+                                row["chat_id"],
+                                row["username"],
+                                row["game_number"],
+                                {column: (row[column], value) for column, value in changed.items()},
+                            )
+                        )
+            counts["changed"] += len(changes)
+            seconds["parse"] += time.perf_counter() - start
+
+            if changes and not dry_run:
+                start = time.perf_counter()
+                async with in_transaction() as transaction:
+                    await _write(game, meta.db_table, changes, transaction)
+                seconds["write"] += time.perf_counter() - start
+    if counts["changed"] and not dry_run:
+        for cache in (Game.leaderboard_cache, Game.distribution_cache):
+            if cache is not None:
+                cache.clear()
+    return {
+        **counts,
+        **{f"{name}_seconds": value for name, value in seconds.items()},
+        "samples": samples,
+    }
+
+
+async def rescore(
+    games: Iterable[Type[Game]] = GAMES,
+    dry_run: bool = False,
+    batch_size: int = 5000,
+    workers: int | None = None,
+    sample_size: int = 20,
+) -> dict[str, dict]:
+    """
+    Rescores the plays of several games, see rescore_game.
+    Args:
+        workers (int | None): Worker processes to parse in, None for one per CPU and 0 to
+            parse in this process.
+    Returns:
+        dict[str, dict]: The report of rescore_game by game type.
+    """
+    executor = None
+    if workers != 0:
+        # the database driver runs a thread, forking this process could deadlock the workers
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        return {
+            game.game_type: await rescore_game(game, dry_run, batch_size, executor, sample_size)
+            for game in games
+        }
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def print_report(reports: dict[str, dict], dry_run: bool) -> None:
+    for game_type, report in reports.items():
+        elapsed = report["read_seconds"] + report["parse_seconds"] + report["write_seconds"]
+        print(
+            f"{game_type}: {report['scanned']:,} plays, {report['changed']:,} "
+            f"{'would change' if dry_run else 'changed'}, {report['unparsed']:,} no longer "
+            f"parse, {report['textless']:,} have no share text"
+        )
+        print(
+            f"    read {report['read_seconds']:.2f} s, parse {report['parse_seconds']:.2f} s, "
+            f"write {report['write_seconds']:.2f} s, "
+            f"{report['scanned'] / max(elapsed, 1e-9):,.0f} plays/s"
+        )
+        for chat_id, username, game_number, changed in report["samples"]:
+            diff = ", ".join(f"{column} {old} -> {new}" for column, (old, new) in changed.items())
+            print(f"    chat {chat_id} {username} #{game_number}: {diff}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.db_url:
+        await Tortoise.init(db_url=args.db_url, modules={"models": ["orm.models"]})
+    else:
+        from aerich_config import TORTOISE_ORM
+
+        await Tortoise.init(config=TORTOISE_ORM)
+    games = [game for game in GAMES if not args.game or game.game_type in args.game]
+    try:
+        reports = await rescore(games, args.dry_run, args.batch_size, args.workers)
+    finally:
+        await Tortoise.close_connections()
+    print_report(reports, args.dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--game",
+        action="append",
+        choices=[game.game_type for game in GAMES],
+        help="game type to rescore, repeatable (default: every game)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="report the changes only")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, help="parser processes (default: one per CPU)")
+    parser.add_argument("--db-url", help="database URL (default: aerich_config.TORTOISE_ORM)")
+    asyncio.run(main(parser.parse_args()))
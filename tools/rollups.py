@@ -0,0 +1,98 @@
+"""
+Rebuild or check the weekly_stats and monthly_stats rollup tables.
+
+`rebuild` recomputes every game's rows from the play tables in one transaction. `check` compares
+the tables with totals computed from the play tables and lists the periods that differ, exiting
+with status 1 if any do.
+
+Usage:
+    python -m tools.rollups {rebuild,check} [--db-url sqlite://db.sqlite3]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Iterable, Type
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from games import GAMES
+from games.base import Game
+from games.periods import ROLLUPS
+
+
+async def rebuild(games: Iterable[Type[Game]] = GAMES) -> int:
+    """
+    Recomputes the rollup tables from the play tables.
+    Returns:
+        int: The number of rows in the rebuilt tables.
+    """
+    async with in_transaction() as connection:
+        for game in games:
+            for rollup in ROLLUPS.values():
+                await game.refresh_rollup(rollup, None, connection)
+    return sum([await rollup.model.all().count() for rollup in ROLLUPS.values()])
+
+
+async def check(games: Iterable[Type[Game]] = GAMES) -> dict[str, dict[str, list[int]]]:
+    """
+    Compares the rollup tables with the play tables.
+    Returns:
+        dict[str, dict[str, list[int]]]: The periods whose stored totals differ in any chat, by
+            rollup name and game type. Rollups and games without differences are left out.
+    """
+    mismatches = {}
+    for rollup in ROLLUPS.values():
+        for game in games:
+            expected = {
+                key: tuple(totals)
+                for key, totals in (
+                    await game._rollup_totals(rollup, None, game.db_model._meta.db)
+                ).items()
+            }
+            stored = {
+                (chat_id, period, username): (plays, score_sum)
+                for chat_id, period, username, plays, score_sum in await rollup.model.filter(
+                    game_type=game.game_type
+                ).values_list("chat_id", "period", "username", "plays", "score_sum")
+            }
+            differing = sorted(
+                {
+                    key[1]
+                    for key in expected.keys() | stored.keys()
+                    if expected.get(key) != stored.get(key)
+                }
+            )
+            if differing:
+                mismatches.setdefault(rollup.name, {})[game.game_type] = differing
+    return mismatches
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.db_url:
+        await Tortoise.init(db_url=args.db_url, modules={"models": ["orm.models"]})
+    else:
+        from aerich_config import TORTOISE_ORM
+
+        await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        if args.command == "rebuild":
+            print(f"Rebuilt the rollup tables with {await rebuild():,} rows")
+            return 0
+        mismatches = await check()
+        for name, by_game in mismatches.items():
+            for game_type, periods in by_game.items():
+                print(f"{name} {game_type}: {len(periods)} periods differ: {periods[:20]}")
+        if not mismatches:
+            print("The rollup tables match the play tables")
+        return 1 if mismatches else 0
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--db-url", help="database URL (default: aerich_config.TORTOISE_ORM)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
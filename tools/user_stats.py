@@ -0,0 +1,92 @@
+"""
+Rebuild or check the incrementally maintained user_stats table.
+
+`rebuild` recomputes every game's totals from the play tables in one transaction. `check` compares
+the table with totals computed from the play tables and lists the players that differ, exiting
+with status 1 if any do.
+
+Usage:
+    python -m tools.user_stats {rebuild,check} [--db-url sqlite://db.sqlite3]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Iterable, Type
+
+from tortoise import Tortoise
+from tortoise.transactions import in_transaction
+
+from games import GAMES
+from games.base import USER_STATS_STREAKS, USER_STATS_TOTALS, Game
+from orm.models import UserStats
+
+
+async def rebuild(games: Iterable[Type[Game]] = GAMES) -> int:
+    """
+    Recomputes user_stats from the play tables.
+    Returns:
+        int: The number of rows in the rebuilt table.
+    """
+    async with in_transaction() as connection:
+        for game in games:
+            await game.refresh_user_stats(None, connection)
+    return await UserStats.all().count()
+
+
+async def check(games: Iterable[Type[Game]] = GAMES) -> dict[str, list[str]]:
+    """
+    Compares user_stats with the play tables.
+    Returns:
+        dict[str, list[str]]: The players whose stored totals differ in any chat, by game type.
+            Games without differences are left out.
+    """
+    mismatches = {}
+    for game in games:
+        connection = game.db_model._meta.db
+        _, expected_rows = await connection.execute_query(*game._user_stats_sql())
+        expected = {(row[0], row[1]): tuple(row[3:]) for row in map(tuple, expected_rows)}
+        stored = {
+            (row[0], row[1]): tuple(row[2:])
+            for row in await UserStats.filter(game_type=game.game_type).values_list(
+                "chat_id", "username", *USER_STATS_TOTALS, *USER_STATS_STREAKS
+            )
+        }
+        differing = sorted(
+            {
+                username
+                for chat_id, username in expected.keys() | stored.keys()
+                if expected.get((chat_id, username)) != stored.get((chat_id, username))
+            }
+        )
+        if differing:
+            mismatches[game.game_type] = differing
+    return mismatches
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.db_url:
+        await Tortoise.init(db_url=args.db_url, modules={"models": ["orm.models"]})
+    else:
+        from aerich_config import TORTOISE_ORM
+
+        await Tortoise.init(config=TORTOISE_ORM)
+    try:
+        if args.command == "rebuild":
+            print(f"Rebuilt user_stats with {await rebuild():,} rows")
+            return 0
+        mismatches = await check()
+        for game_type, usernames in mismatches.items():
+            print(f"{game_type}: {len(usernames)} players differ: {usernames[:20]}")
+        if not mismatches:
+            print("user_stats matches the play tables")
+        return 1 if mismatches else 0
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--db-url", help="database URL (default: aerich_config.TORTOISE_ORM)")
+    sys.exit(asyncio.run(main(parser.parse_args())))